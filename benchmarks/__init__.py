@@ -0,0 +1 @@
+# Scripts de medição de desempenho. Executar a partir da raiz: python -m benchmarks.<nome>
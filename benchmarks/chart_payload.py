@@ -0,0 +1,113 @@
+# Tamanho do spec Vega-Lite e tempo de geração/renderização do histograma e do boxplot:
+# linhas brutas (agregação no navegador) x bins/resumos calculados no servidor.
+# Uso: python -m benchmarks.chart_payload [--scales 1 10 100] [--render]
+# --render usa vl-convert-python (renderizador Vega headless) como aproximação do navegador.
+import argparse
+import time
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from enade.chart_data import histogram_bins
+from enade.charts import boxplot_chart, histogram_chart
+from enade.loader import load_tables
+from enade.star import StarSchema
+
+alt.data_transformers.disable_max_rows()
+
+
+def legacy_histogram(df):
+    return alt.Chart(df).mark_bar(color='#4CAF50', opacity=0.7).encode(
+        alt.X("NOTA_TOTAL:Q", bin=alt.Bin(maxbins=40), title="Nota Total"),
+        alt.Y("count():Q", title="Número de Participantes"),
+    ).properties(height=300)
+
+
+def legacy_boxplot(df):
+    return alt.Chart(df).mark_boxplot(extent='min-max', outliers=True, size=20, ticks=True).encode(
+        x=alt.X('DESC_CURSO:N', sort=alt.EncodingSortField(field="NOTA_TOTAL", op="median", order='descending')),
+        y=alt.Y('NOTA_TOTAL:Q', scale=alt.Scale(zero=False)),
+        color=alt.Color('Num Estudantes:Q', scale=alt.Scale(scheme='viridis')),
+    ).properties(height=500)
+
+
+def server_histogram(df):
+    return histogram_chart(histogram_bins(df['NOTA_TOTAL'], maxbins=40)).properties(height=300)
+
+
+def box_summary(df, group_col, value_col):
+    # Resumo de cinco números por grupo (bigodes no mínimo/máximo, como no dashboard) a partir
+    # das notas ordenadas por (grupo, nota); quartis por interpolação linear, como o Vega-Lite
+    values = df[value_col].to_numpy(dtype='float64')
+    codes, groups = df[group_col].factorize(sort=False)
+    valid = ~np.isnan(values) & (codes >= 0)
+    values, codes = values[valid], codes[valid]
+    order = np.lexsort((values, codes))
+    values = values[order]
+    counts = np.bincount(codes[order], minlength=len(groups))
+    present = counts > 0
+    counts = counts[present]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    def quantile(q):
+        pos = (counts - 1) * q
+        lo, hi = np.floor(pos).astype(np.int64), np.ceil(pos).astype(np.int64)
+        return values[starts + lo] * (1 - (pos - lo)) + values[starts + hi] * (pos - lo)
+
+    vmin, vmax = values[starts], values[starts + counts - 1]
+    return pd.DataFrame({group_col: np.asarray(groups)[present], 'count': counts, 'min': vmin,
+                         'q1': quantile(0.25), 'median': quantile(0.5), 'q3': quantile(0.75), 'max': vmax,
+                         'lower': vmin, 'upper': vmax})
+
+
+def server_boxplot(df):
+    summary = box_summary(df, 'DESC_CURSO', 'NOTA_TOTAL')
+    summary['Num Estudantes'] = summary['count']
+    return boxplot_chart(summary).properties(height=500)
+
+
+def scaled_rows(base, factor, seed=0):
+    # Replica as linhas com ruído nas notas para simular factor x o volume atual
+    rng = np.random.default_rng(seed)
+    df = base.loc[base.index.repeat(factor), ['DESC_CURSO', 'NOTA_TOTAL']].reset_index(drop=True)
+    noise = rng.normal(0, 2, len(df)).astype('float32')
+    df['NOTA_TOTAL'] = (df['NOTA_TOTAL'] + noise).clip(0, 100)
+    df['Num Estudantes'] = df.groupby('DESC_CURSO', observed=True)['NOTA_TOTAL'].transform('count')
+    return df
+
+
+def measure(build, df, render):
+    t0 = time.perf_counter()
+    spec = build(df).to_json()
+    build_s = time.perf_counter() - t0
+    render_s = None
+    if render:
+        import vl_convert as vlc
+        t0 = time.perf_counter()
+        vlc.vegalite_to_svg(spec)
+        render_s = time.perf_counter() - t0
+    return len(spec.encode()), build_s, render_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Payload do spec: linhas brutas x agregação no servidor')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--render', action='store_true')
+    args = parser.parse_args()
+
+    dims, fact = load_tables()
+    base = StarSchema(dims).join(fact, ('curso',))
+    print(f"{'gráfico':<12}{'escala':>7}{'linhas':>10}{'modo':>10}{'spec (KiB)':>13}{'gerar (ms)':>12}{'render (ms)':>13}")
+    for factor in args.scales:
+        df = scaled_rows(base, factor)
+        for name, legacy, server in (('histograma', legacy_histogram, server_histogram),
+                                     ('boxplot', legacy_boxplot, server_boxplot)):
+            for mode, build in (('bruto', legacy), ('servidor', server)):
+                size, build_s, render_s = measure(build, df, args.render)
+                render = f"{render_s * 1e3:>13.1f}" if render_s is not None else f"{'-':>13}"
+                print(f"{name:<12}{factor:>6}x{len(df):>10}{mode:>10}{size / 1024:>13.1f}{build_s * 1e3:>12.1f}{render}")
+
+
+if __name__ == '__main__':
+    main()
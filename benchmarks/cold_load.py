@@ -0,0 +1,43 @@
+# Compara o carregamento a frio das tabelas: CSV (caminho original) x cache colunar Arrow IPC.
+# O cache é construído num diretório temporário (o .enade_cache do app não é tocado).
+# Uso: python -m benchmarks.cold_load [--repeat N] [--base-dir DIR]
+import argparse
+import statistics
+import tempfile
+import time
+
+from enade.loader import FILE_MAPPING, load_tables
+
+
+def _time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carregamento a frio: CSV x cache colunar')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--base-dir', default='')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        t0 = time.perf_counter()
+        load_tables(FILE_MAPPING, base_dir=args.base_dir, cache_dir=cache_dir) # CSV + gravação do cache
+        build = time.perf_counter() - t0
+
+        csv_min, csv_med = _time(lambda: load_tables(FILE_MAPPING, base_dir=args.base_dir, use_cache=False), args.repeat)
+        arrow_min, arrow_med = _time(lambda: load_tables(FILE_MAPPING, base_dir=args.base_dir, cache_dir=cache_dir),
+                                     args.repeat)
+
+    print(f"{'caminho':<28}{'mín (ms)':>12}{'mediana (ms)':>15}")
+    print(f"{'CSV (read_csv + limpeza)':<28}{csv_min * 1e3:>12.1f}{csv_med * 1e3:>15.1f}")
+    print(f"{'cache Arrow IPC (mmap)':<28}{arrow_min * 1e3:>12.1f}{arrow_med * 1e3:>15.1f}")
+    print(f"construção única do cache: {build * 1e3:.1f} ms | ganho (mediana): {csv_med / arrow_med:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# Utilitários compartilhados pelos benchmarks: memória residente de um processo e os widgets
+# da seção "Desempenho por Curso" no AppTest (selectbox do curso, reruns de fragmento).
+# O streamlit é importado só nas funções do AppTest: quem mede memória não paga a importação.
+import functools
+import resource
+
+COURSE_LABEL = "Selecione um curso"
+
+
+# --- Memória ---
+
+def rss_mib(pid=None):
+    """RSS atual em MiB do processo `pid` (padrão: o próprio) lido do /proc (Linux).
+
+    Fora do Linux devolve o pico do próprio processo, ou NaN para outro processo.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid is None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return float('nan')
+
+
+# --- AppTest ---
+
+def course_selectbox(at):
+    return next(s for s in at.selectbox if s.label.startswith(COURSE_LABEL))
+
+
+def run_fragment(at, fragment_id):
+    """Rerun com a fila de fragmentos preenchida, como numa interação dentro do fragmento.
+
+    Troca o RerunData do módulo do AppTest durante o rerun: serve só para medições de uma
+    sessão por processo (não é seguro com várias threads).
+    """
+    import streamlit.testing.v1.local_script_runner as local_script_runner
+    from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+
+    local_script_runner.RerunData = functools.partial(RerunData, fragment_id_queue=[fragment_id])
+    try:
+        return at.run()
+    finally:
+        local_script_runner.RerunData = RerunData
+
+
+def widget_fragments(script):
+    """Fragmento de cada widget ('slider', 'selectbox'): roda cada fragmento isolado e vê quais
+    widgets ele desenha."""
+    from streamlit.testing.v1 import AppTest
+
+    found = {}
+    at = AppTest.from_file(script, default_timeout=600).run()
+    for fragment_id in list(at._fragment_storage._fragments):
+        run_fragment(at, fragment_id)
+        if len(at.slider):
+            found.setdefault('slider', fragment_id)
+        if any(s.label.startswith(COURSE_LABEL) for s in at.selectbox):
+            found.setdefault('selectbox', fragment_id)
+    return found
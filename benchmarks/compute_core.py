@@ -0,0 +1,103 @@
+# Tempo e memória de pico de cada etapa do cálculo do dashboard (enade.compute, cubo,
+# sketches, índices), sem Streamlit, sobre dados sintéticos (benchmarks.synthetic) de
+# 10 mil a 10 milhões de linhas na fato. Cada etapa roda duas vezes: uma cronometrada e outra
+# com tracemalloc para o pico de memória (alocações do NumPy/pandas acima do que já estava
+# alocado no início da etapa), para o rastreamento não inflar os tempos. --no-memory pula a segunda.
+# Uso: python -m benchmarks.compute_core [--rows 10000 100000 1000000 10000000] [--years 2021 2022 2023] [--no-memory]
+import argparse
+import resource
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_tables
+from enade.chart_data import histogram_bins
+from enade.compute import (age_counts, course_summary, filter_years, income_bars, overall_metrics,
+                           parent_education, race_pie, sex_pie, year_comparison)
+from enade.course_index import CourseIndex
+from enade.cube import build_cube, build_sketches
+from enade.demographics import DEMOGRAPHIC_TABLES, DemographicKernel
+from enade.loader import FACT_KEY
+from enade.star import StarSchema
+
+
+def _rows(out):
+    # Linhas de saída da etapa (soma se a etapa devolve várias tabelas)
+    if isinstance(out, tuple):
+        return sum(_rows(o) for o in out)
+    if isinstance(out, dict):
+        return len(out)
+    return len(out) if hasattr(out, '__len__') else 1
+
+
+def stages(tables, years):
+    """Etapas na ordem do dashboard: (nome, linhas de entrada, função sem argumentos)."""
+    dims = {k: df for k, df in tables.items() if k != FACT_KEY}
+    fact = tables[FACT_KEY]
+    state = {}
+
+    def run(name, rows_in, fn):
+        def step():
+            state[name] = fn()
+            return state[name]
+        return name, rows_in, step
+
+    schema = StarSchema(dims)
+    yield run('star', len(fact), lambda: schema.join(fact, ('tempo', 'curso')))
+    star = state['star']
+    yield run('filtro de anos', len(star), lambda: filter_years(star, years))
+    yield run('cubo', len(star), lambda: build_cube(star))
+    cube = state['cubo']
+    yield run('sketches', len(star), lambda: build_sketches(star, cube, 'NOTA_TOTAL'))
+    sketches = state['sketches']
+    yield run('métricas gerais', len(cube), lambda: overall_metrics(cube, sketches, years))
+    yield run('comparativo anual', len(cube), lambda: year_comparison(cube, sketches, years))
+    yield run('resumo por curso', len(cube), lambda: course_summary(cube, sketches, years))
+    selected = state['filtro de anos']
+    yield run('histograma', len(selected), lambda: histogram_bins(selected['NOTA_TOTAL'], maxbins=40))
+    yield run('índice por curso', len(selected), lambda: CourseIndex(selected, 'DESC_CURSO', 'NOTA_TOTAL'))
+    demographic = {k: dims[k] for k in DEMOGRAPHIC_TABLES if k in dims}
+    yield run('kernel demográfico', sum(len(df) for df in demographic.values()),
+              lambda: DemographicKernel(demographic, dims['curso'], tempo=dims['tempo']))
+    kernel = state['kernel demográfico']
+    year_keys = dims['tempo'].loc[dims['tempo']['ANO'].isin(years), 'TEMPO_KEY'].tolist()
+    yield run('totais demográficos', kernel.size, lambda: kernel.totals(kernel.mask(years=year_keys)))
+    totals = state['totais demográficos']
+    yield run('gráficos demográficos', len(totals), lambda: (
+        sex_pie(totals), race_pie(totals, kernel.columns['cor']), age_counts(dims['idade']),
+        income_bars(totals, kernel.columns['renda'])[0],
+        parent_education(totals, kernel.columns['escolaridade'])[0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo e memória por etapa do cálculo do dashboard')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--years', type=int, nargs='+', default=[2021, 2022, 2023])
+    parser.add_argument('--no-memory', action='store_true', help='só tempos, sem a execução com tracemalloc')
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10}{'etapa':>24}{'entrada':>12}{'saída':>10}{'tempo (ms)':>12}{'pico (MiB)':>12}")
+    for rows in args.rows:
+        t0 = time.perf_counter()
+        tables = synthetic_tables(rows, years=args.years)
+        print(f"{rows:>10}{'(geração)':>24}{'':>12}{len(tables[FACT_KEY]):>10}{(time.perf_counter() - t0) * 1e3:>12.1f}")
+        total_s = 0.0
+        # Ano mais recente: o filtro de anos corta a tabela (caso "Ano único" com todas as partições)
+        for name, rows_in, step in stages(tables, args.years[-1:]):
+            t0 = time.perf_counter()
+            out = step()
+            elapsed = time.perf_counter() - t0
+            total_s += elapsed
+            peak = ''
+            if not args.no_memory:
+                tracemalloc.start()
+                step()
+                peak = f"{tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f}"
+                tracemalloc.stop()
+            print(f"{'':>10}{name:>24}{rows_in:>12}{_rows(out):>10}{elapsed * 1e3:>12.1f}{peak:>12}")
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{'':>10}{'(total)':>24}{'':>12}{'':>10}{total_s * 1e3:>12.1f}{f'RSS {rss:.0f}':>12}")
+        del tables
+
+
+if __name__ == '__main__':
+    main()
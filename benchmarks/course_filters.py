@@ -0,0 +1,82 @@
+# Filtros combinados por atributos do curso + top/bottom-k por nota média:
+# bitmaps (enade.course_bitmaps) + argpartition x filtros isin do pandas + ordenação completa,
+# com a dimensão CURSO replicada factor x (notas médias sintéticas por curso).
+# Uso: python -m benchmarks.course_filters [--scales 1 10 100] [--k 10] [--repeat 20]
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from enade.course_bitmaps import CourseBitmaps, top_k
+from enade.loader import FILE_MAPPING, read_table
+
+QUERIES = {
+    'sem filtro': {},
+    'Pública Federal + EaD + Nordeste': {'DESC_CATEGORIA': [' Pública Federal'], 'DESC_MODALIDADE': [' EaD'],
+                                         'DESC_REGIAO_CURSO': [' Região Nordeste (NE)']},
+    'Privadas + Sudeste/Sul': {'DESC_CATEGORIA': [' Privada com fins lucrativos', ' Privada sem fins lucrativos'],
+                               'DESC_REGIAO_CURSO': [' Região Sudeste (SE)', ' Região Sul (S)']},
+    'Curso + UF': {'DESC_CURSO': [' Direito'], 'DESC_UF_CURSO': [' São Paulo (SP)']},
+}
+
+
+def scaled_courses(curso, factor, seed=0):
+    rng = np.random.default_rng(seed)
+    df = curso.loc[curso.index.repeat(factor)].reset_index(drop=True)
+    means = rng.uniform(0, 100, len(df))
+    means[rng.random(len(df)) < 0.05] = np.nan # cursos sem participantes
+    return df, means
+
+
+def pandas_query(curso, means, filters, k):
+    mask = pd.Series(True, index=curso.index)
+    for col, values in filters.items():
+        mask &= curso[col].isin(values)
+    scores = pd.Series(means, index=curso.index)[mask].dropna().sort_values()
+    return scores.index[::-1][:k].to_numpy(), scores.index[:k].to_numpy()
+
+
+def bitmap_query(bitmaps, means, filters, k):
+    mask = bitmaps.mask(bitmaps.select(filters))
+    return top_k(means, mask, k), top_k(means, mask, k, largest=False)
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Filtros por bitmaps + top-k x pandas')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    base = read_table('curso', FILE_MAPPING['curso'])
+    print(f"{'escala':>7}{'cursos':>10}{'consulta':>36}{'selecionados':>14}"
+          f"{'pandas (ms)':>13}{'bitmap (ms)':>13}{'iguais':>8}")
+    for factor in args.scales:
+        curso, means = scaled_courses(base, factor)
+        t0 = time.perf_counter()
+        bitmaps = CourseBitmaps(curso)
+        build_s = time.perf_counter() - t0
+        print(f"{factor:>6}x{len(curso):>10}{'(construção dos bitmaps)':>36}{'':>14}{'-':>13}{build_s * 1e3:>13.1f}")
+        for name, filters in QUERIES.items():
+            pandas_s, (top_ref, bottom_ref) = timed(lambda: pandas_query(curso, means, filters, args.k), args.repeat)
+            bitmap_s, (top, bottom) = timed(lambda: bitmap_query(bitmaps, means, filters, args.k), args.repeat)
+            selected = int(bitmaps.mask(bitmaps.select(filters)).sum())
+            # Empates podem trocar a ordem entre cursos; compara as notas
+            same = np.array_equal(means[top], means[top_ref]) and np.array_equal(means[bottom], means[bottom_ref])
+            print(f"{'':>7}{'':>10}{name:>36}{selected:>14}{pandas_s * 1e3:>13.2f}{bitmap_s * 1e3:>13.2f}"
+                  f"{'sim' if same else 'NÃO':>8}")
+
+
+if __name__ == '__main__':
+    main()
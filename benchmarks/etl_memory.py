@@ -0,0 +1,81 @@
+# Memória de pico e tempo do ETL (enade.etl) sobre microdados sintéticos de tamanhos crescentes.
+# Cada execução roda num processo separado, para medir o pico de RSS de forma isolada.
+# Uso: python -m benchmarks.etl_memory [--rows 100000 1000000] [--workers 1 4]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Roda enade.etl e informa o pico de RSS do próprio processo e dos workers (ru_maxrss, KiB no Linux)
+RUNNER = """
+import resource, sys
+from enade.etl import main
+sys.argv = ['enade.etl'] + sys.argv[1:]
+main()
+peak = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+sys.stderr.write(str(peak))
+"""
+
+HEADER = ['NU_ANO', 'CO_IES', 'CO_CATEGAD', 'CO_ORGACAD', 'CO_GRUPO', 'CO_CURSO', 'CO_MODALIDADE',
+          'CO_MUNIC_CURSO', 'CO_UF_CURSO', 'CO_REGIAO_CURSO', 'NU_IDADE', 'TP_SEXO',
+          'NT_GER', 'NT_FG', 'NT_CE', 'QE_I02', 'QE_I04', 'QE_I05', 'QE_I08']
+
+
+def write_microdata(path, rows, years=(2022,), seed=0, block=200_000):
+    """Microdados sintéticos (um aluno por linha) com os cursos de CURSO.csv."""
+    rng = np.random.default_rng(seed)
+    cursos = pd.read_csv('CURSO.csv', sep=';')
+    cursos = cursos[cursos['CO_CURSO'] > 0]
+    with open(path, 'w', encoding='latin-1') as f:
+        f.write(';'.join(HEADER) + '\n')
+        written = 0
+        while written < rows:
+            n = min(block, rows - written)
+            c = cursos.iloc[rng.integers(0, len(cursos), n)]
+            nota = rng.normal(45, 15, n).clip(0, 100)
+            missing = rng.random(n) < 0.05
+            fmt = lambda v: np.where(missing, '', np.char.replace(np.round(v, 1).astype(str), '.', ','))
+            df = pd.DataFrame({
+                'NU_ANO': rng.choice(years, n), 'CO_IES': 1, 'CO_CATEGAD': c['CO_CATEGORIA'].to_numpy(),
+                'CO_ORGACAD': 10028, 'CO_GRUPO': c['CO_GRUPO'].to_numpy(), 'CO_CURSO': c['CO_CURSO'].to_numpy(),
+                'CO_MODALIDADE': c['CO_MODALIDADE'].to_numpy(), 'CO_MUNIC_CURSO': 0,
+                'CO_UF_CURSO': c['CO_UF_CURSO'].to_numpy(), 'CO_REGIAO_CURSO': c['CO_REGIAO_CURSO'].to_numpy(),
+                'NU_IDADE': rng.integers(18, 60, n), 'TP_SEXO': rng.choice(['F', 'M', 'N'], n, p=[.55, .44, .01]),
+                'NT_GER': fmt(nota), 'NT_FG': fmt(nota * 0.9), 'NT_CE': fmt(nota * 1.05),
+                'QE_I02': rng.choice(list('ABCDEF'), n), 'QE_I04': rng.choice(list('ABCDEF'), n),
+                'QE_I05': rng.choice(list('ABCDEF'), n), 'QE_I08': rng.choice(list('ABCDEFG'), n),
+            })
+            df.to_csv(f, sep=';', header=False, index=False)
+            written += n
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memória de pico do ETL x tamanho da entrada')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--chunk-mb', type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10}{'arquivo (MiB)':>15}{'workers':>9}{'tempo (s)':>11}{'pico RSS (MiB)':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f'microdados_{rows}.txt')
+            write_microdata(path, rows)
+            size = os.path.getsize(path) / 2**20
+            for workers in args.workers:
+                t0 = time.perf_counter()
+                proc = subprocess.run([sys.executable, '-c', RUNNER, path, '--out', os.path.join(tmp, 'out'),
+                                       '--workers', str(workers), '--chunk-mb', str(args.chunk_mb)],
+                                      check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+                elapsed = time.perf_counter() - t0
+                peak = int(proc.stderr.strip().splitlines()[-1])
+                print(f"{rows:>10}{size:>15.1f}{workers:>9}{elapsed:>11.2f}{peak / 1024:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
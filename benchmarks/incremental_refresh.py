@@ -0,0 +1,109 @@
+# Atualização dos dados com o dashboard no ar: SnapshotStore.refresh (lê só o delta dos CSVs
+# e atualiza os anos já montados) x recarga completa (cache descartado, CSVs relidos e
+# star/cubo/sketches remontados), numa cópia dos CSVs com as linhas das tabelas
+# particionadas replicadas factor x. Cenários: linhas acrescentadas ao fim dos CSVs de um
+# ano já montado e uma linha corrigida no meio dos CSVs.
+# Uso: python -m benchmarks.incremental_refresh [--scales 1 10] [--rows 1000] [--dir /tmp/enade_refresh]
+import argparse
+import glob
+import os
+import shutil
+import time
+
+import numpy as np
+
+from enade.loader import CACHE_DIR, FACT_KEY, FILE_MAPPING
+from enade.snapshot import SnapshotStore
+
+PARTITIONED = [info['fname'] for info in FILE_MAPPING.values() if info.get('partition_by')]
+
+
+def copy_scaled(src, dst, factor):
+    # CSVs copiados para dst; os particionados com as linhas de dados repetidas factor x
+    shutil.rmtree(dst, ignore_errors=True)
+    os.makedirs(dst)
+    for path in glob.glob(os.path.join(src, '*.csv')):
+        target = os.path.join(dst, os.path.basename(path))
+        if os.path.basename(path) not in PARTITIONED:
+            shutil.copy(path, target)
+            continue
+        with open(path) as f:
+            header, *lines = f.readlines()
+        with open(target, 'w') as f:
+            f.write(header + ''.join(lines) * factor)
+
+
+def append_rows(base_dir, rows):
+    # Repete no fim de cada CSV particionado as `rows` primeiras linhas de dados
+    for fname in PARTITIONED:
+        path = os.path.join(base_dir, fname)
+        with open(path) as f:
+            lines = f.readlines()[1:rows + 1]
+        with open(path, 'a') as f:
+            f.writelines(lines)
+
+
+def correct_row(base_dir):
+    # Troca uma linha do meio de cada CSV particionado pela seguinte (o trecho já processado muda)
+    for fname in PARTITIONED:
+        path = os.path.join(base_dir, fname)
+        with open(path) as f:
+            lines = f.readlines()
+        middle = len(lines) // 2
+        lines[middle] = lines[middle + 1]
+        with open(path, 'w') as f:
+            f.writelines(lines)
+
+
+def full_reload(base_dir, values):
+    shutil.rmtree(os.path.join(base_dir, CACHE_DIR), ignore_errors=True)
+    snapshot = SnapshotStore(base_dir=base_dir).refresh()
+    return snapshot.select(values)
+
+
+def same_view(a, b):
+    if len(a['star']) != len(b['star']):
+        return False
+    total = lambda view: view['cube'].select_dtypes('number').sum().to_numpy()
+    return np.allclose(total(a), total(b), equal_nan=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Atualização incremental x recarga completa dos dados')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--dir', default='/tmp/enade_refresh')
+    args = parser.parse_args()
+
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'escala':>7}{'linhas fato':>13}{'cenário':>12}{'completa (ms)':>15}{'incremental (ms)':>18}"
+          f"{'atualização':>24}{'iguais':>8}")
+    for factor in args.scales:
+        for scenario, change in (('acréscimo', lambda d: append_rows(d, args.rows)), ('correção', correct_row)):
+            copy_scaled(src, args.dir, factor)
+            store = SnapshotStore(base_dir=args.dir)
+            snapshot = store.refresh()
+            values = snapshot.partition_values()
+            snapshot.select(values)
+            time.sleep(0.01) # garante mtime diferente
+            change(args.dir)
+            t0 = time.perf_counter()
+            view = store.refresh().select(values)
+            incremental_s = time.perf_counter() - t0
+            report = store.last_report
+            done = f"{len(report['acrescentados'])} acresc./{len(report['remontados'])} remont."
+            rows = len(view['tables'][FACT_KEY])
+            reload_dir = args.dir + '_full'
+            shutil.rmtree(reload_dir, ignore_errors=True)
+            shutil.copytree(args.dir, reload_dir, ignore=shutil.ignore_patterns(CACHE_DIR))
+            t0 = time.perf_counter()
+            reference = full_reload(reload_dir, values)
+            full_s = time.perf_counter() - t0
+            print(f"{factor:>6}x{rows:>13}{scenario:>12}{full_s * 1e3:>15.1f}{incremental_s * 1e3:>18.1f}"
+                  f"{done:>24}{'sim' if same_view(view, reference) else 'NÃO':>8}")
+            shutil.rmtree(reload_dir, ignore_errors=True)
+    shutil.rmtree(args.dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
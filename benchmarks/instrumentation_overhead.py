@@ -0,0 +1,65 @@
+# Custo da instrumentação (enade.instrument): tempo por etapa medida com o gravador desligado
+# (objeto vazio) e ligado, e p50 do rerun completo do dashboard via AppTest sem e com
+# ENADE_PROFILE=1 (log JSON lines num arquivo temporário).
+# Uso: python -m benchmarks.instrumentation_overhead [--spans 200000] [--reruns 10] [--script gemini.py]
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from enade import instrument
+
+
+def span_cost(enabled, spans):
+    # Custo médio (ns) de uma etapa com span + output, como no caminho quente do dashboard
+    df = pd.DataFrame({'x': range(10)})
+    recorder = instrument.start('benchmark', enabled)
+    t0 = time.perf_counter()
+    for _ in range(spans):
+        with instrument.span('etapa', rows_in=df) as span:
+            span.output(df)
+    elapsed = time.perf_counter() - t0
+    instrument.finish(recorder)
+    return elapsed / spans * 1e9
+
+
+def rerun_times(script, reruns, enabled, log_path):
+    from streamlit.testing.v1 import AppTest
+    os.environ['ENADE_PROFILE'] = '1' if enabled else '0'
+    os.environ['ENADE_PROFILE_LOG'] = log_path
+    at = AppTest.from_file(os.path.abspath(script), default_timeout=600).run()
+    times = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - t0)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Custo da instrumentação desligada x ligada')
+    parser.add_argument('--spans', type=int, default=200_000)
+    parser.add_argument('--reruns', type=int, default=10)
+    parser.add_argument('--script', default='gemini.py')
+    args = parser.parse_args()
+
+    print(f"{'medida':<28}{'desligada':>12}{'ligada':>12}")
+    off, on = span_cost(False, args.spans), span_cost(True, args.spans)
+    print(f"{'etapa (ns)':<28}{off:>12.0f}{on:>12.0f}")
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'perf.jsonl')
+        off = rerun_times(args.script, args.reruns, False, log_path)
+        on = rerun_times(args.script, args.reruns, True, log_path)
+        with open(log_path, encoding=instrument.LOG_ENCODING) as f:
+            lines = sum(1 for _ in f)
+    print(f"{'rerun completo p50 (ms)':<28}{statistics.median(off) * 1e3:>12.1f}{statistics.median(on) * 1e3:>12.1f}")
+    print(f"{'linhas no log':<28}{0:>12}{lines:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Latência das interações da seção "Desempenho por Curso" (slider e selectbox) via AppTest:
+# rerun completo do script (comportamento sem st.fragment) x rerun só do fragmento que contém
+# o widget, como o navegador pede quando o widget está dentro de um st.fragment.
+# Uso: python -m benchmarks.interaction_latency [--repeat 20] [--script gemini.py]
+import argparse
+import os
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.common import course_selectbox, run_fragment, widget_fragments
+
+
+def _interactions(at, repeat):
+    # Alterna entre valores do slider e cursos do selectbox para evitar reruns idênticos
+    slider = at.slider[0]
+    lo, hi = int(slider.min), int(slider.max)
+    values = [lo + (hi - lo) * i // max(repeat - 1, 1) for i in range(repeat)]
+    courses = course_selectbox(at).options
+    for i in range(repeat):
+        yield 'slider', lambda at, v=values[i]: at.slider[0].set_value(v)
+        yield 'selectbox', lambda at, c=courses[i % len(courses)]: course_selectbox(at).set_value(c)
+
+
+def measure(script, repeat, fragment_only):
+    script = os.path.abspath(script)
+    fragments = widget_fragments(script) if fragment_only else {}
+    if fragment_only and not fragments:
+        return None
+    at = AppTest.from_file(script, default_timeout=600).run()
+    times = {}
+    for widget, interact in _interactions(at, repeat):
+        if fragments:
+            # Após um rerun de fragmento a árvore só tem os elementos dele; refaz a página
+            # inteira (fora da medição) para achar o widget
+            at.run()
+        interact(at)
+        t0 = time.perf_counter()
+        if widget in fragments:
+            run_fragment(at, fragments[widget])
+        else:
+            at.run()
+        times.setdefault(widget, []).append(time.perf_counter() - t0)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latência do slider/selectbox: rerun completo x fragmento')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--script', default='gemini.py')
+    args = parser.parse_args()
+
+    print(f"{'rerun':<12}{'widget':<11}{'p50 (ms)':>10}{'p95 (ms)':>10}{'máx (ms)':>10}")
+    for label, fragment_only in (('completo', False), ('fragmento', True)):
+        times = measure(args.script, args.repeat, fragment_only)
+        if times is None:
+            print(f"{label:<12}(o script não tem st.fragment)")
+            continue
+        for widget, values in times.items():
+            values = sorted(values)
+            p95 = values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))]
+            print(f"{label:<12}{widget:<11}{statistics.median(values) * 1e3:>10.1f}{p95 * 1e3:>10.1f}"
+                  f"{values[-1] * 1e3:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
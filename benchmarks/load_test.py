@@ -0,0 +1,226 @@
+# Teste de carga com N sessões simultâneas contra um servidor Streamlit de verdade
+# (`streamlit run` headless num subprocesso, uma instância: mesmo st.cache_resource, mesmo GIL).
+# Cada sessão é um cliente websocket que fala o protocolo do navegador: faz a carga inicial da
+# página e depois alterna o slider de mínimo de participantes e o curso do detalhe, pedindo
+# rerun só do fragmento do widget e enviando o estado de todos os widgets, como o navegador faz.
+# Os dados são CSVs sintéticos (benchmarks.synthetic) de várias edições gravados num diretório
+# temporário. Para cada N: vazão (reruns/s), p50/p95/p99 da latência por tipo de rerun, RSS do
+# servidor e erros (exceções do script, execuções que não terminam bem, falhas de conexão e
+# tracebacks no log do servidor).
+# Uso: python -m benchmarks.load_test [--sessions 1 2 4 8 16] [--rows 1000000] [--years 2019 2020 2021 2022 2023] [--interactions 5] [--think-ms 0]
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from benchmarks.common import COURSE_LABEL, rss_mib
+from benchmarks.synthetic import synthetic_tables, write_csvs
+
+KINDS = ('carga', 'slider', 'selectbox')
+TIMEOUT = 600
+# Execuções que terminam bem: página inteira e só um fragmento
+FINISHED_OK = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY}
+
+
+# --- Servidor ---
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(script, data_dir, port, log):
+    """Sobe `streamlit run` headless no diretório dos dados e espera o health check."""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', script, '--server.headless', 'true',
+         '--server.address', '127.0.0.1', '--server.port', str(port),
+         '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+        cwd=data_dir, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'o servidor saiu com código {server.returncode}')
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1) as r:
+                if r.read() == b'ok':
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('o servidor não respondeu ao health check')
+
+
+def _log_tracebacks(path):
+    with open(path, errors='replace') as f:
+        return f.read().count('Traceback')
+
+
+# --- Cliente ---
+
+class Session:
+    """Uma aba do navegador: guarda os widgets da página e o estado enviado a cada rerun."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}  # 'slider'/'selectbox' -> (elemento, id do fragmento)
+        self.states = {}   # id do widget -> (tipo, valor)
+        self.errors = []
+
+    async def rerun(self, fragment_id=''):
+        """Pede um rerun (da página ou de um fragmento) e espera o script_finished."""
+        back = BackMsg()
+        client = back.rerun_script
+        client.query_string = ''
+        client.fragment_id = fragment_id
+        for widget_id, (kind, value) in self.states.items():
+            state = client.widget_states.widgets.add()
+            state.id = widget_id
+            if kind == 'slider':
+                state.double_array_value.data.extend([value])
+            else:
+                state.string_value = value
+        await self.ws.send(back.SerializeToString())
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof('type')
+            if kind == 'script_finished':
+                if msg.script_finished not in FINISHED_OK:
+                    self.errors.append(f'script_finished {msg.script_finished}')
+                return
+            if kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                self._element(msg.delta.new_element, msg.delta.fragment_id)
+
+    def _element(self, element, fragment_id):
+        kind = element.WhichOneof('type')
+        if kind == 'exception':
+            self.errors.append(f'{element.exception.type}: {element.exception.message}')
+        elif kind == 'slider':
+            self.widgets['slider'] = (element.slider, fragment_id)
+        elif kind == 'selectbox' and element.selectbox.label.startswith(COURSE_LABEL):
+            self.widgets['selectbox'] = (element.selectbox, fragment_id)
+
+    def interact(self, kind, rng):
+        """Escolhe um valor para o widget (dentro da faixa do slider, um curso ao acaso) e devolve
+        o fragmento a rerodar."""
+        element, fragment_id = self.widgets[kind]
+        if kind == 'slider':
+            steps = int((element.max - element.min) // (element.step or 1))
+            self.states[element.id] = (kind, element.min + (element.step or 1) * rng.randint(0, steps))
+        else:
+            self.states[element.id] = (kind, rng.choice(element.options))
+        return fragment_id
+
+
+async def session(url, origin, interactions, think, seed, times, errors):
+    """Uma sessão: carga inicial + `interactions` pares slider/selectbox; latências em `times`."""
+    rng = random.Random(seed)
+    s = None
+    try:
+        async with websockets.connect(url, subprotocols=['streamlit'], origin=origin, max_size=None) as ws:
+            s = Session(ws)
+            t0 = time.perf_counter()
+            await asyncio.wait_for(s.rerun(), TIMEOUT)
+            times.append(('carga', time.perf_counter() - t0))
+            missing = {'slider', 'selectbox'} - set(s.widgets)
+            if missing:
+                raise RuntimeError(f"widgets ausentes na página: {', '.join(sorted(missing))}")
+            for _ in range(interactions):
+                for kind in ('slider', 'selectbox'):
+                    if think:
+                        await asyncio.sleep(rng.expovariate(1 / think))
+                    fragment_id = s.interact(kind, rng)
+                    t0 = time.perf_counter()
+                    await asyncio.wait_for(s.rerun(fragment_id), TIMEOUT)
+                    times.append((kind, time.perf_counter() - t0))
+    except Exception as e:
+        errors.append(repr(e))
+    finally:
+        if s is not None:
+            errors.extend(s.errors)
+
+
+async def _gather(url, origin, sessions, interactions, think, times, errors):
+    await asyncio.gather(*(session(url, origin, interactions, think, i, times, errors)
+                           for i in range(sessions)))
+
+
+def load_level(port, sessions, interactions, think):
+    """N sessões simultâneas: (latências por tipo, segundos de parede, erros)."""
+    times, errors = [], []
+    url, origin = f'ws://127.0.0.1:{port}/_stcore/stream', f'http://127.0.0.1:{port}'
+    t0 = time.perf_counter()
+    asyncio.run(_gather(url, origin, sessions, interactions, think, times, errors))
+    elapsed = time.perf_counter() - t0
+    by_kind = {kind: np.array([t for k, t in times if k == kind]) for kind in KINDS}
+    by_kind['todos'] = np.array([t for _, t in times])
+    return by_kind, elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vazão, latência e RSS com N sessões simultâneas')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='linhas da fato sintética (todas as edições)')
+    parser.add_argument('--years', type=int, nargs='+', default=[2019, 2020, 2021, 2022, 2023])
+    parser.add_argument('--interactions', type=int, default=5, help='pares slider/selectbox por sessão')
+    parser.add_argument('--think-ms', type=float, default=0, help='pausa média entre interações (exponencial)')
+    parser.add_argument('--script', default='gemini.py')
+    parser.add_argument('--port', type=int, default=0, help='porta do servidor (0: uma livre)')
+    args = parser.parse_args()
+
+    script = os.path.abspath(args.script)
+    port = args.port or _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        # O script lê os CSVs do diretório atual: o servidor roda no diretório dos dados sintéticos
+        write_csvs(synthetic_tables(args.rows, years=args.years), tmp)
+        log_path = os.path.join(tmp, 'server.log')
+        with open(log_path, 'wb') as log:
+            server = start_server(script, tmp, port, log)
+            try:
+                # Sessão de aquecimento (fora da medição): carrega os dados no cache do servidor
+                by_kind, elapsed, errors = load_level(port, 1, 0, 0)
+                print(f"carga a frio: {elapsed:.1f} s | RSS do servidor {rss_mib(server.pid):.0f} MiB"
+                      + ''.join(f"\n  erro: {error}" for error in errors[:3]))
+                print(f"{'sessões':>8}{'reruns':>8}{'vazão (/s)':>12}{'tipo':>11}"
+                      f"{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'RSS (MiB)':>11}{'erros':>7}")
+                tracebacks = _log_tracebacks(log_path)
+                for n in args.sessions:
+                    by_kind, elapsed, errors = load_level(port, n, args.interactions, args.think_ms / 1e3)
+                    rss = rss_mib(server.pid)
+                    # Exceções fora do script (no servidor) só aparecem no log
+                    total = _log_tracebacks(log_path)
+                    errors += ['traceback no log do servidor'] * (total - tracebacks)
+                    tracebacks = total
+                    for i, (kind, values) in enumerate(by_kind.items()):
+                        if not len(values):
+                            continue
+                        p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1e3
+                        lead = (f"{n:>8}{len(by_kind['todos']):>8}{len(by_kind['todos']) / elapsed:>12.2f}"
+                                if i == 0 else f"{'':>28}")
+                        tail = f"{rss:>11.0f}{len(errors):>7}" if i == 0 else ''
+                        print(f"{lead}{kind:>11}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{tail}")
+                    for error in errors[:3]:
+                        print(f"  erro: {error}")
+            finally:
+                server.terminate()
+                try:
+                    server.wait(10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+                    server.wait()
+
+
+if __name__ == '__main__':
+    main()
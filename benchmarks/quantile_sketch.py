@@ -0,0 +1,71 @@
+# Erro e tempo dos quantis por fusão de t-digests (enade.sketch) x quantis exatos do pandas,
+# em rollups por ano, região, categoria e curso sobre o star replicado factor x.
+# Uso: python -m benchmarks.quantile_sketch [--scales 1 10 100] [--deltas 100 500 0]  (0 = exato)
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from enade.cube import BOX_QUANTILES, build_cube, build_sketches, rollup_quantiles
+from enade.loader import load_tables
+from enade.star import StarSchema
+
+ROLLUPS = [(), ('ANO',), ('DESC_REGIAO_CURSO',), ('DESC_CATEGORIA',), ('DESC_CURSO',)]
+
+
+def scaled_star(star, factor, seed=0):
+    # Replica as linhas com ruído nas notas para simular factor x o volume atual
+    rng = np.random.default_rng(seed)
+    df = star.loc[star.index.repeat(factor)].reset_index(drop=True)
+    noise = rng.normal(0, 2, len(df)).astype('float32')
+    df['NOTA_TOTAL'] = (df['NOTA_TOTAL'] + noise).clip(0, 100)
+    return df
+
+
+def exact_quantiles(star, by):
+    grouped = star.groupby(list(by), observed=True)['NOTA_TOTAL'] if by else star['NOTA_TOTAL']
+    out = grouped.quantile(list(BOX_QUANTILES.values()))
+    if by:
+        return out.unstack().set_axis(list(BOX_QUANTILES), axis=1)
+    return pd.DataFrame([out.to_numpy()], columns=list(BOX_QUANTILES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quantis por fusão de sketches x pandas')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--deltas', type=int, nargs='+', default=[100, 500, 0])
+    args = parser.parse_args()
+
+    dims, fact = load_tables()
+    schema = StarSchema(dims)
+    base = schema.join(fact, ('tempo', 'curso'))
+    print(f"{'escala':>7}{'linhas':>11}{'delta':>7}{'rollup':>20}{'grupos':>8}"
+          f"{'pandas (ms)':>13}{'sketch (ms)':>13}{'erro máx':>10}{'erro médio':>12}")
+    for factor in args.scales:
+        star = scaled_star(base, factor)
+        cube = build_cube(star)
+        for delta in args.deltas:
+            t0 = time.perf_counter()
+            sketches = build_sketches(star, cube, delta=delta or None)
+            build_s = time.perf_counter() - t0
+            print(f"{factor:>6}x{len(star):>11}{delta or 'exato':>7}{'(construção)':>20}{len(cube):>8}"
+                  f"{'-':>13}{build_s * 1e3:>13.1f}")
+            for by in ROLLUPS:
+                t0 = time.perf_counter()
+                exact = exact_quantiles(star, by)
+                pandas_s = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                approx = rollup_quantiles(cube, sketches, by=by)
+                sketch_s = time.perf_counter() - t0
+                if by:
+                    approx = approx.set_index(list(by)).reindex(exact.index)
+                # Erro absoluto em pontos de nota, sobre Q1, mediana e Q3 de todos os grupos
+                err = np.abs(approx[list(BOX_QUANTILES)].to_numpy() - exact.to_numpy())
+                name = ', '.join(by) or 'geral'
+                print(f"{'':>7}{'':>11}{'':>7}{name:>20}{len(exact):>8}"
+                      f"{pandas_s * 1e3:>13.1f}{sketch_s * 1e3:>13.1f}{np.nanmax(err):>10.3f}{np.nanmean(err):>12.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Join as-of da dimensão CURSO versionada (VERSAO, DT_INI, DT_FIM): VersionIndex
+# (busca binária entre as versões de cada CO_CURSO) x merge por CO_CURSO seguido de filtro
+# pela vigência, em dados sintéticos com v versões por curso e linhas da fato em anos
+# aleatórios cuja FK aponta para uma versão qualquer do curso. "star" é o caminho do
+# dashboard (StarSchema.positions: só as linhas com versão fora da vigência são resolvidas).
+# Uso: python -m benchmarks.scd_join [--rows 100000 1000000] [--courses 10000] [--versions 2 5]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from enade.star import StarSchema, VersionIndex
+
+FIRST_YEAR = 2010
+
+
+def synthetic_versions(courses, versions, years, seed=0):
+    # Cada curso tem `versions` versões com inícios em anos sorteados (a primeira no FIRST_YEAR)
+    rng = np.random.default_rng(seed)
+    starts = np.sort(rng.choice(np.arange(FIRST_YEAR + 1, FIRST_YEAR + years), size=(courses, versions - 1)), axis=1)
+    starts = np.concatenate([np.full((courses, 1), FIRST_YEAR), starts], axis=1)
+    ends = np.concatenate([starts[:, 1:], np.full((courses, 1), FIRST_YEAR + 40)], axis=1)
+    keep = (starts < ends).ravel() # descarta versões de vigência vazia (inícios repetidos)
+    curso = pd.DataFrame({
+        'CO_CURSO': np.repeat(np.arange(courses) * 7 + 1, versions)[keep],
+        'VERSAO': np.tile(np.arange(1, versions + 1), courses)[keep],
+        'DT_INI': pd.Series(starts.ravel()[keep]).astype(str) + '-01-01',
+        'DT_FIM': pd.Series(ends.ravel()[keep]).astype(str) + '-01-01',
+    })
+    curso = curso.sample(frac=1, random_state=seed).reset_index(drop=True) # ordem arbitrária, como no CSV
+    curso['CURSO_KEY'] = np.arange(2, len(curso) + 2)
+    return curso
+
+
+def synthetic_fact(curso, rows, years, seed=1):
+    rng = np.random.default_rng(seed)
+    pos = rng.integers(0, len(curso), rows)
+    return pd.DataFrame({'D_CURSO_CURSO_KEY': curso['CURSO_KEY'].to_numpy()[pos],
+                         'D_TEMPO_TEMPO_KEY': rng.integers(FIRST_YEAR, FIRST_YEAR + years, rows),
+                         'CO_CURSO': curso['CO_CURSO'].to_numpy()[pos]})
+
+
+def as_of_join(index, fact):
+    days = (fact['D_TEMPO_TEMPO_KEY'].to_numpy(np.int64) - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype(np.int64)
+    return index.positions(fact['CO_CURSO'].to_numpy(), days)
+
+
+def merge_then_filter(curso, fact):
+    # Baseline: todas as versões do curso para cada linha (n x v) e depois o filtro da vigência
+    dims = curso[['CO_CURSO', 'DT_INI', 'DT_FIM']].reset_index(names='pos')
+    dims['DT_INI'] = pd.to_datetime(dims['DT_INI'])
+    dims['DT_FIM'] = pd.to_datetime(dims['DT_FIM'])
+    left = fact.reset_index(names='row').assign(DATA=pd.to_datetime(fact['D_TEMPO_TEMPO_KEY'].astype(str) + '-01-01'))
+    merged = left.merge(dims, on='CO_CURSO', how='left')
+    merged_rows = len(merged)
+    merged = merged[(merged['DT_INI'] <= merged['DATA']) & (merged['DATA'] < merged['DT_FIM'])]
+    out = np.full(len(fact), -1, dtype=np.int64)
+    out[merged['row'].to_numpy()] = merged['pos'].to_numpy()
+    return out, merged_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Join as-of com versões do CURSO x merge + filtro')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--courses', type=int, default=10_000)
+    parser.add_argument('--versions', type=int, nargs='+', default=[2, 5])
+    parser.add_argument('--years', type=int, default=12)
+    args = parser.parse_args()
+
+    print(f"{'versões':>8}{'linhas':>10}{'merge (linhas)':>16}{'merge+filtro (ms)':>19}"
+          f"{'índice (ms)':>13}{'as-of (ms)':>12}{'star (ms)':>11}{'iguais':>8}")
+    for versions in args.versions:
+        curso = synthetic_versions(args.courses, versions, args.years)
+        tempo = pd.DataFrame({'TEMPO_KEY': np.arange(FIRST_YEAR, FIRST_YEAR + args.years)})
+        tempo['ANO'] = tempo['TEMPO_KEY']
+        t0 = time.perf_counter()
+        index = VersionIndex(curso['CO_CURSO'].to_numpy(), curso['DT_INI'], curso['DT_FIM'])
+        build_s = time.perf_counter() - t0
+        schema = StarSchema({'curso': curso, 'tempo': tempo})
+        for rows in args.rows:
+            fact = synthetic_fact(curso, rows, args.years)
+            t0 = time.perf_counter()
+            expected, merged_rows = merge_then_filter(curso, fact)
+            merge_s = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            got = as_of_join(index, fact)
+            as_of_s = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            star_pos = schema.positions(fact, 'curso')
+            star_s = time.perf_counter() - t0
+            same = np.array_equal(got, expected) and np.array_equal(star_pos, expected)
+            print(f"{versions:>8}{rows:>10}{merged_rows:>16}{merge_s * 1e3:>19.1f}"
+                  f"{build_s * 1e3:>13.1f}{as_of_s * 1e3:>12.1f}{star_s * 1e3:>11.1f}{'sim' if same else 'NÃO':>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+# Memória residente por tabela: tipos inferidos (low_memory=False) x esquema declarado em FILE_MAPPING.
+# Uso: python -m benchmarks.schema_memory [--base-dir DIR]
+import argparse
+
+from enade.loader import FILE_MAPPING, schema_memory_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memória por tabela com e sem esquema tipado')
+    parser.add_argument('--base-dir', default='')
+    args = parser.parse_args()
+
+    report = schema_memory_report(FILE_MAPPING, base_dir=args.base_dir)
+    print(f"{'tabela':<14}{'inferido (KiB)':>16}{'esquema (KiB)':>16}{'redução':>10}")
+    for row in report.itertuples(index=False):
+        print(f"{row.tabela:<14}{row.sem_esquema / 1024:>16.1f}{row.com_esquema / 1024:>16.1f}{row.reducao:>10.1%}")
+    total_before, total_after = report['sem_esquema'].sum(), report['com_esquema'].sum()
+    print(f"{'total':<14}{total_before / 1024:>16.1f}{total_after / 1024:>16.1f}{1 - total_after / total_before:>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# Memória residente do processo com 1, 10 e 50 sessões simuladas segurando os dados de um rerun:
+# "cópia" reproduz o st.cache_data (cada chamada recebe uma cópia desserializada) mais o
+# .copy() do filtro por ano; "compartilhado" é o st.cache_resource (mesmos objetos para todos)
+# com o filtro como máscara booleana. Cada medição roda num subprocesso próprio.
+# Uso: python -m benchmarks.session_memory [--sessions 1 10 50] [--scale 10]
+import argparse
+import gc
+import json
+import pickle
+import subprocess
+import sys
+
+import pandas as pd
+
+from benchmarks.common import rss_mib
+from enade.cube import build_cube, build_sketches
+from enade.demographics import DEMOGRAPHIC_TABLES, DemographicKernel
+from enade.loader import load_tables
+from enade.star import StarSchema
+
+MODES = ('cópia', 'compartilhado')
+
+
+def shared_dataset(scale):
+    # O que o dashboard guarda em cache: dimensões, star, cubo, kernel demográfico e sketches
+    dims, fact = load_tables()
+    if scale > 1:
+        fact = fact.loc[fact.index.repeat(scale)].reset_index(drop=True)
+    schema = StarSchema(dims)
+    star = schema.join(fact, ('tempo', 'curso'))
+    cube = build_cube(star)
+    kernel = DemographicKernel({k: dims[k] for k in DEMOGRAPHIC_TABLES if k in dims}, dims['curso'])
+    return {'dims': dims, 'star': star, 'cube': cube, 'kernel': kernel, 'sketches': build_sketches(star, cube)}
+
+
+def open_session(dataset, mode, years):
+    if mode == 'cópia':
+        session = {name: pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)) for name, obj in dataset.items()}
+        star = session['star']
+        session['year_rows'] = star[star['ANO'].isin(years)].copy()
+    else:
+        session = dict(dataset)
+        session['year_rows'] = dataset['star']['ANO'].isin(years).to_numpy()
+    return session
+
+
+def worker(mode, sessions, scale):
+    pd.set_option('mode.copy_on_write', True)
+    dataset = shared_dataset(scale)
+    years = dataset['star']['ANO'].unique().tolist()
+    gc.collect()
+    before = rss_mib()
+    # Sessões simultâneas: todas vivas ao mesmo tempo, como reruns concorrentes
+    alive = [open_session(dataset, mode, years) for _ in range(sessions)]
+    gc.collect()
+    after = rss_mib()
+    print(json.dumps({'rows': len(dataset['star']), 'before': before, 'after': after, 'alive': len(alive)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memória x número de sessões: cópias x dados compartilhados')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--scale', type=int, default=10, help='replica a tabela fato factor x')
+    parser.add_argument('--worker', nargs=3, metavar=('MODO', 'SESSOES', 'ESCALA'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        mode, sessions, scale = args.worker
+        return worker(mode, int(sessions), int(scale))
+
+    print(f"{'modo':<15}{'sessões':>9}{'linhas':>10}{'RSS base (MiB)':>16}{'RSS final (MiB)':>17}{'MiB/sessão':>12}")
+    for mode in MODES:
+        for sessions in args.sessions:
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.session_memory', '--worker', mode,
+                                  str(sessions), str(args.scale)], check=True, capture_output=True, text=True)
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            per_session = (r['after'] - r['before']) / sessions
+            print(f"{mode:<15}{sessions:>9}{r['rows']:>10}{r['before']:>16.1f}{r['after']:>17.1f}{per_session:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
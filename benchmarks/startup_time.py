@@ -0,0 +1,93 @@
+# Tempo de inicialização do dashboard num processo novo (como após um deploy/restart):
+# time-to-first-render = início do processo até o primeiro elemento enviado ao navegador;
+# time-to-fully-loaded = até o fim da primeira execução do script.
+# Cada medição roda o gemini.py via AppTest num subprocesso; --cold mede numa cópia dos CSVs
+# num diretório temporário, apagando o cache colunar dela antes de cada execução (o
+# .enade_cache do app, que um servidor no ar pode estar lendo, não é tocado).
+# Uso: python -m benchmarks.startup_time [--repeat 3] [--cold] [--base-dir DIR]
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from enade.loader import CACHE_DIR, FILE_MAPPING
+
+RUNNER = """
+import json, os, sys, time
+t0 = float(sys.argv[1])
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+from streamlit.testing.v1 import AppTest
+
+marks = {}
+enqueue = ScriptRunContext.enqueue
+
+def timed_enqueue(self, msg):
+    # Primeiro delta (elemento visível) enviado pelo script
+    if 'first_render' not in marks and msg.WhichOneof('type') == 'delta':
+        marks['first_render'] = time.time() - t0
+    return enqueue(self, msg)
+
+ScriptRunContext.enqueue = timed_enqueue
+marks['imports'] = time.time() - t0
+at = AppTest.from_file(os.path.abspath(sys.argv[2]), default_timeout=600).run()
+marks['fully_loaded'] = time.time() - t0
+marks['errors'] = [e.value for e in at.error] + [str(e.value) for e in at.exception]
+print(json.dumps(marks))
+"""
+
+
+def measure(script, cwd):
+    t0 = time.time()
+    out = subprocess.run([sys.executable, '-c', RUNNER, repr(t0), script], cwd=cwd, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def copy_csvs(base_dir, dst):
+    # CSVs do mapeamento que existem em base_dir (os ausentes viram o erro normal do app)
+    for info in FILE_MAPPING.values():
+        path = os.path.join(base_dir, info['fname'])
+        if os.path.exists(path):
+            shutil.copy(path, dst)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time-to-first-render e time-to-fully-loaded do dashboard')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cold', action='store_true',
+                        help='sem cache colunar (numa cópia dos CSVs num diretório temporário)')
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--script', default='gemini.py')
+    args = parser.parse_args()
+
+    script = os.path.abspath(os.path.join(args.base_dir, args.script)) # relativo a base_dir, como antes
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = args.base_dir
+        if args.cold:
+            copy_csvs(args.base_dir, tmp)
+            cwd = tmp
+        for _ in range(args.repeat):
+            if args.cold:
+                shutil.rmtree(os.path.join(tmp, CACHE_DIR), ignore_errors=True)
+            marks = measure(script, cwd)
+            if marks['errors']:
+                print('erros na execução:', marks['errors'])
+            runs.append(marks)
+
+    mode = 'frio (sem cache colunar)' if args.cold else 'cache colunar pronto'
+    print(f"{args.repeat} execuções, {mode}; tempos desde o início do processo")
+    print(f"{'marco':<34}{'mín (ms)':>12}{'mediana (ms)':>15}")
+    for key, label in (('imports', 'streamlit + AppTest importados'), ('first_render', 'time-to-first-render'),
+                       ('fully_loaded', 'time-to-fully-loaded')):
+        values = [r[key] for r in runs if key in r]
+        print(f"{label:<34}{min(values) * 1e3:>12.1f}{statistics.median(values) * 1e3:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
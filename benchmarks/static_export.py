@@ -0,0 +1,42 @@
+# Tempo da exportação estática (enade.export) por etapa, com 1 e N processos para as páginas
+# de curso, e tamanho do pacote gerado, sobre CSVs sintéticos (benchmarks.synthetic) de
+# várias edições gravados num diretório temporário.
+# Uso: python -m benchmarks.static_export [--rows 100000 1000000] [--years 2021 2022 2023] [--workers 1 4]
+import argparse
+import os
+import tempfile
+
+from benchmarks.synthetic import synthetic_tables, write_csvs
+from enade.export import export
+
+
+def bundle_size(out):
+    files = [os.path.join(d, f) for d, _, names in os.walk(out) for f in names]
+    return len(files), sum(os.path.getsize(f) for f in files) / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo da exportação estática por etapa e processos')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--years', type=int, nargs='+', default=[2021, 2022, 2023])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    header = None
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_csvs(synthetic_tables(rows, years=args.years), tmp)
+            for workers in dict.fromkeys(args.workers):
+                out = os.path.join(tmp, f'export_{workers}')
+                timings = export(out, args.years, workers, base_dir=tmp)
+                if header is None:
+                    header = list(timings)
+                    print(f"{'linhas':>10}{'processos':>10}" + ''.join(f'{s:>18}' for s in header)
+                          + f"{'total (s)':>12}{'arquivos':>10}{'MiB':>8}")
+                files, size = bundle_size(out)
+                print(f"{rows:>10}{workers:>10}" + ''.join(f'{timings[s]:>18.2f}' for s in header)
+                      + f"{sum(timings.values()):>12.2f}{files:>10}{size:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
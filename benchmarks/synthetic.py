@@ -0,0 +1,117 @@
+# Gerador de dados sintéticos no esquema do dashboard (FILE_MAPPING): TEMPO, CURSO, IDADE,
+# DESEMPENHO (n linhas) e SEXO/COR/RENDA/ESCOLARIDADE (uma linha por curso x ano), com os
+# mesmos nomes de colunas e tipos que read_table devolve. Usado pelos benchmarks de escala.
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+from enade.loader import FILE_MAPPING
+
+CATEGORIES = [' Pública Federal', ' Pública Estadual', ' Pública Municipal', ' Privada com fins lucrativos',
+              ' Privada sem fins lucrativos', ' Especial']
+MODALITIES = [' Presencial', ' EaD']
+REGIONS = {1: ' Região Norte (N)', 2: ' Região Nordeste (NE)', 3: ' Região Sudeste (SE)', 4: ' Região Sul (SUL)',
+           5: ' Região Centro-Oeste (CO)'}
+STATES = {11: ' Rondônia (RO)', 13: ' Amazonas (AM)', 15: ' Pará (PA)', 23: ' Ceará (CE)', 26: ' Pernambuco (PE)',
+          29: ' Bahia (BA)', 31: ' Minas gerais (MG)', 33: ' Rio de Janeiro (RJ)', 35: ' São Paulo (SP)',
+          41: ' Paraná (PR)', 43: ' Rio Grande do Sul (RS)', 52: ' Goiás (GO)', 53: ' Distrito federal (DF)'}
+GROUPS = [' Administração', ' Direito', ' Ciências Econômicas', ' Psicologia', ' Ciências Contábeis', ' Turismo',
+          ' Serviço Social', ' Secretariado Executivo', ' Relações Internacionais', ' Jornalismo', ' Publicidade e Propaganda',
+          ' Design', ' Teologia', ' Tecnologia em Gestão Financeira', ' Tecnologia em Marketing',
+          ' Tecnologia em Gestão de Recursos Humanos', ' Tecnologia em Logística', ' Tecnologia em Processos Gerenciais',
+          ' Tecnologia em Gestão Comercial', ' Tecnologia em Design de Moda']
+AGE_GROUPS = ['Até 24 anos', '25 a 29 anos', '30 anos ou mais']
+# Colunas QTD_* de cada tabela demográfica, na ordem do esquema
+DEMOGRAPHIC_COLUMNS = {key: [c for c in FILE_MAPPING[key]['dtypes'] if c.startswith('QTD_')]
+                       for key in ('sexo', 'cor', 'renda', 'escolaridade')}
+
+
+def _typed(key, df):
+    dtypes = FILE_MAPPING[key]['dtypes']
+    return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+
+
+def synthetic_courses(courses, first_year, rng):
+    """Dimensão CURSO com uma versão por curso (vigente desde first_year) e a linha 'vazia' de chave 1."""
+    states = np.array(list(STATES))
+    uf = states[rng.integers(0, len(states), courses)]
+    region = uf // 10
+    group = rng.integers(0, len(GROUPS), courses)
+    category = rng.integers(0, len(CATEGORIES), courses)
+    modality = rng.integers(0, len(MODALITIES), courses)
+    curso = pd.DataFrame({
+        'CURSO_KEY': np.arange(2, courses + 2),
+        'CO_CURSO': np.arange(1, courses + 1) * 7,
+        'DESC_CURSO': np.array(GROUPS)[group],
+        'CO_CATEGORIA': category + 1,
+        'DESC_CATEGORIA': np.array(CATEGORIES)[category],
+        'CO_GRUPO': group + 1,
+        'DESC_GRUPO': np.array(GROUPS)[group],
+        'CO_MODALIDADE': modality + 1,
+        'DESC_MODALIDADE': np.array(MODALITIES)[modality],
+        'CO_UF_CURSO': uf,
+        'DESC_UF_CURSO': [STATES[u] for u in uf],
+        'CO_REGIAO_CURSO': region,
+        'DESC_REGIAO_CURSO': [REGIONS[r] for r in region],
+        'VERSAO': 1,
+        'DT_INI': f'{first_year}-01-01',
+        'DT_FIM': '2051-01-01',
+    })
+    # Linha de chave 1 sem curso, como no CSV do DW
+    empty = {col: (0 if col.startswith('CO_') else None) for col in curso.columns}
+    empty.update(CURSO_KEY=1, VERSAO=1)
+    return pd.concat([pd.DataFrame([empty]), curso], ignore_index=True)
+
+
+def synthetic_tables(rows, courses=None, years=(2022,), seed=0):
+    """Tabelas do dashboard com `rows` linhas na fato, distribuídas entre `courses` cursos e os anos."""
+    rng = np.random.default_rng(seed)
+    years = sorted(years)
+    courses = courses or int(np.clip(rows // 100, 100, 50_000))
+    curso = synthetic_courses(courses, years[0], rng)
+    keys = curso['CURSO_KEY'].to_numpy()[1:]
+    # Cursos com tamanhos desiguais (alguns concentram muitos participantes) e nota média própria
+    weights = rng.pareto(1.5, courses) + 1
+    course_pos = rng.choice(courses, size=rows, p=weights / weights.sum())
+    course_mean = rng.normal(45, 12, courses)
+    total = (course_mean[course_pos] + rng.normal(0, 15, rows)).clip(0, 100)
+    general = (total + rng.normal(0, 8, rows)).clip(0, 100)
+    tables = {
+        'tempo': _typed('tempo', pd.DataFrame({'TEMPO_KEY': years, 'ANO': years})),
+        'curso': _typed('curso', curso),
+        'idade': _typed('idade', pd.DataFrame({'IDADE_KEY': np.arange(1, len(AGE_GROUPS) + 1), 'IDADE': AGE_GROUPS})),
+        'desempenho': _typed('desempenho', pd.DataFrame({
+            'NOTA_TOTAL': total.round(1),
+            'NOTAL_GERAL': general.round(1),
+            'NOTA_ESPECIFICA': (2 * total - general).clip(0, 100).round(1),
+            'D_CURSO_CURSO_KEY': keys[course_pos],
+            'D_TEMPO_TEMPO_KEY': np.array(years)[rng.integers(0, len(years), rows)],
+        })),
+    }
+    # Demográficas: uma linha por (curso, ano) com participantes, contagens multinomiais por coluna
+    pairs = pd.DataFrame({'D_CURSO_CURSO_KEY': tables['desempenho']['D_CURSO_CURSO_KEY'],
+                          'D_TEMPO_TEMPO_KEY': tables['desempenho']['D_TEMPO_TEMPO_KEY']})
+    pairs = pairs.value_counts().reset_index(name='n')
+    for key, columns in DEMOGRAPHIC_COLUMNS.items():
+        if key == 'escolaridade':
+            # Pai e mãe: uma distribuição de níveis para cada
+            counts = np.concatenate([rng.multinomial(pairs['n'], np.full(len(columns) // 2, 2 / len(columns)))
+                                     for _ in range(2)], axis=1)
+            counts = counts[:, np.argsort(np.r_[np.arange(0, len(columns), 2), np.arange(1, len(columns), 2)])]
+        else:
+            counts = rng.multinomial(pairs['n'], rng.dirichlet(np.ones(len(columns))))
+        df = pd.DataFrame(counts, columns=columns)
+        df['D_CURSO_CURSO_KEY'] = pairs['D_CURSO_CURSO_KEY']
+        df['D_TEMPO_TEMPO_KEY'] = pairs['D_TEMPO_TEMPO_KEY']
+        tables[key] = _typed(key, df)
+    return tables
+
+
+def write_csvs(tables, base_dir):
+    """Grava as tabelas como os CSVs do DW (';', textos entre aspas) em base_dir."""
+    os.makedirs(base_dir, exist_ok=True)
+    for key, df in tables.items():
+        df.to_csv(os.path.join(base_dir, FILE_MAPPING[key]['fname']), sep=';', index=False,
+                  quoting=csv.QUOTE_NONNUMERIC)
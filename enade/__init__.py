@@ -0,0 +1 @@
+# Núcleo de dados do dashboard ENADE (sem dependência do Streamlit).
@@ -0,0 +1,36 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def nice_bin_step(vmin, vmax, maxbins=40, base=10, divide=(5, 2)):
+    """Passo e extensão dos bins com o mesmo algoritmo do Vega (`bin` com maxbins)."""
+    span = vmax - vmin
+    if span <= 0:
+        return 1.0, math.floor(vmin), math.floor(vmin) + 1.0
+    level = math.ceil(math.log(maxbins) / math.log(base))
+    step = base ** (round(math.log(span) / math.log(base)) - level)
+    while math.ceil(span / step) > maxbins:
+        step *= base
+    for div in divide:
+        v = step / div
+        if span / v <= maxbins:
+            step = v
+    start = step * math.floor(vmin / step)
+    stop = step * math.ceil(vmax / step)
+    return step, start, stop
+
+
+def histogram_bins(values, maxbins=40):
+    """Contagem por faixa (bin_start, bin_end, count), calculada no servidor com NumPy."""
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return pd.DataFrame({'bin_start': [], 'bin_end': [], 'count': []})
+    step, start, stop = nice_bin_step(values.min(), values.max(), maxbins)
+    nbins = max(int(round((stop - start) / step)), 1)
+    idx = np.floor((values - start) / step).astype(np.int64).clip(0, nbins - 1)
+    counts = np.bincount(idx, minlength=nbins)
+    edges = start + step * np.arange(nbins + 1)
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
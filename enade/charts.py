@@ -0,0 +1,118 @@
+import altair as alt
+
+# Gráficos desenhados a partir de dados já agregados no servidor (enade.chart_data):
+# o spec Vega-Lite leva só os bins/resumos, não as linhas individuais.
+
+
+def histogram_chart(bins, title_x="Nota Total", title_y="Número de Participantes"):
+    """Histograma a partir de bin_start/bin_end/count (bin='binned' no Vega-Lite)."""
+    return alt.Chart(bins).mark_bar(color='#4CAF50', opacity=0.7).encode(
+        alt.X("bin_start:Q", bin='binned', title=title_x),
+        alt.X2("bin_end:Q"),
+        alt.Y("count:Q", title=title_y),
+        tooltip=[
+            alt.Tooltip("bin_start:Q", title="Faixa da Nota (início)", format='.1f'),
+            alt.Tooltip("bin_end:Q", title="Faixa da Nota (fim)", format='.1f'),
+            alt.Tooltip("count:Q", title=title_y, format=',')
+        ]
+    )
+
+
+def boxplot_chart(summary, group_col='DESC_CURSO', color_col='Num Estudantes'):
+    """Boxplot vertical a partir do resumo de cinco números (lower/q1/median/q3/upper)."""
+    # Ordem explícita pela mediana
+    sort = summary.sort_values('median', ascending=False)[group_col].astype(str).tolist()
+    x = alt.X(f'{group_col}:N', title='Curso', sort=sort, axis=alt.Axis(labelAngle=-60))
+    tooltip = [
+        alt.Tooltip(f'{group_col}:N', title='Curso'),
+        alt.Tooltip(f'{color_col}:Q', title='Nº Participantes', format=','),
+        alt.Tooltip('median:Q', title='Mediana', format='.2f'),
+        alt.Tooltip('q1:Q', title='1º Quartil (Q1)', format='.2f'),
+        alt.Tooltip('q3:Q', title='3º Quartil (Q3)', format='.2f'),
+        alt.Tooltip('lower:Q', title='Mínimo (whiskers)', format='.2f'),
+        alt.Tooltip('upper:Q', title='Máximo (whiskers)', format='.2f')
+    ]
+    color = alt.Color(f'{color_col}:Q', title='Nº Participantes', scale=alt.Scale(scheme='viridis'),
+                      legend=alt.Legend(orient="top", titleOrient="left"))
+    y_scale = alt.Scale(zero=False)
+
+    # Dados só no layer (não em cada camada): o Altair não precisa comparar/hashear cópias do resumo
+    base = alt.Chart().encode(x=x, tooltip=tooltip)
+    whisker = base.mark_rule().encode(
+        y=alt.Y('lower:Q', title='Distribuição da Nota Total', scale=y_scale), y2='upper:Q')
+    box = base.mark_bar(size=20).encode(y='q1:Q', y2='q3:Q', color=color)
+    median = base.mark_tick(color='white', size=20).encode(y='median:Q')
+    ends = base.mark_tick(color='black', size=10)
+    layers = [whisker, box, median, ends.encode(y='lower:Q'), ends.encode(y='upper:Q')]
+    return alt.layer(*layers, data=summary)
+
+
+def score_histogram_chart(bins):
+    """Histograma da Nota Total como na seção Performance Geral."""
+    return histogram_chart(bins).properties(height=300).interactive()
+
+
+def course_boxplot_chart(summary):
+    """Boxplot por curso como na seção Desempenho por Curso."""
+    return boxplot_chart(summary).properties(height=500).interactive()
+
+
+def _pie_chart(pie, color_scale, legend_title, tooltip):
+    base = alt.Chart(pie).encode(theta=alt.Theta('Percent:Q', stack=True))
+    arcs = base.mark_arc(innerRadius=50, outerRadius=100).encode(
+        color=alt.Color('Categoria:N', scale=color_scale, legend=alt.Legend(title=legend_title)),
+        tooltip=tooltip
+    )
+    # Rótulos de porcentagem
+    labels = base.mark_text(radius=120, size=12).encode(
+        text=alt.Text('Percent:Q', format='.1%'),
+        color=alt.value('black')
+    )
+    return arcs + labels
+
+
+def sex_pie_chart(pie):
+    """Pizza (rosca) por sexo a partir de Categoria/Quantidade/Percent (enade.compute.sex_pie)."""
+    color_scale = alt.Scale(domain=['Masculino', 'Feminino', 'Não Informado'], range=['#7B68EE', '#EE82EE', '#d3d3d3'])
+    return _pie_chart(pie, color_scale, 'Sexo', [alt.Tooltip('Categoria:N', title='Sexo'),
+                                                 alt.Tooltip('Quantidade:Q', title='Quantidade'),
+                                                 alt.Tooltip('Percent:Q', title='Percentual', format='.1%')])
+
+
+def race_pie_chart(pie):
+    """Pizza (rosca) por cor/raça com cores fixas por categoria (enade.compute.race_pie)."""
+    color_scale = alt.Scale(domain=['Branca', 'Preta', 'Parda', 'Amarela', 'Indigena', 'Não Declarada'],
+                            range=['#FFDEAD', '#8B4513', '#CD853F', '#F4A460', '#DAA520', '#D3D3D3'])
+    return _pie_chart(pie, color_scale, 'Cor/Raça', [alt.Tooltip('Categoria:N', title='Cor/Raça'),
+                                                     alt.Tooltip('Quantidade:Q'),
+                                                     alt.Tooltip('Percent:Q', format='.1%')])
+
+
+def age_chart(counts):
+    """Barras por faixa etária (enade.compute.age_counts)."""
+    return alt.Chart(counts).mark_bar(color='#17becf').encode(
+        x=alt.X('Faixa Etária:N', sort='-y'),
+        y='Quantidade:Q',
+        tooltip=['Faixa Etária', 'Quantidade']
+    ).properties(height=250)
+
+
+def income_chart(data, order):
+    """Barras por faixa de renda, na ordem das faixas (enade.compute.income_bars)."""
+    return alt.Chart(data).mark_bar(color='#9467bd', opacity=0.8).encode(
+        x=alt.X('Faixa de Renda', sort=order, title='Faixa de Renda (Salários Mínimos)'),
+        y=alt.Y('Quantidade:Q', title='Número de Estudantes'),
+        tooltip=['Faixa de Renda', alt.Tooltip('Quantidade:Q', format=',')]
+    ).properties(height=300).interactive()
+
+
+def parent_education_chart(long, order, maxv):
+    """Borboleta pais x mães: barras dos pais à esquerda (QtdPlot negativa), eixo simétrico."""
+    return alt.Chart(long).mark_bar().encode(
+        x=alt.X('QtdPlot:Q', title='Quantidade',
+                scale=alt.Scale(domain=[-maxv, maxv]),
+                axis=alt.Axis(labelExpr="datum.value<0?-datum.value:datum.value")),
+        y=alt.Y('Nível:N', sort=order, title='Nível de Escolaridade'),
+        color=alt.Color('Parentesco:N', legend=alt.Legend(title='Parentesco')),
+        tooltip=['Parentesco', 'Quantidade', 'Nível']
+    ).properties(height=300)
@@ -0,0 +1,170 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from enade.cube import rollup, rollup_quantiles
+
+# Cálculos das seções do dashboard como funções puras: recebem as tabelas/estruturas já
+# carregadas (star, cubo, sketches, totais demográficos) e devolvem métricas ou DataFrames
+# prontos para os gráficos. Nada aqui chama st.*, então tudo pode ser medido fora do servidor.
+
+SEX_LABELS = {'QTD_MASCULINO': 'Masculino', 'QTD_FEMININO': 'Feminino', 'QTD_N_INFORMADO': 'Não Informado'}
+
+
+def year_filter(cube, years):
+    """Filtro `where` do rollup para os anos selecionados (None se o cubo não tem ANO)."""
+    return {'ANO': list(years)} if 'ANO' in cube.columns else None
+
+
+def filter_years(star, years):
+    """Linhas do star nos anos selecionados, ou None se não há coluna ANO.
+
+    Como só as partições dos anos selecionados são lidas, a máscara normalmente cobre
+    tudo e a própria tabela é devolvida, sem cópia.
+    """
+    if 'ANO' not in star.columns:
+        return None
+    mask = star['ANO'].isin(list(years)).to_numpy()
+    return star if mask.all() else star[mask]
+
+
+def score_metrics(cells, median):
+    """Métricas da seção a partir de uma linha do rollup e da mediana dos sketches."""
+    return {
+        "Participantes": int(cells['NOTA_TOTAL_count']),
+        "Média": cells['NOTA_TOTAL_mean'],
+        "Mediana": median,
+        "Mínimo": cells['NOTA_TOTAL_min'],
+        "Máximo": cells['NOTA_TOTAL_max'],
+        "Desvio Padrão": cells['NOTA_TOTAL_std']
+    }
+
+
+def sorted_metrics(values):
+    """Mesmas métricas de score_metrics a partir de notas já ordenadas (fatia do CourseIndex)."""
+    return {
+        "Participantes": len(values),
+        "Média": values.mean(),
+        "Mediana": np.quantile(values, 0.5),
+        "Mínimo": values[0],
+        "Máximo": values[-1],
+        "Desvio Padrão": values.std(ddof=1) if len(values) > 1 else np.nan
+    }
+
+
+def overall_metrics(cube, sketches, years):
+    """Métricas gerais da Nota Total nos anos selecionados (cubo + mediana dos sketches)."""
+    where = year_filter(cube, years)
+    median = rollup_quantiles(cube, sketches, where=where)['median'].iloc[0]
+    return score_metrics(rollup(cube, where=where).iloc[0], median)
+
+
+def year_comparison(cube, sketches, years):
+    """Comparativo entre edições: uma linha por ano com as métricas da Nota Total."""
+    where = year_filter(cube, years)
+    per_year = rollup(cube, by=['ANO'], where=where).sort_values('ANO')
+    medians = rollup_quantiles(cube, sketches, by=['ANO'], where=where).set_index('ANO')['median']
+    return pd.DataFrame({
+        'Ano': per_year['ANO'].astype(str),
+        'Nº de Participantes': per_year['NOTA_TOTAL_count'],
+        'Média': per_year['NOTA_TOTAL_mean'].round(2),
+        'Mediana': per_year['ANO'].map(medians).round(2),
+        'Mínimo': per_year['NOTA_TOTAL_min'].round(2),
+        'Máximo': per_year['NOTA_TOTAL_max'].round(2),
+        'Desvio Padrão': per_year['NOTA_TOTAL_std'].round(2),
+    })
+
+
+def course_summary(cube, sketches, years):
+    """(course_stats, course_box): contagem, média e mediana por curso + resumo do boxplot.
+
+    Contagem e média vêm do cubo; mediana, quartis e extremos da fusão dos sketches.
+    """
+    where = year_filter(cube, years)
+    course_cells = rollup(cube, by=['DESC_CURSO'], where=where)
+    course_stats = pd.DataFrame({
+        'DESC_CURSO': course_cells['DESC_CURSO'],
+        'Nota Média': course_cells['NOTA_TOTAL_mean'],
+        'Num Estudantes': course_cells['NOTA_TOTAL_count'],
+    })
+    course_stats = course_stats[course_stats['Num Estudantes'] > 0]
+    course_box = rollup_quantiles(cube, sketches, by=['DESC_CURSO'], where=where)
+    course_box = course_box[course_box['count'] > 0]
+    num_students = course_stats.set_index('DESC_CURSO')['Num Estudantes']
+    course_box = course_box.assign(lower=course_box['min'], upper=course_box['max'],
+                                   **{'Num Estudantes': course_box['DESC_CURSO'].map(num_students).astype('int64')})
+    course_stats['Nota Mediana'] = course_stats['DESC_CURSO'].map(course_box.set_index('DESC_CURSO')['median']).astype('float64')
+    return course_stats, course_box
+
+
+# --- Perfil demográfico e socioeconômico (a partir dos totais do DemographicKernel) ---
+def pie_data(counts):
+    """Categoria/Quantidade/Percent das categorias com quantidade > 0 (`counts`: Series rotulada)."""
+    pie = pd.DataFrame({'Categoria': counts.index, 'Quantidade': counts.values})
+    pie = pie[pie['Quantidade'] > 0]
+    pie['Percent'] = pie['Quantidade'] / pie['Quantidade'].sum()
+    return pie
+
+
+def sex_pie(totals):
+    counts = totals[list(SEX_LABELS)]
+    counts.index = list(SEX_LABELS.values())
+    return pie_data(counts)
+
+
+def race_pie(totals, columns):
+    counts = totals[columns]
+    counts.index = (counts.index.str.replace('QTD_', '', regex=False)
+                    .str.replace('_', ' ', regex=False)
+                    .str.title()
+                    .str.replace('Nao ', 'Não ', regex=False))
+    return pie_data(counts)
+
+
+def age_counts(idade):
+    """Quantidade por faixa etária (linhas da dimensão IDADE), ou None sem a coluna IDADE."""
+    if 'IDADE' not in idade.columns:
+        return None
+    counts = idade['IDADE'].value_counts().reset_index()
+    counts.columns = ['Faixa Etária', 'Quantidade']
+    return counts
+
+
+def income_sort_key(label):
+    """Ordem das faixas de renda pelo primeiro número do rótulo ('Não Sabe'/'Não Informado' por último)."""
+    if 'Não Sabe' in label or 'Não Informado' in label:
+        return float('inf')
+    match = re.search(r'(\d+[\.,]?\d*)', label)
+    if match:
+        return float(match.group(1).replace(',', '.'))
+    return float('inf') - 1
+
+
+def income_bars(totals, columns):
+    """(renda_data, ordem das faixas) para o gráfico de barras de renda."""
+    counts = totals[columns]
+    counts.index = counts.index.str.replace('QTD_RENDA_', '', regex=False)\
+                               .str.replace('_', ' a ', regex=False)\
+                               .str.replace('ATE ', 'Até ', regex=False)\
+                               .str.replace('ACIMA DE ', 'Acima de ', regex=False)
+    data = pd.DataFrame({'Faixa de Renda': counts.index, 'Quantidade': counts.values})
+    data = data[data['Quantidade'] > 0]
+    return data, sorted(data['Faixa de Renda'].unique(), key=income_sort_key)
+
+
+def parent_education(totals, columns):
+    """(long, ordem dos níveis, máximo) do gráfico borboleta de escolaridade dos pais x mães.
+
+    `long` tem uma linha por (parentesco, nível) com Quantidade > 0; QtdPlot é negativa
+    para PAI, para as barras dos pais ficarem à esquerda do eixo.
+    """
+    esc = totals[[c for c in columns if re.match(r'QTD_(PAI|MAE)_', c)]]
+    long = esc.reset_index()
+    long.columns = ['Categoria', 'Quantidade']
+    long[['Parentesco', 'Nível']] = long['Categoria'].str.extract(r'QTD_(PAI|MAE)_(.+)')
+    long['Nível'] = long['Nível'].str.replace('_', ' ').str.title()
+    long = long[long['Quantidade'] > 0]
+    long['QtdPlot'] = long['Quantidade'].where(long['Parentesco'] != 'PAI', -long['Quantidade'])
+    order = long.groupby('Nível')['Quantidade'].sum().abs().sort_values().index.tolist()
+    return long, order, long['Quantidade'].max()
@@ -0,0 +1,109 @@
+import numpy as np
+
+from enade.star import KeyIndex
+
+COURSE_ATTRIBUTES = ['DESC_CURSO', 'DESC_GRUPO', 'DESC_CATEGORIA', 'DESC_MODALIDADE',
+                     'DESC_UF_CURSO', 'DESC_REGIAO_CURSO']
+TOP_K_SAMPLE = 4096 # Tamanho da amostra que define o limiar de poda do top_k
+COURSE_FILTERS = { # Atributos do curso filtráveis (barra lateral do dashboard) e seus rótulos
+    'DESC_CURSO': 'Curso',
+    'DESC_CATEGORIA': 'Categoria Administrativa',
+    'DESC_MODALIDADE': 'Modalidade',
+    'DESC_REGIAO_CURSO': 'Região',
+    'DESC_UF_CURSO': 'UF',
+}
+RANKING_COLUMNS = {'CO_CURSO': 'Código', **COURSE_FILTERS} # Colunas das tabelas de ranking
+RANKING_MIN_STUDENTS = 10 # Mínimo de participantes padrão para entrar no ranking
+
+
+class CourseBitmaps:
+    """Bitmaps (np.packbits, 1 bit por linha de CURSO) de cada valor dos atributos do curso.
+
+    Um filtro {atributo: valores} vira OR dos bitmaps dos valores de cada atributo e AND
+    entre atributos, operando em bytes (8 cursos por operação) sem tocar nas tabelas.
+    """
+
+    def __init__(self, curso, attributes=COURSE_ATTRIBUTES):
+        self.size = len(curso)
+        self.categories = {}
+        self.bitmaps = {}
+        for col in attributes:
+            if col not in curso.columns:
+                continue
+            values = curso[col].astype('category')
+            codes = values.cat.codes.to_numpy()
+            self.categories[col] = values.cat.categories
+            # Uma linha de bits por categoria: (n_categorias, ceil(n_cursos / 8)) bytes
+            onehot = codes[None, :] == np.arange(len(values.cat.categories))[:, None]
+            self.bitmaps[col] = np.packbits(onehot, axis=1)
+        self._all = np.packbits(np.ones(self.size, dtype=bool))
+
+    def select(self, filters=None):
+        """Bitmap dos cursos que atendem a {atributo: valores} (valores vazios = sem filtro)."""
+        bits = self._all.copy()
+        for col, values in (filters or {}).items():
+            if not values:
+                continue
+            wanted = self.categories[col].get_indexer(list(values))
+            wanted = wanted[wanted >= 0]
+            if not len(wanted):
+                bits[:] = 0
+                break
+            bits &= np.bitwise_or.reduce(self.bitmaps[col][wanted], axis=0)
+        return bits
+
+    def mask(self, bits):
+        """Bitmap -> máscara booleana sobre as linhas de CURSO."""
+        return np.unpackbits(bits, count=self.size).view(bool)
+
+
+def course_scores(star, curso, col='NOTA_TOTAL', pk='CURSO_KEY'):
+    """Contagem e média de `col` por linha de CURSO (NaN para cursos sem participantes).
+
+    Usa a chave do CURSO já resolvida no join (versão vigente no ano de cada linha).
+    """
+    values = star[col].to_numpy(dtype='float64')
+    pos = KeyIndex(curso[pk].to_numpy()).positions(star[pk].to_numpy())
+    valid = (pos >= 0) & ~np.isnan(values)
+    counts = np.bincount(pos[valid], minlength=len(curso))
+    sums = np.bincount(pos[valid], weights=values[valid], minlength=len(curso))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    return counts, means
+
+
+def top_k(scores, mask, k, largest=True):
+    """Posições dos k maiores (ou menores) scores dentro da máscara, em ordem.
+
+    Seleção parcial com argpartition (O(n)); só os k escolhidos são ordenados.
+    """
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    # Poda exata antes da seleção: o k-ésimo extremo de uma amostra dos cursos da máscara
+    # é um limiar que ao menos k cursos (os da própria amostra) atingem
+    stride = max(1, len(scores) // TOP_K_SAMPLE)
+    sample = scores[::stride][mask[::stride]]
+    sample = sample[~np.isnan(sample)]
+    if len(sample) > k:
+        if largest:
+            keep = scores >= np.partition(sample, len(sample) - k)[len(sample) - k]
+        else:
+            keep = scores <= np.partition(sample, k - 1)[k - 1]
+        keep &= mask # comparações com NaN já são falsas
+    else:
+        keep = mask & ~np.isnan(scores)
+    candidates = np.flatnonzero(keep)
+    values = -scores[candidates] if largest else scores[candidates]
+    if k < len(candidates):
+        part = np.argpartition(values, k - 1)[:k]
+        candidates, values = candidates[part], values[part]
+    return candidates[np.argsort(values, kind='stable')]
+
+
+def ranking_table(curso, positions, counts, means, columns):
+    """Tabela dos cursos em `positions` (na ordem dada) com participantes e nota média."""
+    table = curso.iloc[positions][[c for c in columns if c in curso.columns]].reset_index(drop=True)
+    table['Participantes'] = counts[positions]
+    table['Nota Média'] = means[positions]
+    return table
+
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+
+class CourseIndex:
+    """Notas agrupadas por curso: valores na ordem (curso, nota) + offsets de cada curso.
+
+    As notas de um curso são a fatia values[offsets[i]:offsets[i + 1]], já ordenadas
+    (saem sem filtrar a tabela).
+    Os cursos também ficam ordenados pelo número de linhas, então "cursos com pelo menos
+    n participantes" é uma busca binária.
+    """
+
+    def __init__(self, df, group_col='DESC_CURSO', value_col='NOTA_TOTAL'):
+        codes, labels = pd.factorize(df[group_col], sort=True)
+        values = df[value_col].to_numpy(dtype='float64')
+        valid = (codes >= 0) & ~np.isnan(values)
+        rows = np.flatnonzero(valid)
+        order = rows[np.lexsort((values[rows], codes[rows]))]
+        counts = np.bincount(codes[order], minlength=len(labels))
+        self.labels = pd.Index(labels)
+        self.values = values[order]
+        self.offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        self.counts = counts
+        self.by_count = np.argsort(counts, kind='stable')
+        self.sorted_counts = counts[self.by_count]
+
+    def _position(self, label):
+        pos = self.labels.get_indexer([label])[0]
+        if pos < 0:
+            raise KeyError(label)
+        return pos
+
+    def course_values(self, label):
+        """Valores do curso em ordem crescente (fatia, sem cópia)."""
+        pos = self._position(label)
+        return self.values[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def at_least(self, min_count):
+        """Cursos com pelo menos min_count linhas (busca binária nas contagens ordenadas)."""
+        start = np.searchsorted(self.sorted_counts, min_count, side='left')
+        return self.labels[self.by_count[start:]]
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from enade.loader import concat_tables
+from enade.sketch import DEFAULT_DELTA, QuantileSketches
+
+# Hierarquia de atributos do curso (do mais geral ao mais específico) + ano
+COURSE_HIERARCHY = ['DESC_GRUPO', 'DESC_CATEGORIA', 'DESC_MODALIDADE',
+                    'DESC_UF_CURSO', 'DESC_REGIAO_CURSO', 'DESC_CURSO']
+CUBE_KEYS = ['ANO'] + COURSE_HIERARCHY
+SCORE_COLUMNS = ['NOTA_TOTAL', 'NOTAL_GERAL', 'NOTA_ESPECIFICA']
+SCORE_STATS = ('count', 'sum', 'sumsq', 'min', 'max')
+BOX_QUANTILES = {'q1': 0.25, 'median': 0.5, 'q3': 0.75}
+
+
+def _group(df, keys):
+    return df.groupby(keys, observed=True, dropna=False, sort=False)
+
+
+def _score_cells(star, keys, score_cols):
+    # count/sum/sumsq/min/max por célula; somas em float64 para não perder precisão do float32
+    frame = {k: star[k] for k in keys}
+    agg = {}
+    for col in score_cols:
+        values = star[col].astype('float64')
+        frame[col] = values
+        frame[f'{col}_sq'] = values * values
+        agg[f'{col}_count'] = (col, 'count')
+        agg[f'{col}_sum'] = (col, 'sum')
+        agg[f'{col}_sumsq'] = (f'{col}_sq', 'sum')
+        agg[f'{col}_min'] = (col, 'min')
+        agg[f'{col}_max'] = (col, 'max')
+    return _group(pd.DataFrame(frame), keys).agg(**agg).reset_index()
+
+
+def build_cube(star, keys=CUBE_KEYS, score_cols=SCORE_COLUMNS):
+    """Cubo OLAP (ano x hierarquia do curso) com estatísticas das notas.
+
+    Os totais demográficos (QTD_*) não entram no cubo: vêm do DemographicKernel.
+    """
+    keys = [k for k in keys if k in star.columns]
+    score_cols = [c for c in score_cols if c in star.columns]
+    return _int_counts(_score_cells(star, keys, score_cols))
+
+
+def _int_counts(cube):
+    # Contagens ausentes (células sem notas) viram 0
+    for col in cube.columns:
+        if col.endswith('_count'):
+            cube[col] = cube[col].fillna(0).astype('int64')
+    return cube
+
+
+def combine_cubes(cubes, sketches=None, keys=CUBE_KEYS):
+    """Funde cubos parciais (ex.: o já carregado + o das linhas novas) célula a célula.
+
+    Contagens e somas são somadas e mín/máx combinados; os sketches de cada cubo
+    (mesma ordem das linhas) são fundidos nas células resultantes. Devolve (cubo, sketches).
+    """
+    stacked = concat_tables(cubes)
+    keys = [k for k in keys if k in stacked.columns]
+    measures = [c for c in stacked.columns if c not in keys]
+    mins = [c for c in measures if c.endswith('_min')]
+    maxs = [c for c in measures if c.endswith('_max')]
+    sums = [c for c in measures if c not in mins and c not in maxs]
+    grouped = _group(stacked, keys)
+    cube = pd.concat([grouped[sums].sum(), grouped[mins].min(), grouped[maxs].max()], axis=1).reset_index()
+    cube = _int_counts(cube[list(stacked.columns)])
+    if sketches is None:
+        return cube, None
+    return cube, QuantileSketches.concat(sketches).merge(grouped.ngroup().to_numpy(), len(cube))
+
+
+def build_sketches(star, cube, col='NOTA_TOTAL', keys=CUBE_KEYS, delta=DEFAULT_DELTA):
+    """Um t-digest de `col` por célula do cubo, na ordem das linhas de `cube` (delta=None = exato)."""
+    keys = [k for k in keys if k in star.columns]
+    cells = pd.MultiIndex.from_frame(cube[keys])
+    codes = cells.get_indexer(pd.MultiIndex.from_frame(star[keys]))
+    return QuantileSketches.from_values(codes, star[col], len(cube), delta)
+
+
+def _filter_mask(cube, where):
+    mask = np.ones(len(cube), dtype=bool)
+    for col, value in (where or {}).items():
+        if isinstance(value, (list, tuple, set, frozenset, pd.Index, np.ndarray)):
+            mask &= cube[col].isin(list(value)).to_numpy()
+        else:
+            mask &= (cube[col] == value).to_numpy()
+    return mask
+
+
+def _apply_filters(cube, where):
+    if not where:
+        return cube
+    return cube[_filter_mask(cube, where)]
+
+
+def rollup(cube, by=(), where=None, score_cols=SCORE_COLUMNS):
+    """Agrega o cubo pelos níveis em `by` (vazio = total geral), filtrando células por `where`.
+
+    Devolve as medidas somadas mais média e desvio padrão (amostral, como no pandas)
+    de cada coluna de nota.
+    """
+    cells = _apply_filters(cube, where)
+    measures = [c for c in cube.columns if c not in CUBE_KEYS]
+    mins = [c for c in measures if c.endswith('_min')]
+    maxs = [c for c in measures if c.endswith('_max')]
+    sums = [c for c in measures if c not in mins and c not in maxs]
+    if by:
+        grouped = cells.groupby(list(by), observed=True, sort=False)
+        out = pd.concat([grouped[sums].sum(), grouped[mins].min(), grouped[maxs].max()], axis=1).reset_index()
+    else:
+        out = pd.DataFrame({**cells[sums].sum().to_dict(), **cells[mins].min().to_dict(),
+                            **cells[maxs].max().to_dict()}, index=[0])
+        out = out.astype({c: 'int64' for c in sums if c.endswith('_count')})
+    derived = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for col in score_cols:
+            if f'{col}_count' not in out.columns:
+                continue
+            n = out[f'{col}_count'].to_numpy(dtype='float64')
+            total = out[f'{col}_sum'].to_numpy(dtype='float64')
+            total_sq = out[f'{col}_sumsq'].to_numpy(dtype='float64')
+            derived[f'{col}_mean'] = np.where(n > 0, total / n, np.nan)
+            var = np.where(n > 1, (total_sq - total * total / n) / (n - 1), np.nan)
+            derived[f'{col}_std'] = np.sqrt(np.clip(var, 0, None))
+    return out.assign(**derived)
+
+
+def rollup_quantiles(cube, sketches, by=(), where=None, quantiles=BOX_QUANTILES):
+    """Quantis aproximados por grupo de `by` fundindo os sketches das células (ver build_sketches).
+
+    O custo depende do número de células e centroides, não de linhas. Devolve as colunas
+    de `by` mais count/min/max e uma coluna por quantil de `quantiles` ({nome: q}).
+    """
+    mask = _filter_mask(cube, where)
+    codes = np.full(len(cube), -1, dtype=np.int64)
+    if by:
+        grouped = cube[mask].groupby(list(by), observed=True, sort=False)
+        codes[mask] = grouped.ngroup().to_numpy()
+        out = grouped.size().reset_index()[list(by)]
+    else:
+        codes[mask] = 0
+        out = pd.DataFrame(index=[0])
+    merged = sketches.merge(codes, len(out))
+    out['count'] = merged.count.astype('int64')
+    out['min'] = merged.vmin
+    out['max'] = merged.vmax
+    for name, q in quantiles.items():
+        out[name] = merged.quantile(q)
+    return out
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from enade.star import KeyIndex, StarSchema
+
+DEMOGRAPHIC_TABLES = ('sexo', 'cor', 'renda', 'escolaridade')
+COURSE_FK = 'D_CURSO_CURSO_KEY'
+YEAR_FK = 'D_TEMPO_TEMPO_KEY'
+
+
+class DemographicKernel:
+    """QTD_* de SEXO/COR/RENDA/ESCOLARIDADE alinhados a um índice comum (curso, ano).
+
+    Cada linha do índice é um par (chave do curso, chave de tempo); `counts` é uma matriz
+    densa linhas x colunas QTD_*. Qualquer filtro (anos, cursos selecionados pelos bitmaps
+    de atributos) vira uma máscara booleana sobre o índice e o resultado é uma única soma mascarada.
+    """
+
+    def __init__(self, tables, curso, curso_pk='CURSO_KEY', tempo=None):
+        frames = {k: df for k, df in tables.items() if df is not None and COURSE_FK in df.columns}
+        self.columns = {k: [c for c in df.columns if c.startswith('QTD_')] for k, df in frames.items()}
+        all_cols = [c for cols in self.columns.values() for c in cols]
+        self.column_names = pd.Index(all_cols)
+
+        # Índice comum: pares (curso, ano) presentes em qualquer tabela
+        course_keys = np.concatenate([df[COURSE_FK].to_numpy(np.int64) for df in frames.values()] or [np.array([], np.int64)])
+        year_keys = np.concatenate([df[YEAR_FK].to_numpy(np.int64) for df in frames.values()] or [np.array([], np.int64)])
+        pairs = pd.MultiIndex.from_arrays([course_keys, year_keys])
+        codes, uniques = pd.factorize(pairs)
+        self.size = len(uniques)
+        self.course_key = uniques.get_level_values(0).to_numpy(np.int64) if self.size else np.array([], np.int64)
+        self.year_key = uniques.get_level_values(1).to_numpy(np.int64) if self.size else np.array([], np.int64)
+
+        self.counts = np.zeros((self.size, len(all_cols)), dtype=np.int64)
+        start = 0
+        col_start = 0
+        for key, df in frames.items():
+            rows = codes[start:start + len(df)]
+            start += len(df)
+            for j, col in enumerate(self.columns[key]):
+                self.counts[:, col_start + j] = np.bincount(rows, weights=df[col].to_numpy(np.float64),
+                                                            minlength=self.size).astype(np.int64)
+            col_start += len(self.columns[key])
+
+        # Linha de CURSO de cada linha do índice (-1 = sem curso); com TEMPO, a versão
+        # do curso vigente no ano (como no join da fato)
+        if tempo is not None:
+            pairs = pd.DataFrame({COURSE_FK: self.course_key, YEAR_FK: self.year_key})
+            self.course_pos = StarSchema({'curso': curso, 'tempo': tempo}).positions(pairs, 'curso')
+        else:
+            self.course_pos = KeyIndex(curso[curso_pk].to_numpy()).positions(self.course_key)
+
+    def mask(self, years=None, courses=None):
+        """Máscara do índice para as chaves de tempo em `years` e a máscara `courses` sobre as linhas de CURSO."""
+        mask = np.ones(self.size, dtype=bool)
+        if years is not None:
+            mask &= np.isin(self.year_key, np.asarray(list(years), dtype=np.int64))
+        if courses is not None:
+            mask &= (self.course_pos >= 0) & courses[self.course_pos.clip(min=0)]
+        return mask
+
+    def totals(self, mask=None, table=None):
+        """Soma das colunas QTD_* nas linhas da máscara (todas as tabelas ou só `table`)."""
+        sums = self.counts.sum(axis=0) if mask is None else mask.astype(np.int64) @ self.counts
+        totals = pd.Series(sums, index=self.column_names)
+        return totals if table is None else totals[self.columns[table]]
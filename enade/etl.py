@@ -0,0 +1,308 @@
+"""ETL dos microdados do ENADE (INEP) para o esquema estrela do dashboard.
+
+Lê o arquivo de microdados (um aluno por linha, separado por ';') em blocos de bytes
+alinhados a linhas, agrega cada bloco por (CO_CURSO, NU_ANO) e acumula somas e
+contagens. A memória de pico depende do número de cursos x anos e do tamanho do bloco,
+não do tamanho da entrada. Com --workers > 1 os blocos são processados em paralelo.
+
+Uso: python -m enade.etl MICRODADOS_ENADE_2022.txt [...] --out DIR [--workers N] [--chunk-mb 64]
+"""
+import argparse
+import csv
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from enade.loader import FILE_MAPPING
+
+# --- Colunas dos microdados ---
+YEAR_COL = 'NU_ANO'
+COURSE_COL = 'CO_CURSO'
+KEYS = [COURSE_COL, YEAR_COL]
+ATTRIBUTE_COLS = {  # coluna do microdado -> coluna de CURSO.csv
+    'CO_CATEGAD': 'CO_CATEGORIA',
+    'CO_GRUPO': 'CO_GRUPO',
+    'CO_MODALIDADE': 'CO_MODALIDADE',
+    'CO_UF_CURSO': 'CO_UF_CURSO',
+    'CO_REGIAO_CURSO': 'CO_REGIAO_CURSO',
+}
+SCORE_COLS = {  # coluna de DESEMPENHO.csv -> nota do microdado (média por curso)
+    'NOTA_TOTAL': 'NT_GER',
+    'NOTAL_GERAL': 'NT_FG',
+    'NOTA_ESPECIFICA': 'NT_CE',
+}
+# (tabela, questão, {resposta: coluna QTD_*}, coluna para respostas fora do mapa ou None)
+ANSWER_MAP = [
+    ('sexo', 'TP_SEXO', {'F': 'QTD_FEMININO', 'M': 'QTD_MASCULINO', 'N': 'QTD_N_INFORMADO'}, 'QTD_N_INFORMADO'),
+    ('cor', 'QE_I02', {'A': 'QTD_BRANCA', 'B': 'QTD_PRETA', 'C': 'QTD_AMARELA', 'D': 'QTD_PARDA',
+                       'E': 'QTD_INDIGENA', 'F': 'QTD_NAO_DECLARADA'}, None),
+    ('renda', 'QE_I08', {'A': 'QTD_RENDA_ATE_1_5SM', 'B': 'QTD_RENDA_1_5A3SM', 'C': 'QTD_RENDA_3A4_5SM',
+                         'D': 'QTD_RENDA_4_5A6SM', 'E': 'QTD_RENDA_6A10SM', 'F': 'QTD_RENDA_10A30SM',
+                         'G': 'QTD_RENDA_ACIMA_30SM'}, None),
+    ('escolaridade', 'QE_I04', {'A': 'QTD_PAI_NENHUMA', 'B': 'QTD_PAI_FUND_I', 'C': 'QTD_PAI_FUND_II',
+                                'D': 'QTD_PAI_MEDIO', 'E': 'QTD_PAI_SUPERIOR', 'F': 'QTD_PAI_POS'}, None),
+    ('escolaridade', 'QE_I05', {'A': 'QTD_MAE_NENHUMA', 'B': 'QTD_MAE_FUND_I', 'C': 'QTD_MAE_FUND_II',
+                                'D': 'QTD_MAE_MEDIO', 'E': 'QTD_MAE_SUPERIOR', 'F': 'QTD_MAE_POS'}, None),
+]
+
+# --- Descrições (mesmas dos CSVs atuais, inclusive o espaço inicial) ---
+CATEGORIA = {1: 'Pública Federal', 2: 'Pública Estadual', 3: 'Pública Municipal',
+             4: 'Privada com fins lucrativos', 5: 'Privada sem fins lucrativos', 7: 'Especial'}
+GRUPO = {1: 'Administração', 2: 'Direito', 13: 'Ciências Econômicas', 18: 'Psicologia', 22: 'Ciências Contábeis',
+         29: 'Turismo', 38: 'Serviço Social', 67: 'Secretariado Executivo', 81: 'Relações Internacionais',
+         83: 'Tecnologia em Design de Moda', 84: 'Tecnologia em Marketing', 85: 'Tecnologia em Processos Gerenciais',
+         86: 'Tecnologia em Gestão de Recursos Humanos', 87: 'Tecnologia em Gestão Financeira',
+         88: 'Tecnologia em Gastronomia', 93: 'Tecnologia em Gestão Comercial', 94: 'Tecnologia em Logística',
+         100: 'Administração Pública', 101: 'Teologia', 102: 'Tecnologia em Comércio Exterior',
+         103: 'Tecnologia em Design de Interiores', 104: 'Tecnologia em Design Gráfico',
+         105: 'Tecnologia em Gestão da Qualidade', 106: 'Tecnologia em Gestão Pública', 803: 'Jornalismo',
+         804: 'Publicidade e Propaganda'}
+MODALIDADE = {0: 'EaD', 1: 'Presencial'}
+UF = {11: 'Rondônia (RO)', 12: 'Acre (AC)', 13: 'Amazonas (AM)', 14: 'Roraima (RR)', 15: 'Pará (PA)',
+      16: 'Amapa (AP)', 17: 'Tocantins (TO)', 21: 'Maranhão (MA)', 22: 'Piauí (PI)', 23: 'Ceará (CE)',
+      24: 'Rio Grande do Norte (RN)', 25: 'Paraíba (PB)', 26: 'Pernambuco (PE)', 27: 'Alagoas (AL)',
+      28: 'Sergipe (SE)', 29: 'Bahia (BA)', 31: 'Minas gerais (MG)', 32: 'Espírito Santo (ES)',
+      33: 'Rio de Janeiro (RJ)', 35: 'São Paulo (SP)', 41: 'Paraná (PR)', 42: 'Santa Catarina (SC)',
+      43: 'Rio Grande do Sul (RS)', 50: 'Mato Grosso do Sul (MS)', 51: 'Mato Grosso (MT)', 52: 'Goiás (GO)',
+      53: 'Distrito federal (DF)'}
+REGIAO = {1: 'Região Norte (N)', 2: 'Região Nordeste (NE)', 3: 'Região Sudeste (SE)', 4: 'Região Sul (SUL)',
+          5: 'Região Centro-Oeste (CO)'}
+DESCRIPTIONS = {  # coluna CO_* de CURSO.csv -> (coluna DESC_*, dicionário)
+    'CO_CATEGORIA': ('DESC_CATEGORIA', CATEGORIA),
+    'CO_GRUPO': ('DESC_GRUPO', GRUPO),
+    'CO_MODALIDADE': ('DESC_MODALIDADE', MODALIDADE),
+    'CO_UF_CURSO': ('DESC_UF_CURSO', UF),
+    'CO_REGIAO_CURSO': ('DESC_REGIAO_CURSO', REGIAO),
+}
+AGE_COL = 'NU_IDADE'
+AGE_BANDS = [(0, 24, 'Até 24 anos'), (25, 29, '25 a 29 anos'), (30, 34, '30 a 34 anos'),
+             (35, 39, '35 a 39 anos'), (40, 200, '40 anos ou mais')]
+OPEN_END = '2051-01-01'  # DT_FIM da versão vigente, como nos CSVs atuais
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+PENDING_PER_WORKER = 2  # Blocos submetidos e ainda não somados, por processo (ver aggregate_files)
+
+
+def _table_columns(key):
+    return list(FILE_MAPPING[key]['dtypes'])
+
+
+def _count_columns(table):
+    return [c for c in _table_columns(table) if c.startswith('QTD_')]
+
+
+# --- Leitura em blocos ---
+def byte_ranges(path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Divide o arquivo em faixas [início, fim) de ~chunk_bytes alinhadas a quebras de linha."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = f.tell()
+        ranges = []
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()  # avança até o fim da linha corrente
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def _read_range(path, header, start, end, encoding):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    names = header.decode(encoding).strip().replace('"', '').split(';')
+    answers = {q for _, q, _, _ in ANSWER_MAP}
+    wanted = set(KEYS) | {AGE_COL} | set(ATTRIBUTE_COLS) | set(SCORE_COLS.values()) | answers
+    # Códigos e notas são lidos como números pelo parser em C (notas com vírgula decimal);
+    # só as respostas do questionário ficam como texto
+    return pd.read_csv(io.BytesIO(data), sep=';', header=None, names=names, decimal=',',
+                       dtype={q: str for q in answers & set(names)}, usecols=lambda c: c in wanted,
+                       encoding=encoding, encoding_errors='replace')
+
+
+def aggregate_chunk(df):
+    """Agrega um bloco de alunos por (CO_CURSO, NU_ANO): somas/contagens de notas, respostas e atributos."""
+    keys = pd.DataFrame({k: pd.to_numeric(df[k], errors='coerce') for k in KEYS})
+    valid = keys.notna().all(axis=1).to_numpy()
+    df, keys = df[valid], keys[valid].astype('int64')
+    out = {}
+
+    scores = {}
+    for target, source in SCORE_COLS.items():
+        if source in df.columns:
+            values = pd.to_numeric(df[source], errors='coerce')
+            scores[f'{target}_sum'] = values.fillna(0.0)
+            scores[f'{target}_count'] = values.notna().astype('int64')
+    out['scores'] = pd.DataFrame(scores).groupby([keys[k] for k in KEYS]).sum()
+
+    for table, question, mapping, default in ANSWER_MAP:
+        if question not in df.columns:
+            continue
+        answers = df[question].map(mapping)
+        if default is not None:
+            answers = answers.fillna(default)
+        counts = answers.groupby([keys[k] for k in KEYS] + [answers]).size().unstack(fill_value=0)
+        counts = counts.reindex(columns=sorted(set(mapping.values())), fill_value=0)
+        out[table] = counts if table not in out else out[table].add(counts, fill_value=0)
+
+    if AGE_COL in df.columns:
+        # Dimensão IDADE: faixas etárias observadas (IDADE_KEY = posição em AGE_BANDS)
+        age = pd.to_numeric(df[AGE_COL], errors='coerce')
+        edges = [lo for lo, _, _ in AGE_BANDS[1:]]
+        bands = pd.Series(np.searchsorted(edges, age.dropna().to_numpy(), side='right') + 1)
+        out['idade'] = bands.value_counts().to_frame('QTD')
+
+    attrs = pd.DataFrame({target: pd.to_numeric(df[source], errors='coerce')
+                          for source, target in ATTRIBUTE_COLS.items() if source in df.columns})
+    out['attributes'] = attrs.groupby([keys[k] for k in KEYS]).first()
+    return out
+
+
+def _process_range(args):
+    path, header, start, end, encoding = args
+    return aggregate_chunk(_read_range(path, header, start, end, encoding))
+
+
+class Accumulator:
+    """Soma incremental dos agregados parciais (tamanho proporcional a cursos x anos)."""
+
+    def __init__(self):
+        self.frames = {}
+
+    def add(self, partial):
+        for name, frame in partial.items():
+            current = self.frames.get(name)
+            if current is None:
+                self.frames[name] = frame
+            elif name == 'attributes':
+                self.frames[name] = current.combine_first(frame)
+            else:
+                self.frames[name] = current.add(frame, fill_value=0)
+
+
+def aggregate_files(paths, workers=1, chunk_bytes=DEFAULT_CHUNK_BYTES, encoding='latin-1'):
+    """Percorre os arquivos de microdados em blocos e devolve o Accumulator com os totais."""
+    tasks = []
+    for path in paths:
+        header, ranges = byte_ranges(path, chunk_bytes)
+        tasks.extend((path, header, start, end, encoding) for start, end in ranges)
+    acc = Accumulator()
+    if workers <= 1:
+        for task in tasks:
+            acc.add(_process_range(task))
+        return acc
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Janela limitada: no máximo PENDING_PER_WORKER x workers blocos submetidos e ainda não
+        # somados, qualquer que seja o número de blocos (pool.map submeteria todos de uma vez e
+        # os parciais prontos esperariam em memória). Os parciais são somados na ordem dos
+        # blocos, assim que o mais antigo termina: somas em float e primeiros atributos saem
+        # iguais aos da execução com um processo
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= PENDING_PER_WORKER * workers:
+                acc.add(pending.popleft().result())
+            pending.append(pool.submit(_process_range, task))
+        while pending:
+            acc.add(pending.popleft().result())
+    return acc
+
+
+# --- Esquema estrela ---
+def _course_versions(attributes):
+    """CURSO como dimensão de variação lenta: nova VERSAO quando os atributos mudam entre anos."""
+    attrs = attributes.reset_index().sort_values(KEYS)
+    attr_cols = [c for c in attrs.columns if c not in KEYS]
+    attrs[attr_cols] = attrs[attr_cols].fillna(0)  # 0 = código desconhecido, como nos CSVs atuais
+    changed = attrs[attr_cols].ne(attrs.groupby(COURSE_COL)[attr_cols].shift()).any(axis=1)
+    versions = attrs[changed].copy()
+    versions['VERSAO'] = versions.groupby(COURSE_COL).cumcount() + 1
+    versions['DT_INI'] = versions[YEAR_COL].astype(str) + '-01-01'
+    versions['DT_FIM'] = versions.groupby(COURSE_COL)['DT_INI'].shift(-1).fillna(OPEN_END)
+    versions = versions.reset_index(drop=True)
+    versions['CURSO_KEY'] = np.arange(2, len(versions) + 2)  # 1 = curso desconhecido
+
+    # (curso, ano) -> CURSO_KEY da versão vigente naquele ano
+    version_of_row = versions.set_index(KEYS)['CURSO_KEY'].reindex(pd.MultiIndex.from_frame(attrs[KEYS]))
+    key_by_course_year = pd.Series(version_of_row.groupby(attrs[COURSE_COL].to_numpy()).ffill().to_numpy(),
+                                   index=pd.MultiIndex.from_frame(attrs[KEYS])).astype('int64')
+
+    curso = pd.DataFrame({'CURSO_KEY': versions['CURSO_KEY'], 'CO_CURSO': versions[COURSE_COL]})
+    curso['DESC_CURSO'] = versions['CO_GRUPO'].map(GRUPO)  # nome do curso = área (grupo) do ENADE
+    for code_col, (desc_col, names) in DESCRIPTIONS.items():
+        curso[code_col] = versions[code_col].astype('int64')
+        curso[desc_col] = versions[code_col].map(names)
+    curso['VERSAO'] = versions['VERSAO']
+    curso['DT_INI'] = versions['DT_INI']
+    curso['DT_FIM'] = versions['DT_FIM']
+    for col in curso.columns:
+        if col.startswith('DESC_'):
+            curso[col] = ' ' + curso[col].fillna('').astype(str)
+    unknown = {c: 0 for c in curso.columns}
+    unknown.update({c: '' for c in curso.columns if c.startswith('DESC_') or c.startswith('DT_')})
+    unknown.update({'CURSO_KEY': 1, 'VERSAO': 1})
+    curso = pd.concat([pd.DataFrame([unknown]), curso], ignore_index=True)
+    return curso[_table_columns('curso')], key_by_course_year
+
+
+def build_star_schema(acc):
+    """Converte os acumuladores em DataFrames com as colunas de FILE_MAPPING."""
+    curso, key_by_course_year = _course_versions(acc.frames['attributes'])
+
+    def with_keys(frame):
+        frame = frame.reset_index()
+        idx = pd.MultiIndex.from_frame(frame[KEYS])
+        frame['D_CURSO_CURSO_KEY'] = key_by_course_year.reindex(idx).fillna(1).astype('int64').to_numpy()
+        frame['D_TEMPO_TEMPO_KEY'] = frame[YEAR_COL]
+        return frame
+
+    tables = {'curso': curso}
+    scores = with_keys(acc.frames['scores'])
+    for target in SCORE_COLS:
+        count = scores[f'{target}_count']
+        scores[target] = (scores[f'{target}_sum'] / count.where(count > 0)).round(2)
+    tables['desempenho'] = scores[_table_columns('desempenho')]
+    for table in ('sexo', 'cor', 'renda', 'escolaridade'):
+        if table in acc.frames:
+            frame = with_keys(acc.frames[table].reindex(columns=_count_columns(table), fill_value=0))
+            frame[_count_columns(table)] = frame[_count_columns(table)].astype('int64')
+            tables[table] = frame[_table_columns(table)]
+    if 'idade' in acc.frames:
+        keys = sorted(int(k) for k in acc.frames['idade'].index)
+        tables['idade'] = pd.DataFrame({'IDADE_KEY': keys, 'IDADE': [AGE_BANDS[k - 1][2] for k in keys]})
+    years = sorted(acc.frames['scores'].index.get_level_values(YEAR_COL).unique())
+    tables['tempo'] = pd.DataFrame({'TEMPO_KEY': years, 'ANO': years})
+    return tables
+
+
+def write_star_schema(tables, out_dir):
+    """Grava os CSVs no formato dos atuais (';', cabeçalho e textos entre aspas)."""
+    os.makedirs(out_dir, exist_ok=True)
+    for key, df in tables.items():
+        df.to_csv(os.path.join(out_dir, FILE_MAPPING[key]['fname']), sep=';', index=False,
+                  quoting=csv.QUOTE_NONNUMERIC, encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ETL dos microdados do ENADE para o esquema estrela')
+    parser.add_argument('inputs', nargs='+', help='arquivos de microdados (um aluno por linha, sep=;)')
+    parser.add_argument('--out', default='.', help='diretório de saída dos CSVs')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--chunk-mb', type=int, default=DEFAULT_CHUNK_BYTES // (1024 * 1024))
+    parser.add_argument('--encoding', default='latin-1')
+    args = parser.parse_args()
+
+    acc = aggregate_files(args.inputs, workers=args.workers, chunk_bytes=args.chunk_mb * 1024 * 1024,
+                          encoding=args.encoding)
+    tables = build_star_schema(acc)
+    write_star_schema(tables, args.out)
+    for key, df in tables.items():
+        print(f"{FILE_MAPPING[key]['fname']:<18}{len(df):>10} linhas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+"""Exportação estática do dashboard ENADE (pacote HTML/JSON pré-renderizado).
+
+Roda uma vez, sem Streamlit, os mesmos cálculos do dashboard para os anos escolhidos e
+grava o spec Vega-Lite de cada gráfico (com os dados já agregados embutidos), as métricas
+em JSON e páginas HTML que só desenham os specs no navegador (vega-embed). Cada curso
+ganha uma página de detalhe; com --workers > 1 elas são geradas em paralelo. O resultado
+é servido por qualquer servidor de arquivos/CDN, sem processamento por visitante.
+
+Uso: python -m enade.export --out DIR [--years 2022 ...] [--workers N]
+"""
+import argparse
+import html
+import json
+import math
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from enade.chart_data import histogram_bins
+from enade.charts import (age_chart, course_boxplot_chart, income_chart, parent_education_chart, race_pie_chart,
+                          score_histogram_chart, sex_pie_chart)
+from enade.compute import (age_counts, course_summary, filter_years, income_bars, overall_metrics, parent_education,
+                           race_pie, sex_pie, sorted_metrics, year_comparison)
+from enade.course_bitmaps import RANKING_COLUMNS, RANKING_MIN_STUDENTS, course_scores, ranking_table, top_k
+from enade.course_index import CourseIndex
+from enade.demographics import DEMOGRAPHIC_TABLES, DemographicKernel
+from enade.loader import FACT_KEY, FILE_MAPPING
+from enade.sketch import DEFAULT_DELTA
+from enade.snapshot import SnapshotStore
+
+RANKING_SIZE = 10 # Cursos em cada ranking (padrão do dashboard)
+ENCODING = 'utf-8'
+# Vega, Vega-Lite e vega-embed carregados da CDN nas versões do Altair que gerou os specs
+EMBED_SCRIPTS = [f'https://cdn.jsdelivr.net/npm/vega@{alt.VEGA_VERSION}',
+                 f'https://cdn.jsdelivr.net/npm/vega-lite@{alt.VEGALITE_VERSION}',
+                 f'https://cdn.jsdelivr.net/npm/vega-embed@{alt.VEGAEMBED_VERSION}']
+
+
+# --- Serialização ---
+def _plain(value):
+    # Escalares do NumPy/pandas -> tipos do JSON (NaN vira null)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) else float(value)
+    return value
+
+
+def _records(df):
+    return _plain(df.to_dict(orient='records'))
+
+
+def _write_json(path, obj):
+    with open(path, 'w', encoding=ENCODING) as f:
+        json.dump(obj, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def slugify(label):
+    """Nome de arquivo ASCII para o rótulo do curso ('Relações Internacionais' -> 'relacoes-internacionais')."""
+    ascii_label = unicodedata.normalize('NFKD', str(label)).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '-', ascii_label.lower()).strip('-') or 'curso'
+
+
+# --- Páginas HTML ---
+def _format(value, decimals=2):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return '–'
+    if isinstance(value, (int, np.integer)):
+        return f"{value:,}".replace(",", ".")
+    return f"{value:.{decimals}f}"
+
+
+def _cell(row, col):
+    value = row.get(col)
+    text = html.escape(value if isinstance(value, str) else _format(value))
+    # Coluna 'Curso' vira link quando o registro traz o slug da página do curso
+    if col == 'Curso' and 'slug' in row:
+        return f'<a href="{row["slug"]}.html">{text}</a>'
+    return text
+
+
+def _table(rows):
+    # Tabela HTML a partir de registros (lista de dicts); a chave 'slug' não vira coluna
+    if not rows:
+        return '<p>Nenhum curso atende aos critérios.</p>'
+    columns = [c for c in rows[0] if c != 'slug']
+    head = ''.join(f'<th>{html.escape(str(c))}</th>' for c in columns)
+    body = ''.join('<tr>' + ''.join(f'<td>{_cell(r, c)}</td>' for c in columns) + '</tr>' for r in rows)
+    return f'<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def _metrics_html(metrics, deltas=None):
+    items = []
+    for label, value in metrics.items():
+        name = 'Nº de Participantes' if label == 'Participantes' else label
+        delta = (deltas or {}).get(label)
+        delta_html = f' <small>({delta:+.2f})</small>' if delta is not None else ''
+        items.append(f'<div class="metric"><span>{html.escape(name)}</span><b>{_format(value)}</b>{delta_html}</div>')
+    return f'<div class="metrics">{"".join(items)}</div>'
+
+
+def _chart_div(name, spec_path):
+    return f'<div class="chart" id="{name}" data-spec="{html.escape(spec_path)}"></div>'
+
+
+def _page(title, body, root=''):
+    scripts = ''.join(f'<script src="{src}"></script>' for src in EMBED_SCRIPTS)
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<link rel="stylesheet" href="{root}estilo.css">
+{scripts}
+</head>
+<body>
+{body}
+<script>
+document.querySelectorAll('.chart').forEach(function (el) {{
+  vegaEmbed(el, el.dataset.spec, {{actions: false}});
+}});
+</script>
+</body>
+</html>
+"""
+
+
+STYLE = """body { font-family: sans-serif; margin: 2rem auto; max-width: 1200px; padding: 0 1rem; }
+.metrics { display: flex; gap: 1.5rem; flex-wrap: wrap; margin: 1rem 0; }
+.metric span { display: block; font-size: .85rem; color: #555; }
+.metric b { font-size: 1.6rem; }
+.chart { width: 100%; margin: 1rem 0; }
+.row { display: flex; gap: 2rem; flex-wrap: wrap; }
+.row > div { flex: 1 1 400px; }
+table { border-collapse: collapse; margin: .5rem 0; }
+th, td { border: 1px solid #ddd; padding: .25rem .5rem; text-align: left; }
+"""
+
+
+# --- Páginas de curso (executadas nos processos do pool) ---
+def _course_pages(args):
+    # Um bloco de cursos: (rótulo, slug, notas ordenadas) -> métricas, spec e página de cada um
+    chunk, overall, years_label, out = args
+    written = []
+    for label, slug, values in chunk:
+        metrics = _plain(sorted_metrics(values))
+        deltas = {k: v - overall[k] for k, v in metrics.items()
+                  if k != 'Participantes' and v is not None and overall.get(k) is not None}
+        spec = score_histogram_chart(histogram_bins(pd.Series(values), maxbins=40)).to_dict()
+        _write_json(os.path.join(out, 'cursos', f'{slug}.vl.json'), spec)
+        _write_json(os.path.join(out, 'cursos', f'{slug}.json'),
+                    {'curso': label.strip(), 'anos': years_label, 'metricas': metrics, 'diferenca_geral': deltas})
+        body = (f'<p><a href="index.html">← Cursos</a></p>'
+                f'<h1>🔍 {html.escape(label.strip())} ({years_label})</h1>'
+                f'<p>Diferença em relação ao geral entre parênteses.</p>'
+                f'{_metrics_html(metrics, deltas)}'
+                f'<h2>Distribuição das Notas</h2>{_chart_div("histograma", f"{slug}.vl.json")}')
+        with open(os.path.join(out, 'cursos', f'{slug}.html'), 'w', encoding=ENCODING) as f:
+            f.write(_page(f'ENADE {years_label} — {label.strip()}', body, root='../'))
+        written.append({'Curso': label.strip(), 'slug': slug, 'Participantes': metrics['Participantes'],
+                        'Média': metrics['Média']})
+    return written
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# --- Exportação ---
+def export(out, years=None, workers=1, file_mapping=FILE_MAPPING, base_dir='', delta=DEFAULT_DELTA):
+    """Grava o pacote estático em `out` e devolve {etapa: segundos}."""
+    timings = {}
+    t0 = time.perf_counter()
+    snapshot = SnapshotStore(file_mapping, base_dir=base_dir, delta=delta).refresh()
+    dims = snapshot.dims
+    tempo = dims['tempo']
+    year_by_key = {int(k): int(a) for k, a in zip(tempo['TEMPO_KEY'], tempo['ANO'])
+                   if int(k) in set(snapshot.partition_values())}
+    # Padrão do dashboard: só o ano mais recente
+    available = sorted(year_by_key.values())
+    missing = sorted(set(years or []) - set(available))
+    if missing or not available:
+        raise ValueError(f"Anos sem dados na tabela fato: {missing or years} (disponíveis: {available})")
+    years = sorted(years) if years else available[-1:]
+    selected_keys = [k for k, a in year_by_key.items() if a in years]
+    years_label = ", ".join(str(y) for y in years)
+    view = snapshot.select(selected_keys)
+    dims = {**dims, **{k: v for k, v in view['tables'].items() if k != FACT_KEY}}
+    star, cube, sketches = view['star'], view['cube'], view['sketches']
+    selected = filter_years(star, years)
+    if selected is None:
+        selected = star
+    timings['leitura'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    os.makedirs(os.path.join(out, 'specs'), exist_ok=True)
+    os.makedirs(os.path.join(out, 'cursos'), exist_ok=True)
+    overall = _plain(overall_metrics(cube, sketches, years))
+    kernel = DemographicKernel({k: dims[k] for k in DEMOGRAPHIC_TABLES if k in dims}, dims['curso'], tempo=tempo)
+    totals = kernel.totals(kernel.mask(years=selected_keys))
+    charts = {'histograma': score_histogram_chart(histogram_bins(selected['NOTA_TOTAL'], maxbins=40)),
+              'sexo': sex_pie_chart(sex_pie(totals)),
+              'cor': race_pie_chart(race_pie(totals, kernel.columns['cor']))}
+    idade = age_counts(dims['idade'])
+    if idade is not None:
+        charts['idade'] = age_chart(idade)
+    renda_data, renda_order = income_bars(totals, kernel.columns['renda'])
+    if not renda_data.empty:
+        charts['renda'] = income_chart(renda_data, renda_order)
+    charts['escolaridade'] = parent_education_chart(*parent_education(totals, kernel.columns['escolaridade']))
+
+    course_stats, course_box = course_summary(cube, sketches, years)
+    index = CourseIndex(selected, 'DESC_CURSO', 'NOTA_TOTAL')
+    # Boxplot no valor inicial do slider do dashboard
+    min_students = max(10, int(course_stats['Num Estudantes'].quantile(0.1))) if len(course_stats) else 10
+    boxplot_courses = index.at_least(min_students)
+    if len(boxplot_courses):
+        charts['boxplot'] = course_boxplot_chart(course_box[course_box['DESC_CURSO'].isin(boxplot_courses)])
+
+    counts, means = course_scores(selected, dims['curso'])
+    ranking_min = max(1, min(RANKING_MIN_STUDENTS, int(counts.max()) if len(counts) else 1))
+    mask = counts >= ranking_min
+    rankings = {}
+    for name, largest in (('maiores', True), ('menores', False)):
+        table = ranking_table(dims['curso'], top_k(means, mask, RANKING_SIZE, largest=largest), counts, means,
+                              RANKING_COLUMNS).rename(columns=RANKING_COLUMNS)
+        table['Nota Média'] = table['Nota Média'].round(2)
+        rankings[name] = _records(table.map(lambda v: v.strip() if isinstance(v, str) else v))
+    comparison = _records(year_comparison(cube, sketches, years)) if len(years) > 1 else None
+
+    for name, chart in charts.items():
+        _write_json(os.path.join(out, 'specs', f'{name}.vl.json'), chart.to_dict())
+    timings['gráficos gerais'] = time.perf_counter() - t0
+
+    # --- Páginas de curso: notas ordenadas de cada curso (fatias do índice) em blocos ---
+    t0 = time.perf_counter()
+    slugs = {}
+    items = []
+    for label in course_stats.sort_values('Nota Média', ascending=False)['DESC_CURSO']:
+        values = index.course_values(label)
+        if not len(values):
+            continue
+        slug = slugify(label)
+        slugs[slug] = slugs.get(slug, 0) + 1
+        if slugs[slug] > 1:
+            slug = f'{slug}-{slugs[slug]}'
+        items.append((label, slug, np.array(values)))
+    chunk_size = max(1, math.ceil(len(items) / (workers * 4)))
+    tasks = [(chunk, overall, years_label, out) for chunk in _chunks(items, chunk_size)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pages = [page for result in pool.map(_course_pages, tasks) for page in result]
+    else:
+        pages = [page for task in tasks for page in _course_pages(task)]
+    timings['páginas de curso'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with open(os.path.join(out, 'cursos', 'index.html'), 'w', encoding=ENCODING) as f:
+        f.write(_page(f'ENADE {years_label} — Cursos', '<p><a href="../index.html">← Painel</a></p>'
+                      f'<h1>🎓 Cursos ({years_label})</h1>{_table(pages)}', root='../'))
+    _write_json(os.path.join(out, 'metrics.json'), {
+        'anos': years, 'versao': snapshot.version, 'metricas': overall, 'comparativo_anual': comparison,
+        'boxplot_min_participantes': min_students, 'ranking_min_participantes': ranking_min, 'rankings': rankings,
+        'graficos': {name: f'specs/{name}.vl.json' for name in charts},
+        'cursos': pages,
+    })
+    with open(os.path.join(out, 'estilo.css'), 'w', encoding=ENCODING) as f:
+        f.write(STYLE)
+    with open(os.path.join(out, 'index.html'), 'w', encoding=ENCODING) as f:
+        f.write(_page(f'Dashboard ENADE {years_label}', _index_body(years_label, overall, comparison, charts,
+                                                                   min_students, ranking_min, rankings)))
+    timings['índices'] = time.perf_counter() - t0
+    return timings
+
+
+def _index_body(years_label, overall, comparison, charts, min_students, ranking_min, rankings):
+    def chart(name):
+        return _chart_div(name, f'specs/{name}.vl.json') if name in charts else '<p>Dados não disponíveis.</p>'
+
+    parts = [f'<h1>📊 Análise Detalhada do ENADE {years_label}</h1>',
+             f'<p><b>Fonte de dados:</b> Microdados do INEP | <b>Ano de Análise:</b> {years_label}</p>',
+             f'<h2>📋 Performance Geral dos Participantes ({years_label})</h2>', _metrics_html(overall)]
+    if comparison:
+        parts.append(_table(comparison))
+    parts += ['<h3>Distribuição das Notas</h3>', chart('histograma'),
+              '<h2>👥 Perfil Demográfico dos Participantes</h2>',
+              f'<div class="row"><div><h3>Distribuição por Sexo</h3>{chart("sexo")}</div>'
+              f'<div><h3>Distribuição por Cor/Raça</h3>{chart("cor")}</div></div>',
+              '<h3>Distribuição de Idade dos Participantes</h3>', chart('idade'),
+              '<h2>💰 Contexto Socioeconômico</h2>',
+              f'<div class="row"><div><h3>Renda Familiar Mensal</h3>{chart("renda")}</div>'
+              f'<div><h3>Escolaridade dos Pais x Mães</h3>{chart("escolaridade")}</div></div>',
+              '<h2>🎓 Desempenho por Curso</h2>',
+              f'<h3>Distribuição das Notas por Curso (≥ {min_students} participantes)</h3>', chart('boxplot'),
+              '<p><a href="cursos/index.html">🔍 Comparativo detalhado por curso</a></p>',
+              f'<h3>🏆 Ranking de Cursos por Nota Média (≥ {ranking_min} participantes)</h3>',
+              f'<div class="row"><div><h4>Maiores médias</h4>{_table(rankings["maiores"])}</div>'
+              f'<div><h4>Menores médias</h4>{_table(rankings["menores"])}</div></div>']
+    return '\n'.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporta o dashboard como pacote estático HTML/JSON')
+    parser.add_argument('--out', required=True, help='diretório de saída')
+    parser.add_argument('--years', type=int, nargs='+', help='edições do ENADE (padrão: a mais recente)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='processos para as páginas de curso')
+    args = parser.parse_args()
+    try:
+        timings = export(args.out, args.years, max(1, args.workers))
+    except ValueError as e:
+        parser.error(str(e))
+    for stage, seconds in timings.items():
+        print(f"{stage:<20}{seconds:>8.2f} s")
+    print(f"Pacote gravado em {args.out}")
+
+
+if __name__ == '__main__':
+    main()
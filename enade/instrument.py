@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Instrumentação do caminho quente (leitura, joins, preparo de cada seção, gráficos): cada
+# etapa vira um registro com tempo, linhas de entrada/saída, memória das tabelas e acerto ou
+# erro de cache. O gravador ativo é por thread (o Streamlit roda o script de cada sessão na
+# sua thread); desligado, span() devolve um objeto vazio compartilhado e o custo é uma chamada.
+
+LOG_ENCODING = 'utf-8'
+LOG_MAX_BYTES = 10 * 2 ** 20 # Log maior que isso vira <log>.1 (substituindo o anterior) antes da próxima linha
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+def _size(obj):
+    # Linhas de uma tabela/array (ou soma das linhas de várias); None se não é tabela
+    if isinstance(obj, dict):
+        sizes = [_size(v) for v in obj.values()]
+        sizes = [s for s in sizes if s is not None]
+        return sum(sizes) if sizes else None
+    if isinstance(obj, tuple):
+        return _size(dict(enumerate(obj)))
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index, np.ndarray)):
+        return len(obj)
+    return None
+
+
+def _memory_mb(obj):
+    # Memória das tabelas (sem deep: categóricas e numéricas são contadas exatamente)
+    if isinstance(obj, (dict, tuple)):
+        values = obj.values() if isinstance(obj, dict) else obj
+        sizes = [_memory_mb(v) for v in values]
+        sizes = [s for s in sizes if s is not None]
+        return sum(sizes) if sizes else None
+    if isinstance(obj, pd.DataFrame):
+        return obj.memory_usage(index=False).sum() / 2 ** 20
+    if isinstance(obj, pd.Series):
+        return obj.memory_usage(index=False) / 2 ** 20
+    if isinstance(obj, pd.Index):
+        return obj.memory_usage() / 2 ** 20
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes / 2 ** 20
+    return None
+
+
+class Span:
+    """Uma etapa medida: tempo de parede, linhas de entrada/saída, memória e cache."""
+
+    def __init__(self, recorder, name, rows_in, cached):
+        self.recorder = recorder
+        self.name = name
+        self.depth = len(recorder.open)
+        self.rows_in = _size(rows_in)
+        self.rows_out = None
+        self.memory_mb = None
+        self.cache = 'acerto' if cached else None
+        self.ms = None
+
+    def __enter__(self):
+        self.recorder.open.append(self)
+        self.recorder.records.append(self)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self._t0) * 1e3
+        self.recorder.open.pop()
+        return False
+
+    def output(self, obj):
+        """Registra linhas e memória do resultado da etapa e o devolve."""
+        self.rows_out = _size(obj)
+        self.memory_mb = _memory_mb(obj)
+        return obj
+
+    def as_dict(self):
+        return {'etapa': self.name, 'nivel': self.depth, 'ms': round(self.ms, 3) if self.ms is not None else None,
+                'linhas_entrada': self.rows_in, 'linhas_saida': self.rows_out,
+                'memoria_mb': round(self.memory_mb, 3) if self.memory_mb is not None else None,
+                'cache': self.cache}
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def output(self, obj):
+        return obj
+
+
+class _NullRecorder:
+    enabled = False
+    finished = True
+
+    def span(self, name, rows_in=None, cached=False):
+        return NULL_SPAN
+
+    def mark_miss(self):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+NULL_RECORDER = _NullRecorder()
+
+
+class Recorder:
+    """Registros de um rerun (script inteiro ou só um fragmento), gravados em JSON lines no fim."""
+
+    enabled = True
+
+    def __init__(self, kind, session=None, log_path=None):
+        self.kind = kind
+        self.session = session
+        self.log_path = log_path
+        self.records = []
+        self.open = []
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.total_ms = None
+        self.finished = False
+
+    def span(self, name, rows_in=None, cached=False):
+        return Span(self, name, rows_in, cached)
+
+    def mark_miss(self):
+        """Marca como erro de cache a etapa cacheada aberta mais interna (chamado no corpo da função)."""
+        for span in reversed(self.open):
+            if span.cache is not None:
+                span.cache = 'erro'
+                return
+
+    def as_dict(self):
+        return {'inicio': datetime.fromtimestamp(self.started).isoformat(timespec='milliseconds'),
+                'sessao': self.session, 'tipo': self.kind,
+                'ms': round(self.total_ms, 3) if self.total_ms is not None else None,
+                'etapas': [span.as_dict() for span in self.records]}
+
+    def table(self):
+        """Registros como DataFrame (etapas aninhadas indentadas), para o painel."""
+        rows = [span.as_dict() for span in self.records]
+        for row in rows:
+            row['etapa'] = '  ' * row.pop('nivel') + row['etapa']
+        return pd.DataFrame(rows, columns=['etapa', 'ms', 'linhas_entrada', 'linhas_saida', 'memoria_mb', 'cache'])
+
+    def finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        self.total_ms = (time.perf_counter() - self._t0) * 1e3
+        if self.log_path:
+            line = json.dumps(self.as_dict(), ensure_ascii=False, default=str)
+            with _log_lock:
+                _rotate(self.log_path)
+                with open(self.log_path, 'a', encoding=LOG_ENCODING) as f:
+                    f.write(line + '\n')
+
+
+def _rotate(log_path):
+    # No máximo dois arquivos de log (o atual e o .1): o disco usado fica limitado
+    try:
+        if os.path.getsize(log_path) >= LOG_MAX_BYTES:
+            os.replace(log_path, log_path + '.1')
+    except OSError:
+        pass
+
+
+def active():
+    """Gravador ativo na thread atual (o nulo se a instrumentação está desligada)."""
+    return getattr(_local, 'recorder', NULL_RECORDER)
+
+
+def span(name, rows_in=None, cached=False):
+    return active().span(name, rows_in, cached)
+
+
+def mark_miss():
+    active().mark_miss()
+
+
+def start(kind, enabled, session=None, log_path=None):
+    """Ativa um gravador novo na thread atual (ou o nulo, se desligado) e o devolve."""
+    recorder = Recorder(kind, session, log_path) if enabled else NULL_RECORDER
+    _local.recorder = recorder
+    return recorder
+
+
+def finish(recorder):
+    """Encerra o rerun: grava a linha do log e desativa o gravador."""
+    if recorder.enabled:
+        recorder.finish()
+    _local.recorder = NULL_RECORDER
+
+
+@contextmanager
+def scope(kind, parent):
+    """Etapa dentro do rerun de `parent` ou, se ele já terminou (rerun só de um fragmento),
+    um rerun próprio com o mesmo destino de log."""
+    if not parent.enabled:
+        yield NULL_RECORDER
+    elif not parent.finished:
+        with parent.span(kind):
+            yield parent
+    else:
+        recorder = start(kind, True, parent.session, parent.log_path)
+        try:
+            yield recorder
+        finally:
+            finish(recorder)
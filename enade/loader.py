@@ -0,0 +1,500 @@
+import functools
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # Sem pyarrow: sempre lê os CSVs com o parser do pandas
+    pa = None
+    pa_csv = None
+    pa_ipc = None
+
+# --- Constantes ---
+# Esquema declarativo: tipos exatos de cada coluna, aplicados durante o parse do CSV.
+# Contagens e chaves em inteiros compactos, notas em float32 e descrições repetidas
+# como 'category' (um código por linha em vez de uma string Python por linha).
+COURSE_YEAR_DTYPES = {'D_CURSO_CURSO_KEY': 'int32', 'D_TEMPO_TEMPO_KEY': 'int16'}
+
+
+def _counts(*cols):
+    return {col: 'int32' for col in cols}
+
+
+FILE_MAPPING = {
+    'tempo': {'fname': 'TEMPO.csv', 'pk': 'TEMPO_KEY',
+              'dtypes': {'TEMPO_KEY': 'int16', 'ANO': 'int16'}},
+    'curso': {'fname': 'CURSO.csv', 'pk': 'CURSO_KEY',
+              'dtypes': {'CURSO_KEY': 'int32', 'CO_CURSO': 'int32', 'DESC_CURSO': 'category',
+                         'CO_CATEGORIA': 'int16', 'DESC_CATEGORIA': 'category',
+                         'CO_GRUPO': 'int16', 'DESC_GRUPO': 'category',
+                         'CO_MODALIDADE': 'int16', 'DESC_MODALIDADE': 'category',
+                         'CO_UF_CURSO': 'int16', 'DESC_UF_CURSO': 'category',
+                         'CO_REGIAO_CURSO': 'int16', 'DESC_REGIAO_CURSO': 'category',
+                         'VERSAO': 'int16', 'DT_INI': 'category', 'DT_FIM': 'category'},
+              # Dimensão de variação lenta: cada linha da fato usa a versão do CO_CURSO
+              # vigente em 1º de janeiro do ANO (TEMPO) da linha, DT_INI <= data < DT_FIM
+              'versions': {'natural_key': 'CO_CURSO', 'valid_from': 'DT_INI', 'valid_to': 'DT_FIM',
+                           'as_of': ('tempo', 'ANO')}},
+    'desempenho': {'fname': 'DESEMPENHO.csv', 'partition_by': 'D_TEMPO_TEMPO_KEY',
+                   'dtypes': {'NOTA_TOTAL': 'float32', 'NOTAL_GERAL': 'float32', 'NOTA_ESPECIFICA': 'float32',
+                              **COURSE_YEAR_DTYPES}},
+    'sexo': {'fname': 'SEXO.csv', 'pk': 'SEXO_KEY', 'partition_by': 'D_TEMPO_TEMPO_KEY',
+             'dtypes': {**_counts('QTD_FEMININO', 'QTD_MASCULINO', 'QTD_N_INFORMADO'), **COURSE_YEAR_DTYPES}},
+    'idade': {'fname': 'IDADE.csv', 'pk': 'IDADE_KEY',
+              'dtypes': {'IDADE_KEY': 'int16', 'IDADE': 'category'}},
+    'renda': {'fname': 'RENDA.csv', 'pk': 'RENDA_KEY', 'partition_by': 'D_TEMPO_TEMPO_KEY',
+              'dtypes': {**_counts('QTD_RENDA_ATE_1_5SM', 'QTD_RENDA_1_5A3SM', 'QTD_RENDA_3A4_5SM',
+                                   'QTD_RENDA_4_5A6SM', 'QTD_RENDA_6A10SM', 'QTD_RENDA_10A30SM',
+                                   'QTD_RENDA_ACIMA_30SM'),
+                         **COURSE_YEAR_DTYPES}},
+    'cor': {'fname': 'COR.csv', 'pk': 'COR_KEY', 'partition_by': 'D_TEMPO_TEMPO_KEY',
+            'dtypes': {**_counts('QTD_AMARELA', 'QTD_BRANCA', 'QTD_PRETA', 'QTD_PARDA', 'QTD_INDIGENA',
+                                 'QTD_NAO_DECLARADA'),
+                       **COURSE_YEAR_DTYPES}},
+    'escolaridade': {'fname': 'ESCOLARIDADE.csv', 'pk': 'ESCOLARIDADE_KEY', 'partition_by': 'D_TEMPO_TEMPO_KEY',
+                     'dtypes': {**_counts('QTD_PAI_NENHUMA', 'QTD_MAE_NENHUMA', 'QTD_PAI_FUND_I', 'QTD_MAE_FUND_I',
+                                          'QTD_PAI_FUND_II', 'QTD_MAE_FUND_II', 'QTD_PAI_MEDIO', 'QTD_MAE_MEDIO',
+                                          'QTD_PAI_SUPERIOR', 'QTD_MAE_SUPERIOR', 'QTD_PAI_POS', 'QTD_MAE_POS'),
+                                **COURSE_YEAR_DTYPES}}
+}
+FACT_FK_MAPPING = {
+    'tempo': 'D_TEMPO_TEMPO_KEY',
+    'curso': 'D_CURSO_CURSO_KEY',
+    'idade': 'D_IDADE_IDADE_KEY', # Necessário para o gráfico de idade correto
+    # Adicione outras FKs se precisar cruzar mais dados demográficos com desempenho
+}
+FACT_KEY = 'desempenho'
+
+# Cache colunar (Arrow IPC) ao lado dos CSVs. Incrementar CACHE_VERSION sempre que
+# a limpeza/tipagem mudar, para invalidar caches gravados por versões anteriores.
+CACHE_DIR = '.enade_cache'
+CACHE_VERSION = 2
+# Partições (tabela, ano) mantidas em memória; as menos usadas são descartadas
+PARTITION_CACHE_SIZE = 16
+# Tabelas lidas em paralelo (threads); o parser do pyarrow e o mmap liberam o GIL
+LOAD_WORKERS = 8
+# Bloco de leitura do hash do trecho do CSV já processado (detecção de linhas acrescentadas)
+PREFIX_CHUNK = 1 << 20
+
+
+def _to_numeric_if_possible(series):
+    # Equivalente a pd.to_numeric(errors='ignore'), removido no pandas 3
+    try:
+        return pd.to_numeric(series)
+    except (ValueError, TypeError):
+        return series
+
+
+def _read_csv_arrow(path, dtypes):
+    # Parser CSV do pyarrow: multithread e fora do GIL, então várias tabelas são lidas em
+    # paralelo de fato. Categóricas são lidas como texto (sem inferir datas) e convertidas
+    # depois, com as categorias ordenadas como no parser do pandas.
+    column_types = {col: pa.string() if dtype == 'category' else pa.from_numpy_dtype(np.dtype(dtype))
+                    for col, dtype in dtypes.items()}
+    table = pa_csv.read_csv(path, parse_options=pa_csv.ParseOptions(delimiter=';', quote_char='"'),
+                            convert_options=pa_csv.ConvertOptions(column_types=column_types,
+                                                                  strings_can_be_null=True))
+    df = table.to_pandas()
+    df.columns = df.columns.str.strip().str.replace('"', '', regex=False)
+    return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+
+
+def read_csv_clean(path, dtypes=None):
+    """Lê um CSV do INEP (separado por ';') aplicando o esquema e remove aspas residuais.
+
+    `path` também pode ser um arquivo em memória (ex.: cabeçalho + linhas novas).
+    """
+    if pa_csv is not None and dtypes:
+        df = _read_csv_arrow(path, dtypes)
+    else:
+        df = pd.read_csv(path, sep=';', quotechar='"', encoding='utf-8', low_memory=False, dtype=dtypes)
+    df.columns = df.columns.str.strip().str.replace('"', '', regex=False)
+    for col in df.select_dtypes(include=['object']).columns:
+        if df[col].astype(str).str.contains('"').any():
+            df[col] = df[col].astype(str).str.replace('"', '', regex=False).str.strip()
+    for col in df.select_dtypes(include=['category']).columns:
+        # Em colunas categóricas basta limpar as categorias, não cada linha
+        categories = df[col].cat.categories
+        if categories.astype(str).str.contains('"').any():
+            cleaned = categories.astype(str).str.replace('"', '', regex=False).str.strip()
+            if cleaned.is_unique:
+                df[col] = df[col].cat.rename_categories(cleaned)
+            else:
+                df[col] = df[col].map(dict(zip(categories, cleaned))).astype('category')
+    return df
+
+
+def prepare_table(key, info, df):
+    """Converte chaves para numérico e, na tabela fato, descarta linhas sem NOTA_TOTAL."""
+    if key == FACT_KEY:
+        for fact_fk in FACT_FK_MAPPING.values():
+            if fact_fk in df.columns:
+                df[fact_fk] = _to_numeric_if_possible(df[fact_fk])
+        if 'NOTA_TOTAL' in df.columns:
+            if not pd.api.types.is_float_dtype(df['NOTA_TOTAL']):
+                df['NOTA_TOTAL'] = pd.to_numeric(df['NOTA_TOTAL'], errors='coerce')
+            df = df.dropna(subset=['NOTA_TOTAL']).reset_index(drop=True) # Remove linhas onde a nota é NaN
+    else:
+        pk = info.get('pk')
+        if pk and pk in df.columns:
+            df[pk] = _to_numeric_if_possible(df[pk])
+    return df
+
+
+# --- Cache colunar ---
+def source_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'version': CACHE_VERSION}
+
+
+def _cache_paths(path, cache_dir):
+    base = os.path.join(cache_dir, os.path.basename(path))
+    return base + '.arrow', base + '.json'
+
+
+def _read_arrow(arrow_path):
+    with pa.memory_map(arrow_path, 'r') as source:
+        table = pa_ipc.open_file(source).read_all()
+    # split_blocks evita consolidar colunas numéricas em um único bloco (menos cópias)
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_arrow(df, arrow_path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = arrow_path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, arrow_path)
+
+
+def _write_json(obj, json_path):
+    tmp_path = json_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, json_path)
+
+
+def concat_tables(frames):
+    """pd.concat que mantém colunas categóricas mesmo com categorias diferentes (união ordenada)."""
+    frames = list(frames)
+    if len(frames) == 1:
+        return frames[0]
+    out = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype) and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = pd.api.types.union_categoricals([f[col] for f in frames], sort_categories=True)
+    return out
+
+
+def frame_digest(df):
+    """Hash do conteúdo (colunas, tipos e valores) de um DataFrame."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def read_cached(path, cache_dir=CACHE_DIR):
+    """Devolve a tabela do cache (memory-mapped) se ele corresponder ao CSV atual; senão None."""
+    if pa is None:
+        return None
+    arrow_path, meta_path = _cache_paths(path, cache_dir)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta != source_signature(path):
+            return None
+        return _read_arrow(arrow_path)
+    except (OSError, ValueError, pa.ArrowInvalid):
+        return None
+
+
+def write_cache(df, path, cache_dir=CACHE_DIR):
+    """Grava a tabela limpa em Arrow IPC. Falhas (diretório somente leitura etc.) são ignoradas."""
+    if pa is None:
+        return False
+    arrow_path, meta_path = _cache_paths(path, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_arrow(df, arrow_path)
+        # Metadados gravados por último: cache só é válido depois do .arrow completo
+        _write_json(source_signature(path), meta_path)
+    except (OSError, pa.ArrowException):
+        return False
+    return True
+
+
+def read_table(key, info, base_dir='', use_cache=True, cache_dir=None):
+    """Lê uma tabela do esquema estrela: cache colunar se válido, senão CSV (e reconstrói o cache).
+
+    O cache fica em `cache_dir` (padrão: .enade_cache dentro de base_dir).
+    """
+    path = os.path.join(base_dir, info['fname'])
+    cache_dir = cache_dir or os.path.join(base_dir, CACHE_DIR)
+    if use_cache:
+        df = read_cached(path, cache_dir)
+        if df is not None:
+            return df
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    df = prepare_table(key, info, read_csv_clean(path, info.get('dtypes')))
+    if use_cache:
+        write_cache(df, path, cache_dir)
+    return df
+
+
+def read_tables(file_mapping, reader=read_table, workers=LOAD_WORKERS, **kwargs):
+    """Aplica reader(key, info, **kwargs) a cada tabela do mapeamento em paralelo. Devolve {key: df}.
+
+    Exceções (ex.: FileNotFoundError) são relançadas na ordem do mapeamento.
+    """
+    if workers <= 1 or len(file_mapping) <= 1:
+        return {key: reader(key, info, **kwargs) for key, info in file_mapping.items()}
+    with ThreadPoolExecutor(max_workers=min(workers, len(file_mapping))) as pool:
+        futures = {key: pool.submit(reader, key, info, **kwargs) for key, info in file_mapping.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+
+def load_tables(file_mapping=FILE_MAPPING, base_dir='', use_cache=True, cache_dir=None):
+    """Carrega todas as tabelas do mapeamento (em paralelo). Devolve (dims, fact)."""
+    tables = read_tables(file_mapping, base_dir=base_dir, use_cache=use_cache, cache_dir=cache_dir)
+    fact = tables.pop(FACT_KEY, None)
+    return tables, fact
+
+
+# --- Partições por ano ---
+# Tabelas com 'partition_by' são gravadas como um arquivo Arrow por valor da coluna
+# (D_TEMPO_TEMPO_KEY), com um manifest.json que guarda a assinatura do CSV de origem,
+# as linhas e o hash de cada partição, e o tamanho/hash do trecho do CSV já processado
+# (para reconhecer linhas acrescentadas no fim). Só as partições pedidas são lidas.
+def _partition_dir(path, cache_dir):
+    return os.path.join(cache_dir, os.path.basename(path) + '.parts')
+
+
+def _prefix_digests(path, offset):
+    # Uma passada pelo arquivo: hash dos primeiros `offset` bytes (None se o arquivo for
+    # menor), hash do arquivo inteiro e se esse trecho termina em fim de linha
+    whole = hashlib.blake2b(digest_size=16)
+    prefix, at_line_end, read, last = None, False, 0, b''
+    with open(path, 'rb') as f:
+        while read < offset:
+            chunk = f.read(min(PREFIX_CHUNK, offset - read))
+            if not chunk:
+                break
+            whole.update(chunk)
+            read, last = read + len(chunk), chunk
+        if read == offset:
+            prefix, at_line_end = whole.hexdigest(), offset == 0 or last.endswith(b'\n')
+        for chunk in iter(lambda: f.read(PREFIX_CHUNK), b''):
+            whole.update(chunk)
+    return prefix, whole.hexdigest(), at_line_end
+
+
+def _file_digest(path):
+    return _prefix_digests(path, 0)[1]
+
+
+def _write_partition(part, part_dir, column, value):
+    # O hash no nome torna cada arquivo imutável: um snapshot antigo nunca lê, com o hash
+    # antigo, o conteúdo regravado por uma atualização. Os arquivos substituídos ficam no
+    # diretório até prune_partitions, chamado quando nenhum snapshot vivo os cita
+    digest = frame_digest(part)
+    fname = f'{column}={value}.{digest[:12]}.arrow'
+    _write_arrow(part, os.path.join(part_dir, fname))
+    return {'file': fname, 'rows': len(part), 'digest': digest}
+
+
+def _write_manifest(part_dir, signature, column, partitions, offset, prefix):
+    manifest = {'source': signature, 'column': column, 'partitions': partitions,
+                'offset': offset, 'prefix': prefix}
+    _write_json(manifest, os.path.join(part_dir, 'manifest.json'))
+    return manifest
+
+
+def build_partitions(key, info, base_dir=''):
+    """Lê o CSV uma vez e grava uma partição por valor de info['partition_by']. Devolve o manifest."""
+    path = os.path.join(base_dir, info['fname'])
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    if pa is None:
+        return None
+    part_dir = _partition_dir(path, os.path.join(base_dir, CACHE_DIR))
+    column = info['partition_by']
+    signature = source_signature(path)
+    prefix = _file_digest(path)
+    df = prepare_table(key, info, read_csv_clean(path, info.get('dtypes')))
+    try:
+        os.makedirs(part_dir, exist_ok=True)
+        partitions = {str(value): _write_partition(part.reset_index(drop=True), part_dir, column, value)
+                      for value, part in df.groupby(column, sort=True, observed=True)}
+        # Esquema vazio para seleções sem nenhuma partição
+        _write_arrow(df.iloc[:0], os.path.join(part_dir, '_empty.arrow'))
+        return _write_manifest(part_dir, signature, column, partitions, signature['size'], prefix)
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def prune_partitions(key, info, base_dir='', keep=()):
+    """Apaga as partições que nem o manifest atual nem `keep` (arquivos ainda citados por
+    snapshots em uso) referenciam. Falhas (diretório somente leitura etc.) são ignoradas."""
+    part_dir = _partition_dir(os.path.join(base_dir, info['fname']), os.path.join(base_dir, CACHE_DIR))
+    manifest = _read_manifest(part_dir)
+    if manifest is None:
+        return
+    live = {p['file'] for p in manifest['partitions'].values()} | set(keep) | {'_empty.arrow', 'manifest.json'}
+    try:
+        for fname in os.listdir(part_dir):
+            if fname not in live:
+                os.remove(os.path.join(part_dir, fname))
+    except OSError:
+        pass
+
+
+def _read_manifest(part_dir):
+    try:
+        with open(os.path.join(part_dir, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_appended(key, info, path, manifest):
+    # Linhas acrescentadas depois do trecho já processado (None se o trecho mudou):
+    # lê só os bytes novos, com o cabeçalho do CSV na frente
+    offset = manifest.get('offset')
+    if not offset or os.path.getsize(path) < offset:
+        return None, None
+    prefix, whole, at_line_end = _prefix_digests(path, offset)
+    if prefix != manifest.get('prefix') or not at_line_end:
+        return None, whole
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(offset)
+        tail = f.read()
+    return prepare_table(key, info, read_csv_clean(io.BytesIO(header + tail), info.get('dtypes'))), whole
+
+
+def update_partitions(key, info, base_dir=''):
+    """Põe as partições em dia com o CSV processando só o que mudou. Devolve (manifest, changes).
+
+    changes = {valor: ('append', linhas novas) | ('replace', None) | ('remove', None)}:
+    se o CSV só cresceu (mesmo hash no trecho já processado), só os bytes novos são lidos e
+    apenas as partições que receberam linhas são regravadas; senão o CSV é relido e só as
+    partições cujo hash mudou são regravadas. Sem cache colunar devolve (None, {}).
+    """
+    path = os.path.join(base_dir, info['fname'])
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    part_dir = _partition_dir(path, os.path.join(base_dir, CACHE_DIR))
+    old = _read_manifest(part_dir)
+    signature = source_signature(path)
+    if old is not None and old.get('source') == signature:
+        return old, {}
+    if old is None or pa is None or 'offset' not in old:
+        manifest = build_partitions(key, info, base_dir=base_dir)
+        return manifest, {int(v): ('replace', None) for v in (manifest or {}).get('partitions', {})}
+
+    column = info['partition_by']
+    partitions = dict(old['partitions'])
+    changes = {}
+    appended, prefix = _read_appended(key, info, path, old)
+    try:
+        if appended is not None:
+            for value, rows in appended.groupby(column, sort=True, observed=True):
+                rows = rows.reset_index(drop=True)
+                current = partitions.get(str(value))
+                if current is None:
+                    part, changes[int(value)] = rows, ('replace', None)
+                else:
+                    part = concat_tables([_read_arrow(os.path.join(part_dir, current['file'])), rows])
+                    changes[int(value)] = ('append', rows)
+                partitions[str(value)] = _write_partition(part, part_dir, column, value)
+        else:
+            # Linhas corrigidas/removidas: relê tudo, mas só regrava partições com hash diferente
+            df = prepare_table(key, info, read_csv_clean(path, info.get('dtypes')))
+            partitions = {}
+            for value, part in df.groupby(column, sort=True, observed=True):
+                part = part.reset_index(drop=True)
+                current = old['partitions'].get(str(value))
+                if current is not None and current['digest'] == frame_digest(part):
+                    partitions[str(value)] = current
+                    continue
+                partitions[str(value)] = _write_partition(part, part_dir, column, value)
+                changes[int(value)] = ('replace', None)
+            changes.update({int(v): ('remove', None) for v in old['partitions'] if v not in partitions})
+            prefix = prefix or _file_digest(path)
+        manifest = _write_manifest(part_dir, signature, column, partitions, signature['size'], prefix)
+    except (OSError, pa.ArrowException):
+        return None, {}
+    return manifest, changes
+
+
+def partition_manifest(key, info, base_dir=''):
+    """Manifest das partições da tabela, atualizando-as se o CSV mudou (None sem cache colunar)."""
+    return update_partitions(key, info, base_dir=base_dir)[0]
+
+
+def partition_values(key, info, base_dir=''):
+    """Valores de partição disponíveis (ex.: chaves de TEMPO presentes na tabela)."""
+    manifest = partition_manifest(key, info, base_dir=base_dir)
+    if manifest is None:
+        df = read_table(key, info, base_dir=base_dir, use_cache=False)
+        return sorted(df[info['partition_by']].dropna().unique().tolist())
+    return sorted(int(v) for v in manifest['partitions'])
+
+
+@functools.lru_cache(maxsize=PARTITION_CACHE_SIZE)
+def _read_partition(arrow_path, digest):
+    # O hash na chave invalida a entrada quando a partição é regravada
+    return _read_arrow(arrow_path)
+
+
+@functools.lru_cache(maxsize=PARTITION_CACHE_SIZE)
+def _read_partition_set(parts):
+    # Vários anos concatenados uma vez por processo, não a cada rerun de cada sessão
+    return pd.concat([_read_partition(path, digest) for path, digest in parts], ignore_index=True)
+
+
+def read_partitions(key, info, values, base_dir='', manifest=None):
+    """Lê só as partições em `values`; partições e combinações ficam num cache LRU do processo.
+
+    Com `manifest`, lê as partições daquele manifest (ex.: de um snapshot) sem consultar o CSV.
+    O DataFrame devolvido é compartilhado entre chamadas e deve ser tratado como somente leitura.
+    """
+    manifest = manifest or partition_manifest(key, info, base_dir=base_dir)
+    if manifest is None:
+        # Sem pyarrow/diretório gravável: lê o CSV inteiro e filtra em memória
+        df = read_table(key, info, base_dir=base_dir, use_cache=False)
+        return df[df[info['partition_by']].isin(list(values))].reset_index(drop=True)
+    part_dir = _partition_dir(os.path.join(base_dir, info['fname']), os.path.join(base_dir, CACHE_DIR))
+    parts = []
+    for value in values:
+        part = manifest['partitions'].get(str(value))
+        if part is not None:
+            parts.append((os.path.join(part_dir, part['file']), part['digest']))
+    if not parts:
+        return _read_partition(os.path.join(part_dir, '_empty.arrow'), 'empty')
+    return _read_partition(*parts[0]) if len(parts) == 1 else _read_partition_set(tuple(parts))
+
+
+def schema_memory_report(file_mapping=FILE_MAPPING, base_dir=''):
+    """Memória residente (deep) de cada tabela lida sem e com o esquema declarado."""
+    rows = []
+    for key, info in file_mapping.items():
+        path = os.path.join(base_dir, info['fname'])
+        if not os.path.exists(path):
+            continue
+        before = int(read_csv_clean(path).memory_usage(deep=True).sum())
+        after = int(read_csv_clean(path, info.get('dtypes')).memory_usage(deep=True).sum())
+        rows.append({'tabela': key, 'sem_esquema': before, 'com_esquema': after,
+                     'reducao': 1 - after / before if before else 0.0})
+    return pd.DataFrame(rows)
@@ -0,0 +1,118 @@
+import numpy as np
+
+DEFAULT_DELTA = 500  # ~0,2% de erro de posto na mediana de grupos com milhares de linhas
+
+
+def _k_scale(q, delta):
+    # Função de escala k1 do t-digest: faixas estreitas nas caudas e largas perto da mediana
+    return delta / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+
+class QuantileSketches:
+    """t-digests de vários grupos em arrays planos, centroides ordenados por (grupo, média).
+
+    O grupo g ocupa means/weights[offsets[g]:offsets[g + 1]]; min/max de cada grupo são
+    guardados à parte. `merge` combina grupos (rollup) em tempo proporcional ao número de
+    centroides, não de linhas, e `quantile` interpola entre os centroides com o mesmo
+    método (R-7) do pandas. Com delta=None nada é comprimido e os quantis são exatos.
+    """
+
+    def __init__(self, means, weights, offsets, vmin, vmax, delta=DEFAULT_DELTA):
+        self.means = means
+        self.weights = weights
+        self.offsets = offsets
+        self.vmin = vmin
+        self.vmax = vmax
+        self.delta = delta
+        self.count = np.bincount(np.repeat(np.arange(len(offsets) - 1), np.diff(offsets)),
+                                 weights=weights, minlength=len(offsets) - 1)
+        self._points = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @classmethod
+    def from_values(cls, codes, values, ngroups, delta=DEFAULT_DELTA):
+        """Um sketch por grupo a partir de valores brutos e do código do grupo de cada valor (-1 = ignora)."""
+        values = np.asarray(values, dtype='float64')
+        codes = np.asarray(codes, dtype=np.int64)
+        valid = ~np.isnan(values) & (codes >= 0)
+        codes, values = codes[valid], values[valid]
+        vmin = np.full(ngroups, np.inf)
+        vmax = np.full(ngroups, -np.inf)
+        np.minimum.at(vmin, codes, values)
+        np.maximum.at(vmax, codes, values)
+        return cls._build(codes, values, np.ones(len(values)), ngroups, vmin, vmax, delta)
+
+    @classmethod
+    def _build(cls, codes, means, weights, ngroups, vmin, vmax, delta):
+        order = np.lexsort((means, codes))
+        codes, means, weights = codes[order], means[order], weights[order]
+        if delta is not None and len(codes):
+            # Centroides vizinhos cujo quantil central cai na mesma faixa inteira de k são fundidos
+            totals = np.bincount(codes, weights=weights, minlength=ngroups)
+            starts = np.concatenate([[0.0], np.cumsum(totals)[:-1]])
+            before = np.cumsum(weights) - weights - starts[codes]
+            k = np.floor(_k_scale((before + weights / 2) / totals[codes], delta))
+            new = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (k[1:] != k[:-1])])
+            merged_weights = np.add.reduceat(weights, new)
+            means = np.add.reduceat(weights * means, new) / merged_weights
+            codes, weights = codes[new], merged_weights
+        offsets = np.zeros(ngroups + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=ngroups), out=offsets[1:])
+        return cls(means, weights, offsets, vmin, vmax, delta)
+
+    @classmethod
+    def concat(cls, sketches):
+        """Junta conjuntos de sketches em sequência (os grupos de cada um, sem fundir nada)."""
+        sketches = list(sketches)
+        if len(sketches) == 1:
+            return sketches[0]
+        starts = np.cumsum([0] + [len(s.means) for s in sketches[:-1]])
+        offsets = np.concatenate([[0]] + [s.offsets[1:] + start for s, start in zip(sketches, starts)])
+        return cls(np.concatenate([s.means for s in sketches]), np.concatenate([s.weights for s in sketches]),
+                   offsets.astype(np.int64), np.concatenate([s.vmin for s in sketches]),
+                   np.concatenate([s.vmax for s in sketches]), sketches[0].delta)
+
+    def merge(self, codes, ngroups):
+        """Combina os grupos: o grupo g entra no novo grupo codes[g] (-1 = descartado)."""
+        codes = np.asarray(codes, dtype=np.int64)
+        centroid_codes = np.repeat(codes, np.diff(self.offsets))
+        keep = centroid_codes >= 0
+        vmin = np.full(ngroups, np.inf)
+        vmax = np.full(ngroups, -np.inf)
+        np.minimum.at(vmin, codes[codes >= 0], self.vmin[codes >= 0])
+        np.maximum.at(vmax, codes[codes >= 0], self.vmax[codes >= 0])
+        return self._build(centroid_codes[keep], self.means[keep], self.weights[keep], ngroups,
+                           vmin, vmax, self.delta)
+
+    def _interpolation_points(self):
+        # Posição (0-based) do centro de cada centroide na ordem das linhas do grupo, mais o
+        # mínimo na posição 0 e o máximo na n-1; grupos em sequência num eixo único
+        if self._points is None:
+            sizes = np.diff(self.offsets)
+            group_of = np.repeat(np.arange(len(self)), sizes)
+            row_start = np.concatenate([[0.0], np.cumsum(self.count)[:-1]])
+            before = np.cumsum(self.weights) - self.weights
+            before -= np.repeat(before[self.offsets[:-1][sizes > 0]], sizes[sizes > 0])
+            filled = self.count > 0
+            x = np.concatenate([row_start[group_of] + before + (self.weights - 1) / 2,
+                                row_start[filled], (row_start + self.count - 1)[filled]])
+            y = np.concatenate([self.means, self.vmin[filled], self.vmax[filled]])
+            order = np.argsort(x, kind='stable')
+            self._points = (row_start, x[order], y[order])
+        return self._points
+
+    def quantile(self, q):
+        """Quantil q de cada grupo (NaN nos grupos vazios)."""
+        row_start, x, y = self._interpolation_points()
+        if not len(x):
+            return np.full(len(self), np.nan)
+        target = row_start + (self.count - 1) * q
+        hi = np.searchsorted(x, target, side='right').clip(1, len(x) - 1)
+        lo = hi - 1
+        span = x[hi] - x[lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.where(span > 0, (target - x[lo]) / span, 0.0).clip(0.0, 1.0)
+        result = y[lo] + (y[hi] - y[lo]) * frac
+        return np.where(self.count > 0, result, np.nan)
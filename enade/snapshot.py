@@ -0,0 +1,289 @@
+import os
+import threading
+from collections import OrderedDict
+import time
+import weakref
+
+from enade import instrument
+from enade.cube import build_cube, build_sketches, combine_cubes
+from enade.loader import (FACT_KEY, FILE_MAPPING, PARTITION_CACHE_SIZE, concat_tables, frame_digest, partition_values,
+                          prune_partitions, read_partitions, read_table, read_tables, source_signature,
+                          update_partitions)
+from enade.sketch import DEFAULT_DELTA, QuantileSketches
+from enade.star import StarSchema, dataset_fingerprint
+
+DIM_KEYS = ('tempo', 'curso')
+SELECTION_CACHE_SIZE = 16 # Combinações de anos montadas (concatenadas) por snapshot
+
+
+class SourceError(Exception):
+    """Falha ao ler um arquivo de origem: nome do arquivo + exceção original."""
+
+    def __init__(self, fname, error):
+        super().__init__(f'{fname}: {error}')
+        self.fname = fname
+        self.error = error
+
+
+class YearSlice:
+    """Dados de um ano (partição): tabelas particionadas, star, cubo e sketches das notas."""
+
+    def __init__(self, tables, star, cube, sketches, digest):
+        self.tables = tables
+        self.star = star
+        self.cube = cube
+        self.sketches = sketches
+        self.digest = digest
+
+
+def build_slice(schema, tables, digest, delta=DEFAULT_DELTA):
+    """Star, cubo e sketches de um ano a partir das partições desse ano."""
+    with instrument.span('star', rows_in=tables[FACT_KEY]) as span:
+        star = span.output(schema.join(tables[FACT_KEY], DIM_KEYS))
+    with instrument.span('cubo', rows_in=star) as span:
+        cube = span.output(build_cube(star))
+    with instrument.span('sketches', rows_in=star):
+        sketches = build_sketches(star, cube, 'NOTA_TOTAL', delta=delta)
+    return YearSlice(tables, star, cube, sketches, digest)
+
+
+def append_slice(year_slice, schema, rows, digest, delta=DEFAULT_DELTA):
+    """Acrescenta linhas novas (`rows` = {tabela: linhas}) a um ano já montado, sem refazê-lo.
+
+    Só as linhas novas passam pelo join e viram um cubo parcial, fundido célula a célula
+    no cubo do ano (contagens/somas somadas, sketches fundidos).
+    """
+    star = schema.join(rows.get(FACT_KEY, year_slice.tables[FACT_KEY].iloc[:0]), DIM_KEYS)
+    cube = build_cube(star)
+    cube, sketches = combine_cubes([year_slice.cube, cube],
+                                   [year_slice.sketches, build_sketches(star, cube, 'NOTA_TOTAL', delta=delta)])
+    tables = {k: concat_tables([df, rows[k]]) if k in rows else df for k, df in year_slice.tables.items()}
+    return YearSlice(tables, concat_tables([year_slice.star, star]), cube, sketches, digest)
+
+
+def _slice_digest(manifests, value):
+    # Hash das partições do ano em todas as tabelas particionadas (a partir dos manifests)
+    parts = [manifest['partitions'].get(str(value)) for manifest in manifests.values()]
+    return ','.join(part['digest'] if part else '-' for part in parts)
+
+
+def _dims_change(old, new, file_mapping=FILE_MAPPING):
+    # 'same', 'append' (linhas novas no fim de alguma dimensão) ou 'replace'. Versões novas
+    # numa dimensão versionada (CURSO) também são 'replace': podem passar a cobrir o ano de
+    # linhas da fato já resolvidas, e a resolução por data precisa ser refeita nos anos montados
+    change = 'same'
+    for key, df in new.items():
+        before = old.get(key)
+        if before is None or list(before.columns) != list(df.columns) or len(df) < len(before):
+            return 'replace'
+        if frame_digest(df.iloc[:len(before)]) != frame_digest(before):
+            return 'replace'
+        if len(df) > len(before):
+            if file_mapping.get(key, {}).get('versions'):
+                return 'replace'
+            change = 'append'
+    return change
+
+
+class Snapshot:
+    """Versão imutável dos dados: dimensões + anos, montados sob demanda e memorizados.
+
+    `select` devolve (tabelas, star, cubo, sketches) dos anos pedidos; cada ano é montado
+    uma vez e as combinações de anos são concatenações dos anos já montados. Anos montados
+    e combinações ficam em caches LRU (PARTITION_CACHE_SIZE anos, SELECTION_CACHE_SIZE
+    combinações): mais edições abertas não aumentam a memória além disso.
+    """
+
+    def __init__(self, dims, manifests, signatures, slices, version, file_mapping=FILE_MAPPING,
+                 base_dir='', delta=DEFAULT_DELTA):
+        self.dims = dims
+        self.manifests = manifests
+        self.signatures = signatures
+        self.version = version
+        self.created = time.time()
+        self.file_mapping = file_mapping
+        self.base_dir = base_dir
+        self.delta = delta
+        self.schema = StarSchema(dims, file_mapping)
+        self.fingerprint = dataset_fingerprint(dims)
+        self._slices = OrderedDict(slices)
+        self._selections = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def incremental(self):
+        # Sem cache colunar (manifests) não há como saber quais anos mudaram
+        return all(manifest is not None for manifest in self.manifests.values())
+
+    def partition_values(self):
+        """Chaves de TEMPO presentes na tabela fato."""
+        manifest = self.manifests.get(FACT_KEY)
+        if manifest is None:
+            return partition_values(FACT_KEY, self.file_mapping[FACT_KEY], base_dir=self.base_dir)
+        return sorted(int(v) for v in manifest['partitions'])
+
+    def year_slice(self, value):
+        with self._lock:
+            if value in self._slices:
+                self._slices.move_to_end(value)
+            else:
+                with instrument.span(f'partições {value}') as span:
+                    tables = span.output({key: read_partitions(key, self.file_mapping[key], [value],
+                                                               base_dir=self.base_dir, manifest=manifest)
+                                          for key, manifest in self.manifests.items()})
+                if self.incremental:
+                    digest = _slice_digest(self.manifests, value)
+                else:
+                    digest = ','.join(frame_digest(df) for df in tables.values())
+                self._slices[value] = build_slice(self.schema, tables, digest, self.delta)
+                if len(self._slices) > PARTITION_CACHE_SIZE:
+                    self._slices.popitem(last=False)
+            return self._slices[value]
+
+    def built_slices(self):
+        with self._lock:
+            return OrderedDict(self._slices)
+
+    def select(self, values):
+        """Tabelas particionadas, star, cubo e sketches dos anos em `values` + impressão digital."""
+        values = tuple(values)
+        with self._lock:
+            if values in self._selections:
+                self._selections.move_to_end(values)
+            else:
+                instrument.mark_miss()
+                slices = [self.year_slice(v) for v in values]
+                view = {
+                    'tables': {k: concat_tables([s.tables[k] for s in slices]) for k in self.manifests},
+                    'star': concat_tables([s.star for s in slices]),
+                    'cube': concat_tables([s.cube for s in slices]),
+                    'sketches': QuantileSketches.concat([s.sketches for s in slices]),
+                    'fingerprint': f"{self.fingerprint}|{'|'.join(s.digest for s in slices)}",
+                }
+                self._selections[values] = view
+                if len(self._selections) > SELECTION_CACHE_SIZE:
+                    self._selections.popitem(last=False)
+            return self._selections[values]
+
+
+class SnapshotStore:
+    """Snapshot atual dos dados e atualização incremental quando os arquivos de origem mudam.
+
+    `refresh` compara tamanho/mtime dos CSVs com os do snapshot atual (só os.stat). Se algo
+    mudou, lê apenas o delta (ver update_partitions), atualiza os anos já montados (linhas
+    acrescentadas entram no star/cubo/sketches existentes; anos com linhas corrigidas são
+    remontados sob demanda) e troca a referência do snapshot de uma vez: reruns em andamento
+    seguem com o snapshot que já tinham, os próximos usam o novo. Partições substituídas só
+    são apagadas (numa atualização seguinte) quando nenhum snapshot vivo as cita mais.
+    """
+
+    def __init__(self, file_mapping=FILE_MAPPING, base_dir='', delta=DEFAULT_DELTA):
+        self.file_mapping = file_mapping
+        self.base_dir = base_dir
+        self.delta = delta
+        self.dim_mapping = {k: i for k, i in file_mapping.items() if not i.get('partition_by')}
+        self.partitioned = {k: i for k, i in file_mapping.items() if i.get('partition_by')}
+        self.current = None
+        self.last_report = None
+        self._live = weakref.WeakSet() # Snapshots ainda referenciados (o atual e os de reruns em andamento)
+        self._lock = threading.Lock()
+
+    def _path(self, info):
+        return os.path.join(self.base_dir, info['fname'])
+
+    def signatures(self):
+        signatures = {}
+        for key, info in self.file_mapping.items():
+            try:
+                signatures[key] = source_signature(self._path(info))
+            except OSError as e:
+                raise SourceError(info['fname'], FileNotFoundError(self._path(info))) from e
+        return signatures
+
+    def _read(self, mapping, reader):
+        # Lê as tabelas em paralelo; a primeira falha vira SourceError com o nome do arquivo
+        def read(key, info):
+            try:
+                return reader(key, info, base_dir=self.base_dir), None
+            except Exception as e:
+                return None, SourceError(info['fname'], e)
+        results = read_tables(mapping, reader=read)
+        for _, error in results.values():
+            if error is not None:
+                raise error
+        return {key: value for key, (value, _) in results.items()}
+
+    def refresh(self):
+        """Snapshot atual, atualizado antes se os arquivos de origem mudaram."""
+        current = self.current
+        signatures = self.signatures()
+        if current is not None and signatures == current.signatures:
+            return current
+        # Só um rerun atualiza por vez; os demais seguem com o snapshot atual
+        if not self._lock.acquire(blocking=current is None):
+            return current
+        try:
+            if self.current is not None and self.current.signatures == self.signatures():
+                return self.current
+            self.current = self._next_snapshot(self.current, self.signatures())
+            self._live.add(self.current)
+            current = None # Só as referências de reruns em andamento seguram o snapshot anterior
+            self._prune()
+            return self.current
+        finally:
+            self._lock.release()
+
+    def _prune(self):
+        # Apaga as partições que nenhum snapshot vivo cita (as do snapshot anterior ainda em
+        # uso ficam para uma atualização seguinte)
+        for key, info in self.partitioned.items():
+            keep = {part['file'] for snapshot in list(self._live) if snapshot.manifests.get(key)
+                    for part in snapshot.manifests[key]['partitions'].values()}
+            prune_partitions(key, info, base_dir=self.base_dir, keep=keep)
+
+    def _next_snapshot(self, current, signatures):
+        t0 = time.perf_counter()
+        instrument.mark_miss()
+        with instrument.span('leitura das dimensões') as span:
+            dims = span.output(self._read(self.dim_mapping, read_table))
+        with instrument.span('delta das partições'):
+            updates = self._read(self.partitioned, update_partitions)
+        manifests = {key: manifest for key, (manifest, _) in updates.items()}
+        version = current.version + 1 if current is not None else 1
+        report = {'versao': version, 'dimensoes': 'carga inicial', 'acrescentados': [], 'remontados': []}
+        slices = {}
+        if current is not None:
+            report['dimensoes'] = _dims_change(current.dims, dims, self.file_mapping)
+            if report['dimensoes'] != 'replace' and current.incremental and all(m is not None for m in manifests.values()):
+                slices = self._carry_over(current, dims, manifests, updates, report)
+            else:
+                report['remontados'] = sorted(current.built_slices())
+        snapshot = Snapshot(dims, manifests, signatures, slices, version, self.file_mapping, self.base_dir, self.delta)
+        report['segundos'] = time.perf_counter() - t0
+        self.last_report = report
+        return snapshot
+
+    def _carry_over(self, current, dims, manifests, updates, report):
+        # Anos já montados no snapshot atual: iguais são reaproveitados, com linhas acrescentadas
+        # são atualizados a partir só delas, e os demais ficam para ser remontados sob demanda
+        changes = {}
+        for key, (_, table_changes) in updates.items():
+            for value, (kind, rows) in table_changes.items():
+                if kind == 'append' and changes.get(value) != 'replace':
+                    changes.setdefault(value, {})[key] = rows
+                else:
+                    changes[value] = 'replace'
+        schema = StarSchema(dims, self.file_mapping)
+        slices = OrderedDict()
+        for value, year_slice in current.built_slices().items():
+            change = changes.get(value)
+            if change is None:
+                slices[value] = year_slice
+            elif change == 'replace':
+                report['remontados'].append(value)
+            else:
+                with instrument.span(f'acréscimo {value}', rows_in=change.get(FACT_KEY)):
+                    slices[value] = append_slice(year_slice, schema, change, _slice_digest(manifests, value),
+                                                 self.delta)
+                report['acrescentados'].append(value)
+        return slices
@@ -0,0 +1,206 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+from enade.loader import FACT_FK_MAPPING, FILE_MAPPING, frame_digest
+
+# Para chaves inteiras com intervalo até DENSE_FACTOR vezes o número de linhas,
+# a busca é um array denso (chave - mínimo -> posição); acima disso, searchsorted.
+DENSE_FACTOR = 4
+# Datas de vigência em dias desde 1970 (int64); NAT_DAYS = data vazia/inválida
+NAT_DAYS = np.iinfo(np.int64).min
+
+
+class KeyIndex:
+    """Mapeia valores da chave primária de uma dimensão para a posição da linha (-1 = ausente)."""
+
+    def __init__(self, keys):
+        keys = np.asarray(keys)
+        self.size = len(keys)
+        self._dense = None
+        if self.size and np.issubdtype(keys.dtype, np.integer):
+            lo, hi = int(keys.min()), int(keys.max())
+            if hi - lo < max(DENSE_FACTOR * self.size, 1024):
+                self._offset = lo
+                self._dense = np.full(hi - lo + 1, -1, dtype=np.int64)
+                self._dense[keys.astype(np.int64) - lo] = np.arange(self.size)
+                return
+        self._order = np.argsort(keys, kind='stable')
+        self._sorted = keys[self._order]
+
+    def positions(self, values):
+        values = np.asarray(values)
+        out = np.full(len(values), -1, dtype=np.int64)
+        if not self.size or not len(values):
+            return out
+        valid = pd.notna(values)
+        if self._dense is not None:
+            if not np.issubdtype(values.dtype, np.number):
+                return out
+            vals = values[valid].astype(np.int64) - self._offset
+            inside = (vals >= 0) & (vals < len(self._dense))
+            hits = np.full(len(vals), -1, dtype=np.int64)
+            hits[inside] = self._dense[vals[inside]]
+            out[valid] = hits
+            return out
+        vals = values[valid]
+        idx = np.searchsorted(self._sorted, vals).clip(max=self.size - 1)
+        out[valid] = np.where(self._sorted[idx] == vals, self._order[idx], -1)
+        return out
+
+
+def _days(values):
+    # Datas (texto, categórico ou datetime) -> dias desde 1970 em int64; vazio/inválido = NaT_DAYS
+    dates = pd.to_datetime(pd.Series(values), errors='coerce')
+    if isinstance(dates.dtype, pd.CategoricalDtype):
+        dates = dates.astype('datetime64[ns]')
+    days = dates.to_numpy('datetime64[D]').astype(np.int64)
+    return np.where(dates.isna().to_numpy(), NAT_DAYS, days)
+
+
+class VersionIndex:
+    """Versões de uma dimensão de variação lenta: (chave natural, data) -> posição da versão vigente.
+
+    As versões ficam ordenadas por (chave natural, início da vigência), combinados numa
+    única chave inteira; cada consulta é um np.searchsorted nessa chave, que cai entre as
+    versões da sua chave natural: O(n log v), sem merge nem apply.
+    """
+
+    def __init__(self, natural_keys, valid_from, valid_to):
+        natural_keys = np.asarray(natural_keys).astype(np.int64)
+        starts, ends = _days(valid_from), _days(valid_to)
+        # Vigência de cada linha, na ordem da dimensão (fim vazio = em aberto)
+        self.starts = starts
+        self.ends = np.where(ends == NAT_DAYS, np.iinfo(np.int64).max, ends)
+        rows = np.flatnonzero(starts != NAT_DAYS) # versões sem início (ex.: curso desconhecido) ficam de fora
+        self._keys, codes = np.unique(natural_keys[rows], return_inverse=True)
+        order = np.lexsort((starts[rows], codes))
+        self._rows = rows[order]
+        self._starts = starts[self._rows]
+        self._ends = self.ends[self._rows]
+        counts = np.bincount(codes, minlength=len(self._keys))
+        self._offsets = np.zeros(len(self._keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._offsets[1:])
+        # Chave combinada código * span + dias desde a primeira vigência: span deixa uma
+        # folga acima da última vigência, para consultas fora da faixa não saírem da sua chave
+        self._base = int(self._starts.min()) if len(self._starts) else 0
+        self._span = (int(self._starts.max()) - self._base + 2) if len(self._starts) else 1
+        self._combined = codes[order] * self._span + (self._starts - self._base)
+        # Código da chave natural de cada linha da dimensão (-1 = sem vigência)
+        self.row_codes = np.full(len(natural_keys), -1, dtype=np.int64)
+        self.row_codes[rows] = codes
+
+    def covers(self, pos, days):
+        """Se a linha `pos` da dimensão está vigente em `days` (linhas sem vigência contam como vigentes)."""
+        starts, ends = self.starts[pos], self.ends[pos]
+        return (starts == NAT_DAYS) | (days == NAT_DAYS) | ((starts <= days) & (days < ends))
+
+    def _search(self, codes, days):
+        # searchsorted(side='right') na chave combinada: a data de cada consulta é limitada
+        # a [-1, span - 1] dias da base, então a busca não ultrapassa as versões da sua chave
+        out = np.full(len(codes), -1, dtype=np.int64)
+        known = (codes >= 0) & (days != NAT_DAYS)
+        codes, days = codes[known], days[known]
+        query = codes * self._span + (days - self._base).clip(-1, self._span - 1)
+        # Última versão com início <= data (da mesma chave), se a data ainda estiver antes do fim dela
+        i = np.searchsorted(self._combined, query, side='right') - 1
+        valid = (i >= self._offsets[codes]) & (days < self._ends[i.clip(min=0)])
+        out[np.flatnonzero(known)[valid]] = self._rows[i[valid]]
+        return out
+
+    def positions(self, natural_keys, days):
+        """Posição da versão vigente em `days` para cada chave natural (-1 quando não há)."""
+        natural_keys = np.asarray(natural_keys).astype(np.int64)
+        codes = np.full(len(natural_keys), -1, dtype=np.int64)
+        if len(self._keys) and len(natural_keys):
+            found = np.searchsorted(self._keys, natural_keys).clip(max=len(self._keys) - 1)
+            codes = np.where(self._keys[found] == natural_keys, found, -1)
+        return self._search(codes, np.asarray(days, dtype=np.int64))
+
+    def current(self, pos, days):
+        """Versão vigente em `days` da mesma chave natural da linha `pos` da dimensão (-1 quando não há)."""
+        return self._search(self.row_codes[pos], np.asarray(days, dtype=np.int64))
+
+
+def _column_values(series):
+    # Categóricas e demais ExtensionArrays mantêm o tipo no take; o resto vira ndarray
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return series.array
+    return series.to_numpy()
+
+
+class StarSchema:
+    """Índices posicionais das dimensões, construídos uma vez, para desnormalizar a tabela fato."""
+
+    def __init__(self, dims, file_mapping=FILE_MAPPING, fk_mapping=FACT_FK_MAPPING):
+        self.dims = dims
+        self.fk_mapping = fk_mapping
+        self.pks = {}
+        self.indexes = {}
+        self.versions = {}
+        for key, df in dims.items():
+            info = file_mapping.get(key, {})
+            pk = info.get('pk')
+            if pk and pk in df.columns:
+                self.pks[key] = pk
+                self.indexes[key] = KeyIndex(df[pk].to_numpy())
+            spec = info.get('versions')
+            if spec and all(spec[c] in df.columns for c in ('natural_key', 'valid_from', 'valid_to')):
+                self.versions[key] = (spec, VersionIndex(df[spec['natural_key']].to_numpy(),
+                                                         df[spec['valid_from']], df[spec['valid_to']]))
+
+    def positions(self, fact, dim_key):
+        """Posição da linha da dimensão para cada linha da fato (-1 quando não há correspondência)."""
+        fk = self.fk_mapping.get(dim_key)
+        if dim_key not in self.indexes or fk is None or fk not in fact.columns:
+            return None
+        pos = self.indexes[dim_key].positions(fact[fk].to_numpy())
+        if dim_key in self.versions:
+            pos = self._as_of(fact, dim_key, pos)
+        return pos
+
+    def _as_of(self, fact, dim_key, pos):
+        # Linhas cuja FK aponta para uma versão fora da vigência na data da linha (ano do TEMPO)
+        # passam para a versão vigente do mesmo CO_CURSO; sem versão vigente, mantém a da FK
+        spec, versions = self.versions[dim_key]
+        date_key, year_col = spec['as_of']
+        date_pos = self.positions(fact, date_key) if date_key != dim_key else None
+        if date_pos is None or year_col not in self.dims[date_key].columns:
+            return pos
+        years = self.dims[date_key][year_col].to_numpy()[date_pos.clip(min=0)].astype(np.int64)
+        days = (years - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype(np.int64)
+        days = np.where(date_pos >= 0, days, NAT_DAYS)
+        stale = np.flatnonzero((pos >= 0) & ~versions.covers(pos.clip(min=0), days))
+        if not len(stale):
+            return pos
+        current = versions.current(pos[stale], days[stale])
+        pos = pos.copy()
+        pos[stale] = np.where(current >= 0, current, pos[stale])
+        return pos
+
+    def join(self, fact, dim_keys):
+        """Left join da fato com cada dimensão via take posicional (sem merge por hash)."""
+        columns = {col: fact[col] for col in fact.columns}
+        for dim_key in dim_keys:
+            pos = self.positions(fact, dim_key)
+            if pos is None:
+                continue
+            df_dim = self.dims[dim_key]
+            for col in df_dim.columns:
+                name = col if col not in columns else f'{col}_{dim_key}'
+                columns[name] = take(_column_values(df_dim[col]), pos, allow_fill=True)
+        return pd.DataFrame(columns, index=fact.index)
+
+
+def dataset_fingerprint(tables):
+    """Impressão digital do conteúdo (colunas, tipos e valores) de um dicionário de DataFrames."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in sorted(tables):
+        df = tables[name]
+        if df is None:
+            continue
+        digest.update(name.encode())
+        digest.update(frame_digest(df).encode())
+    return digest.hexdigest()
@@ -1,168 +1,264 @@
 import streamlit as st
-import pandas as pd
-import altair as alt
-import re # Importar re para ordenação de renda
 
 # --- Configurações da página ---
 st.set_page_config(
-    page_title="Dashboard ENADE 2022 - Análise Detalhada",
+    page_title="Dashboard ENADE - Análise Detalhada",
     page_icon="📊",
     layout="wide"
 )
+# Cabeçalho provisório: chega ao navegador antes dos imports pesados (pandas, pyarrow)
+# e da leitura das tabelas; o título com os anos é preenchido depois no mesmo lugar.
+title_slot = st.empty()
+title_slot.title("📊 Análise Detalhada do ENADE")
+
+import functools
+import hmac
+import os
+import uuid
+
+import pandas as pd
+
+# Copy-on-write: as tabelas compartilhadas entre sessões (st.cache_resource) podem ser
+# fatiadas e lidas sem cópia; qualquer escrita acidental copia em vez de alterar o original
+pd.set_option('mode.copy_on_write', True)
+
+from enade import instrument
+from enade.loader import FACT_KEY, FILE_MAPPING
+from enade.chart_data import histogram_bins
+from enade.compute import (age_counts, course_summary, filter_years, income_bars, parent_education, race_pie, sex_pie,
+                           sorted_metrics, year_comparison, overall_metrics as compute_overall_metrics)
+from enade.course_bitmaps import (COURSE_FILTERS, RANKING_COLUMNS, RANKING_MIN_STUDENTS, CourseBitmaps,
+                                   course_scores, ranking_table, top_k)
+from enade.course_index import CourseIndex
+from enade.demographics import DEMOGRAPHIC_TABLES, DemographicKernel
+from enade.sketch import DEFAULT_DELTA
+from enade.snapshot import SnapshotStore, SourceError
 
 # --- Constantes ---
-FILE_MAPPING = {
-    'tempo': {'fname': 'TEMPO.csv', 'pk': 'TEMPO_KEY'},
-    'curso': {'fname': 'CURSO.csv', 'pk': 'CURSO_KEY'},
-    'desempenho': {'fname': 'DESEMPENHO.csv'},
-    'sexo': {'fname': 'SEXO.csv', 'pk': 'SEXO_KEY'},
-    'idade': {'fname': 'IDADE.csv', 'pk': 'IDADE_KEY'},
-    'renda': {'fname': 'RENDA.csv', 'pk': 'RENDA_KEY'},
-    'cor': {'fname': 'COR.csv', 'pk': 'COR_KEY'},
-    'escolaridade': {'fname': 'ESCOLARIDADE.csv', 'pk': 'ESCOLARIDADE_KEY'}
-}
-FACT_FK_MAPPING = {
-    'tempo': 'D_TEMPO_TEMPO_KEY',
-    'curso': 'D_CURSO_CURSO_KEY',
-    'idade': 'D_IDADE_IDADE_KEY', # Necessário para o gráfico de idade correto
-    # Adicione outras FKs se precisar cruzar mais dados demográficos com desempenho
-}
-TARGET_YEAR = 2022
-
-# --- Funções de Carregamento e Processamento (Mantidas da versão anterior) ---
-@st.cache_data
-def load_data(file_mapping):
-    # ... (código load_data inalterado) ...
-    dims = {}
-    fact = None
-    for key, info in file_mapping.items():
-        fname = info['fname']
-        try:
-            df = pd.read_csv(fname, sep=';', quotechar='"', encoding='utf-8', low_memory=False)
-            df.columns = df.columns.str.strip().str.replace('"', '', regex=False)
-            for col in df.select_dtypes(include=['object']).columns:
-                if df[col].astype(str).str.contains('"').any():
-                   df[col] = df[col].astype(str).str.replace('"', '', regex=False).str.strip()
-        except FileNotFoundError:
-            st.error(f"Erro Crítico: Arquivo não encontrado: {fname}. Verifique o diretório.")
-            st.stop()
-        except Exception as e:
-            st.error(f"Erro ao ler {fname}: {e}")
-            st.stop()
-
-        if key == 'desempenho':
-            fact = df
-        else:
-            dims[key] = df
-            pk = info.get('pk')
-            if pk and pk in df.columns:
-                df[pk] = pd.to_numeric(df[pk], errors='ignore')
-
-    if fact is not None:
-        for dim_key, fact_fk in FACT_FK_MAPPING.items():
-            if fact_fk in fact.columns:
-                fact[fact_fk] = pd.to_numeric(fact[fact_fk], errors='ignore')
-        if 'NOTA_TOTAL' in fact.columns:
-            fact['NOTA_TOTAL'] = pd.to_numeric(fact['NOTA_TOTAL'], errors='coerce')
-            fact.dropna(subset=['NOTA_TOTAL'], inplace=True) # Remove linhas onde a nota é NaN
-            # Arredonda a nota para 1 casa decimal para reduzir granularidade (opcional, mas recomendado)
-            # fact['NOTA_TOTAL'] = fact['NOTA_TOTAL'].round(1)
-
-    return dims, fact
-
-
-@st.cache_data
-def merge_fact(_dims, _fact, dim_key, fact_key):
-    # ... (código merge_fact inalterado) ...
-    df_dim = _dims.get(dim_key)
-    dim_info = FILE_MAPPING.get(dim_key)
-    fact_fk_col = FACT_FK_MAPPING.get(fact_key)
-
-    if df_dim is None or _fact is None or dim_info is None or fact_fk_col is None:
-        # st.warning(f"Dados insuficientes para fazer merge para a chave '{dim_key}'.") # Menos verboso
-        return _fact if _fact is not None else pd.DataFrame()
-
-    dim_pk_col = dim_info.get('pk')
-    if not dim_pk_col or dim_pk_col not in df_dim.columns or fact_fk_col not in _fact.columns:
-        # st.warning(f"Não foi possível fazer o merge para '{dim_key}': Chave primária '{dim_pk_col}' ou chave estrangeira '{fact_fk_col}' não encontrada.")
-        return _fact
+CACHE_MAX_ENTRIES = 16 # Combinações de anos mantidas nos caches derivados (resumos, índices, kernel)
+# Dados e estruturas derivadas ficam em st.cache_resource: um único objeto por processo,
+# compartilhado (somente leitura) por todas as sessões, em vez de uma cópia desserializada
+# por chamada como no st.cache_data. Filtros de cada sessão viram máscaras sobre eles.
+QUANTILE_DELTA = DEFAULT_DELTA # Compressão dos t-digests de medianas/quartis; None = quantis exatos
+# Instrumentação (painel na barra lateral + uma linha JSON por rerun no log, com rotação):
+# ligada no servidor com ENADE_PROFILE=1 ou, só se ENADE_PROFILE_TOKEN estiver definido, com
+# ?perf=<token> na URL (um visitante qualquer não liga); desligada, cada etapa custa uma chamada vazia
+PROFILE_TOKEN = os.environ.get('ENADE_PROFILE_TOKEN', '')
+PROFILE_ENABLED = os.environ.get('ENADE_PROFILE') == '1' or bool(
+    PROFILE_TOKEN and hmac.compare_digest(st.query_params.get('perf', '').encode(), PROFILE_TOKEN.encode()))
+PROFILE_LOG = os.environ.get('ENADE_PROFILE_LOG', 'perf.jsonl')
+
+
+if PROFILE_ENABLED:
+    st.session_state.setdefault('perf_session', uuid.uuid4().hex[:8])
+recorder = instrument.start('script', PROFILE_ENABLED, st.session_state.get('perf_session'), PROFILE_LOG)
+
+# --- Funções de Carregamento e Processamento ---
+def _stop_with_error(fname, error):
+    if isinstance(error, FileNotFoundError):
+        st.error(f"Erro Crítico: Arquivo não encontrado: {fname}. Verifique o diretório.")
+    else:
+        st.error(f"Erro ao ler {fname}: {error}")
+    st.stop()
+
+
+def profiled_cache(name, **cache_args):
+    # st.cache_resource com a chamada medida na instrumentação; o corpo da função só roda
+    # num erro de cache, então é ele que marca a etapa como 'erro'
+    def decorate(fn):
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            instrument.mark_miss()
+            return fn(*args, **kwargs)
+        cached = st.cache_resource(**cache_args)(compute)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            with instrument.span(name, rows_in=args[0] if args else None, cached=True) as span:
+                return span.output(cached(*args, **kwargs))
+        return call
+    return decorate
+
+
+def profiled_fragment(name):
+    # st.fragment cujo rerun isolado vira um rerun próprio na instrumentação (e uma linha no log);
+    # chamado dentro do script, é só mais uma etapa do rerun em andamento
+    def decorate(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with instrument.scope(name, recorder):
+                return fn(*args, **kwargs)
+        return st.fragment(run)
+    return decorate
 
+
+def altair_chart(name, chart):
+    # st.altair_chart medido: serialização do spec Vega-Lite (dados inclusos) e envio ao navegador
+    with instrument.span(f"gráfico: {name}", rows_in=chart.data if isinstance(chart.data, pd.DataFrame) else None):
+        st.altair_chart(chart, use_container_width=True)
+
+
+@st.cache_resource
+def snapshot_store(file_mapping, delta):
+    # Um store por processo, compartilhado pelas sessões: dimensões e anos já montados (star,
+    # cubo, sketches) do snapshot atual, atualizado só com o delta quando os CSVs mudam
+    return SnapshotStore(file_mapping, delta=delta)
+
+
+def current_snapshot(store):
+    # A cada rerun só os.stat dos arquivos; se algum mudou, o snapshot novo substitui o atual
     try:
-        # Garante tipos compatíveis antes do merge
-        if _fact[fact_fk_col].dtype != df_dim[dim_pk_col].dtype:
-            try:
-                _fact_copy = _fact.copy() # Trabalha com cópia para evitar SettingWithCopyWarning
-                _fact_copy[fact_fk_col] = _fact_copy[fact_fk_col].astype(df_dim[dim_pk_col].dtype)
-                _fact = _fact_copy
-            except Exception as e:
-                try:
-                     _fact_copy = _fact.copy()
-                     df_dim_copy = df_dim.copy()
-                     _fact_copy[fact_fk_col] = _fact_copy[fact_fk_col].astype(str)
-                     df_dim_copy[dim_pk_col] = df_dim_copy[dim_pk_col].astype(str)
-                     _fact = _fact_copy
-                     df_dim = df_dim_copy
-                     # st.info(f"Convertendo chaves de merge para string para '{dim_key}'.")
-                except Exception as e_str:
-                     st.error(f"Falha na conversão de tipo para merge '{dim_key}': {e} / {e_str}")
-                     return pd.DataFrame()
-
-        merged_df = pd.merge(
-            _fact,
-            df_dim,
-            left_on=fact_fk_col,
-            right_on=dim_pk_col,
-            how='left'
-        )
-        return merged_df
-    except Exception as e:
-        st.error(f"Erro durante o merge entre fato e dimensão {dim_info['fname']}: {e}")
-        return pd.DataFrame()
+        return store.refresh()
+    except SourceError as e:
+        _stop_with_error(e.fname, e.error)
+
+
+@profiled_cache('bitmaps dos cursos')
+def build_course_bitmaps(_curso, data_fingerprint):
+    # Um bitmap por valor de cada atributo do curso, construído uma vez na carga:
+    # qualquer combinação de filtros da barra lateral é uma interseção de bitmaps
+    return CourseBitmaps(_curso)
+
+
+@profiled_cache('notas por curso', max_entries=CACHE_MAX_ENTRIES)
+def build_course_scores(_star, _curso, data_fingerprint):
+    # Participantes e nota média por linha de CURSO (anos selecionados), base do ranking
+    return course_scores(_star, _curso)
+
+
+@profiled_cache('kernel demográfico', max_entries=CACHE_MAX_ENTRIES)
+def build_demographic_kernel(_tables, _curso, _tempo, data_fingerprint):
+    # SEXO/COR/RENDA/ESCOLARIDADE alinhados por (curso, ano) em arrays densos:
+    # cada combinação de filtros vira uma soma mascarada
+    return DemographicKernel(_tables, _curso, tempo=_tempo)
+
+
+@profiled_cache('índice por curso', max_entries=CACHE_MAX_ENTRIES)
+def build_course_index(_star, data_fingerprint):
+    # Linhas ordenadas por (curso, nota) com offsets por curso: as notas de um curso são
+    # uma fatia e o filtro do slider é uma busca binária nas contagens
+    return CourseIndex(_star, 'DESC_CURSO', 'NOTA_TOTAL')
+
+
+@profiled_cache('resumo por curso', max_entries=CACHE_MAX_ENTRIES)
+def build_course_summary(_cube, _sketches, data_fingerprint, years):
+    # Contagem e média por curso (cubo) + mediana, quartis e extremos (sketches) para a
+    # tabela, o slider e o boxplot
+    return course_summary(_cube, _sketches, years)
+
+
+@profiled_cache('histograma', max_entries=CACHE_MAX_ENTRIES)
+def build_score_bins(_scores, data_fingerprint):
+    # Faixas do histograma das notas dos anos selecionados: uma passada pelas linhas por
+    # combinação de anos, não a cada rerun de cada sessão
+    return histogram_bins(_scores, maxbins=40)
 
 
 # --- Carregamento dos Dados ---
-dims, fact = load_data(FILE_MAPPING)
+store = snapshot_store(FILE_MAPPING, QUANTILE_DELTA)
+with instrument.span('snapshot dos dados', cached=True):
+    snapshot = current_snapshot(store)
+dims, dims_fingerprint = snapshot.dims, snapshot.fingerprint
+# Sessões abertas durante uma atualização dos dados são avisadas no próximo rerun
+if st.session_state.setdefault('data_version', snapshot.version) != snapshot.version:
+    st.session_state['data_version'] = snapshot.version
+    report = store.last_report or {}
+    changed = ", ".join(str(k) for k in sorted(report.get('acrescentados', []) + report.get('remontados', [])))
+    st.toast(f"Dados atualizados (versão {snapshot.version})" + (f": anos {changed}." if changed else "."), icon="🔄")
+course_bitmaps = build_course_bitmaps(dims['curso'], dims_fingerprint)
+
+# --- Seleção de anos (partições de D_TEMPO_TEMPO_KEY) ---
+tempo_df = dims['tempo']
+try:
+    available_keys = snapshot.partition_values()
+except Exception as e:
+    _stop_with_error(FILE_MAPPING[FACT_KEY]['fname'], e)
+year_by_key = {int(k): int(a) for k, a in zip(tempo_df['TEMPO_KEY'], tempo_df['ANO']) if int(k) in set(available_keys)}
+available_years = sorted(year_by_key.values())
+if not available_years:
+    st.error("Tabela Fato (Desempenho) não pôde ser carregada ou está vazia. O Dashboard não pode continuar.")
+    st.stop()
+
+st.sidebar.header("Ano de Análise")
+year_mode = st.sidebar.radio("Modo", ["Ano único", "Comparar anos"], horizontal=True)
+if year_mode == "Ano único":
+    selected_years = [st.sidebar.selectbox("Edição do ENADE:", options=available_years[::-1])]
+else:
+    selected_years = sorted(st.sidebar.multiselect("Edições do ENADE:", options=available_years,
+                                                   default=available_years[-2:]))
+if not selected_years:
+    st.info("Selecione ao menos um ano na barra lateral.")
+    st.stop()
+selected_keys = [k for k, a in year_by_key.items() if a in selected_years]
+years_label = ", ".join(str(y) for y in selected_years)
+
+st.sidebar.header("Filtros de Curso")
+st.sidebar.caption("Aplicados ao perfil demográfico e socioeconômico e ao ranking de cursos.")
+course_filters = {}
+for col, label in COURSE_FILTERS.items():
+    if col in course_bitmaps.categories:
+        course_filters[col] = st.sidebar.multiselect(f"{label}:", options=course_bitmaps.categories[col].tolist())
+# Cursos que atendem aos filtros: OR dos bitmaps dentro de cada atributo, AND entre atributos
+course_mask = course_bitmaps.mask(course_bitmaps.select(course_filters)) if any(course_filters.values()) else None
+
+# Anos selecionados do snapshot: cada ano é montado uma vez por processo (partições, star,
+# cubo e sketches) e as combinações de anos são concatenações dos anos já montados
+try:
+    with instrument.span('anos selecionados', cached=True) as span:
+        view = snapshot.select(selected_keys)
+        span.output(view['star'])
+except Exception as e:
+    _stop_with_error(FILE_MAPPING[FACT_KEY]['fname'], e)
+fact = view['tables'][FACT_KEY]
+dims = {**dims, **{k: v for k, v in view['tables'].items() if k != FACT_KEY}}
+data_fingerprint = view['fingerprint']
 
 if fact is None or fact.empty:
     st.error("Tabela Fato (Desempenho) não pôde ser carregada ou está vazia. O Dashboard não pode continuar.")
     st.stop()
 
 # --- Título e informações gerais ---
-st.title("📊 Análise Detalhada do ENADE 2022")
-st.markdown("""
-**Fonte de dados:** Microdados do INEP | **Ano de Análise:** 2022
+title_slot.title(f"📊 Análise Detalhada do ENADE {years_label}")
+st.markdown(f"""
+**Fonte de dados:** Microdados do INEP | **Ano de Análise:** {years_label}
 """)
 st.markdown("---")
 
 # --- Pré-processamento e Filtro Inicial por Ano ---
-df_merged_tempo = merge_fact(dims, fact, 'tempo', 'tempo')
+# Tabela desnormalizada única: fato (só os anos selecionados) + TEMPO + CURSO
+df_merged_tempo = view['star']
 
-if 'ANO' in df_merged_tempo.columns:
-    df_filtered_year = df_merged_tempo[df_merged_tempo['ANO'] == TARGET_YEAR].copy()
-else:
+# Filtro por ano como máscara sobre a tabela compartilhada (sem cópia quando cobre tudo)
+df_filtered_year = filter_years(df_merged_tempo, selected_years)
+if df_filtered_year is None:
     st.warning("Coluna 'ANO' não encontrada após merge com TEMPO. Exibindo todos os dados disponíveis da tabela fato.")
-    df_filtered_year = fact.copy()
+    df_filtered_year = fact
 
 if df_filtered_year.empty:
-    st.warning(f"Não há dados de desempenho disponíveis para o ano {TARGET_YEAR} após o filtro inicial.")
+    st.warning(f"Não há dados de desempenho disponíveis para {years_label} após o filtro inicial.")
     st.stop()
 
+cube = view['cube']
+score_sketches = view['sketches']
+demo_kernel = build_demographic_kernel({k: dims[k] for k in DEMOGRAPHIC_TABLES if k in dims}, dims['curso'], dims['tempo'], data_fingerprint)
+# Totais demográficos dos anos e filtros de curso ativos: uma soma mascarada no kernel
+with instrument.span('totais demográficos', rows_in=course_mask) as span:
+    demo_totals = span.output(demo_kernel.totals(demo_kernel.mask(years=selected_keys, courses=course_mask)))
+
+# Altair (via enade.charts) só é importado aqui, antes do primeiro gráfico: cabeçalho,
+# filtros e leitura dos dados não esperam por ele
+from enade.charts import (age_chart, course_boxplot_chart, income_chart, parent_education_chart, race_pie_chart,
+                          score_histogram_chart, sex_pie_chart)
+
 # --- Seção 1: Performance Geral ---
-st.header("📋 Performance Geral dos Participantes (2022)")
+st.header(f"📋 Performance Geral dos Participantes ({years_label})")
 
 overall_metrics = {} # Dicionário para guardar métricas gerais
 with st.container(border=True):
     st.subheader("Estatísticas Descritivas da Nota Total")
     if 'NOTA_TOTAL' in df_filtered_year.columns and not df_filtered_year['NOTA_TOTAL'].empty:
-        nota = df_filtered_year['NOTA_TOTAL']
-        overall_metrics = {
-            "Participantes": int(nota.count()),
-            "Média": nota.mean(),
-            "Mediana": nota.median(),
-            "Mínimo": nota.min(),
-            "Máximo": nota.max(),
-            "Desvio Padrão": nota.std()
-        }
+        with instrument.span('métricas gerais', rows_in=cube):
+            overall_metrics = compute_overall_metrics(cube, score_sketches, selected_years)
 
         col1, col2, col3, col4, col5 = st.columns(5)
         # ... (código de exibição das métricas inalterado) ...
@@ -175,21 +271,17 @@ with st.container(border=True):
                  label, value = metric_items[i]
                  col.metric(label, f"{value:.2f}")
 
+        if len(selected_years) > 1:
+            # Comparativo entre edições: uma linha por ano, direto do cubo
+            with instrument.span('comparativo anual', rows_in=cube) as span:
+                comparison = span.output(year_comparison(cube, score_sketches, selected_years))
+            st.dataframe(comparison, hide_index=True, use_container_width=True)
+
 
-        # Histograma de distribuição de notas (Usando Altair como antes, é mais flexível)
+        # Histograma de distribuição de notas: bins calculados no servidor, só as faixas vão ao navegador
         st.subheader("Distribuição das Notas")
-        hist_geral = alt.Chart(df_filtered_year).mark_bar(color='#4CAF50', opacity=0.7).encode(
-            alt.X("NOTA_TOTAL:Q", bin=alt.Bin(maxbins=40), title="Nota Total"),
-            alt.Y("count():Q", title="Número de Participantes"),
-            tooltip=[
-                alt.X("NOTA_TOTAL:Q", bin=alt.Bin(maxbins=40), title="Faixa da Nota"),
-                alt.Y("count():Q", title="Número de Participantes", format=',')
-            ]
-        ).properties(
-            # title='Distribuição das Notas Totais - ENADE 2022', # Título já está no subheader
-             height=300
-        ).interactive()
-        st.altair_chart(hist_geral, use_container_width=True)
+        score_bins = build_score_bins(df_filtered_year['NOTA_TOTAL'], data_fingerprint)
+        altair_chart('histograma', score_histogram_chart(score_bins))
 
     else:
         st.warning("Não foi possível calcular as estatísticas de desempenho (Coluna 'NOTA_TOTAL' ausente ou vazia).")
@@ -199,6 +291,9 @@ st.markdown("---")
 # --- Seção 2: Análise Demográfica ---
 st.header("👥 Perfil Demográfico dos Participantes")
 st.markdown("Distribuição dos participantes por características demográficas.")
+active_filters = [f"{COURSE_FILTERS[c]}: {', '.join(x.strip() for x in v)}" for c, v in course_filters.items() if v]
+if active_filters:
+    st.caption("Filtros ativos — " + " | ".join(active_filters))
 
 col_demo1, col_demo2 = st.columns(2)
 
@@ -207,74 +302,27 @@ with col_demo1:
     with st.container(border=True):
         st.subheader("Distribuição por Sexo")
         # Sexo - Pizza com porcentagens
-        sx = dims['sexo'][['QTD_MASCULINO','QTD_FEMININO','QTD_N_INFORMADO']].sum()
-        sx.index = ['Masculino','Feminino','Não Informado']
-        pie_sx = pd.DataFrame({'Categoria': sx.index, 'Quantidade': sx.values})
-        pie_sx = pie_sx[pie_sx['Quantidade'] > 0]
-        total_sx = pie_sx['Quantidade'].sum()
-        pie_sx['Percent'] = pie_sx['Quantidade'] / total_sx
-        # Cores específicas por sexo
-        color_scale_sex = alt.Scale(domain=['Masculino','Feminino','Não Informado'], range=['#7B68EE','#EE82EE','#d3d3d3'])
-        # Construção do gráfico
-        t_base = alt.Chart(pie_sx).encode(theta=alt.Theta('Percent:Q', stack=True))
-        pie_sex = t_base.mark_arc(innerRadius=50, outerRadius=100).encode(
-            color=alt.Color('Categoria:N', scale=color_scale_sex, legend=alt.Legend(title='Sexo')),
-            tooltip=[alt.Tooltip('Categoria:N', title='Sexo'), alt.Tooltip('Quantidade:Q', title='Quantidade'), alt.Tooltip('Percent:Q', title='Percentual', format='.1%')]
-        )
-        text_sex = t_base.mark_text(radius=120, size=12).encode(
-            text=alt.Text('Percent:Q', format='.1%'),
-            color=alt.value('black')
-        )
-        st.altair_chart(pie_sex + text_sex, use_container_width=True)
+        with instrument.span('pizza sexo', rows_in=demo_totals) as span:
+            pie_sx = span.output(sex_pie(demo_totals))
+        altair_chart('sexo', sex_pie_chart(pie_sx))
 
 # --- Cor/Raça (Com porcentagens claras) ---
 with col_demo2:
     with st.container(border=True):
         st.subheader("Distribuição por Cor/Raça")
         # Cor/Raça - Pizza com porcentagens e cores específicas
-        cr = dims['cor'].filter(like='QTD_').sum()
-        cr.index = (cr.index.str.replace('QTD_','', regex=False)
-                    .str.replace('_',' ', regex=False)
-                    .str.title()
-                    .str.replace('Nao ','Não ', regex=False))
-        pie_cr = pd.DataFrame({'Categoria':cr.index,'Quantidade':cr.values})
-        # Filtrar valores > 0
-        pie_cr = pie_cr[pie_cr['Quantidade'] > 0].copy()
-        # Calcular porcentagem
-        total = pie_cr['Quantidade'].sum()
-        pie_cr['Percent'] = pie_cr['Quantidade'] / total
-        # Definir escala de cores por categoria
-        color_scale = alt.Scale(domain=[
-            'Branca','Preta','Parda','Amarela','Indigena','Não Declarada'
-        ], range=[
-            '#FFDEAD', '#8B4513', '#CD853F', '#F4A460', '#DAA520', '#D3D3D3'
-        ])
-        # Gráfico de pizza
-        base = alt.Chart(pie_cr).encode(theta=alt.Theta('Percent:Q', stack=True))
-        slice = base.mark_arc(innerRadius=50, outerRadius=100).encode(
-            color=alt.Color('Categoria:N', scale=color_scale, legend=alt.Legend(title='Cor/Raça')),  
-            tooltip=[alt.Tooltip('Categoria:N', title='Cor/Raça'), alt.Tooltip('Quantidade:Q'), alt.Tooltip('Percent:Q', format='.1%')]
-        )
-        # Labels de porcentagem
-        text = base.mark_text(radius=120, size=12).encode(
-            text=alt.Text('Percent:Q', format='.1%'),
-            color=alt.value('black')
-        )
-        st.altair_chart(slice + text, use_container_width=True)
+        with instrument.span('pizza cor/raça', rows_in=demo_totals) as span:
+            pie_cr = span.output(race_pie(demo_totals, demo_kernel.columns['cor']))
+        altair_chart('cor/raça', race_pie_chart(pie_cr))
 
 # --- Idade (Inalterado - já é barra) ---
 st.subheader("Distribuição de Idade dos Participantes")
 with st.container(border=True):
     # Gráfico de barras para faixa etária
-    if 'IDADE' in dims['idade'].columns:
-        idade_counts = dims['idade']['IDADE'].value_counts().reset_index()
-        idade_counts.columns = ['Faixa Etária', 'Quantidade']
-        bar_idade = alt.Chart(idade_counts).mark_bar(color='#17becf').encode(
-            x=alt.X('Faixa Etária:N', sort='-y'),
-            y='Quantidade:Q',
-            tooltip=['Faixa Etária', 'Quantidade']
-        ).properties(height=250)
-        st.altair_chart(bar_idade, use_container_width=True)
+    with instrument.span('faixas etárias', rows_in=dims['idade']) as span:
+        idade_counts = span.output(age_counts(dims['idade']))
+    if idade_counts is not None:
+        altair_chart('idade', age_chart(idade_counts))
 
 
 st.markdown("---")
@@ -292,29 +340,10 @@ with col_socio1:
         if renda_df is not None and not renda_df.empty:
             r_cols = [c for c in renda_df.columns if c.startswith('QTD_RENDA')]
             if r_cols:
-                r_counts = renda_df[r_cols].sum()
-                r_counts.index = r_counts.index.str.replace('QTD_RENDA_', '', regex=False)\
-                                               .str.replace('_', ' a ', regex=False)\
-                                               .str.replace('ATE ', 'Até ', regex=False)\
-                                               .str.replace('ACIMA DE ', 'Acima de ', regex=False)\
-                                               .str.replace(' SM', ' SM', regex=False)
-                renda_data = pd.DataFrame({'Faixa de Renda': r_counts.index, 'Quantidade': r_counts.values})
-                renda_data = renda_data[renda_data['Quantidade'] > 0]
-                def get_sort_key(renda_str):
-                    if 'Não Sabe' in renda_str or 'Não Informado' in renda_str: return float('inf')
-                    match = re.search(r'(\d+[\.,]?\d*)', renda_str)
-                    if match:
-                        num_str = match.group(1).replace(',', '.')
-                        return float(num_str)
-                    return float('inf') - 1
-                unique_renda_categories = sorted(renda_data['Faixa de Renda'].unique(), key=get_sort_key)
+                with instrument.span('renda', rows_in=demo_totals) as span:
+                    renda_data, unique_renda_categories = span.output(income_bars(demo_totals, r_cols))
                 if not renda_data.empty:
-                    renda_chart = alt.Chart(renda_data).mark_bar(color='#9467bd', opacity=0.8).encode(
-                        x=alt.X('Faixa de Renda', sort=unique_renda_categories, title='Faixa de Renda (Salários Mínimos)'),
-                        y=alt.Y('Quantidade:Q', title='Número de Estudantes'),
-                        tooltip=['Faixa de Renda', alt.Tooltip('Quantidade:Q', format=',')]
-                    ).properties(height=300).interactive()
-                    st.altair_chart(renda_chart, use_container_width=True)
+                    altair_chart('renda', income_chart(renda_data, unique_renda_categories))
                 else: st.info("Sem dados de renda para exibir.")
             else: st.warning("Nenhuma coluna ('QTD_RENDA*') encontrada nos dados de renda.")
         else: st.warning("Dados de renda não disponíveis.")
@@ -325,47 +354,25 @@ with col_socio2:
     with st.container(border=True):
         # Escolaridade (Borboleta)
         st.subheader("Escolaridade dos Pais x Mães")
-        esc = dims['escolaridade'].filter(regex='QTD_(PAI|MAE)_').sum()
-        # DataFrame longo
-        long = esc.reset_index()
-        long.columns = ['Categoria','Quantidade']
-        # Extrai parentesco e nível
-        long[['Parentesco','Nível']] = long['Categoria'].str.extract(r'QTD_(PAI|MAE)_(.+)')
-        long['Nível'] = long['Nível'].str.replace('_',' ').str.title()
-        # Filtra quantidade >0
-        long = long[long['Quantidade']>0]
-        # Preparar QtdPlot
-        long['QtdPlot'] = long.apply(lambda r: -r['Quantidade'] if r['Parentesco']=='PAI' else r['Quantidade'], axis=1)
-        # Ordem dos níveis
-        order = long.groupby('Nível')['Quantidade'].sum().abs().sort_values().index.tolist()
-        # Máximo para domínio simétrico
-        maxv = long['Quantidade'].max()
+        # DataFrame longo (parentesco x nível), ordem dos níveis e máximo para o domínio simétrico
+        with instrument.span('escolaridade', rows_in=demo_totals) as span:
+            long, order, maxv = span.output(parent_education(demo_totals, demo_kernel.columns['escolaridade']))
         # Borboleta
-        butter = alt.Chart(long).mark_bar().encode(
-            x=alt.X('QtdPlot:Q', title='Quantidade',
-                    scale=alt.Scale(domain=[-maxv,maxv]),
-                    axis=alt.Axis(labelExpr="datum.value<0?-datum.value:datum.value")),
-            y=alt.Y('Nível:N', sort=order, title='Nível de Escolaridade'),
-            color=alt.Color('Parentesco:N', legend=alt.Legend(title='Parentesco')),
-            tooltip=['Parentesco','Quantidade','Nível']
-        ).properties(height=300)
-        st.altair_chart(butter, use_container_width=True)
+        altair_chart('escolaridade', parent_education_chart(long, order, maxv))
 
 st.markdown("---")
 
 # --- Seção 4: Desempenho por Curso ---
 st.header("🎓 Desempenho por Curso")
 
-# Merge com CURSO
-df_course_merged = merge_fact(dims, df_filtered_year, 'curso', 'curso')
-
-if not df_course_merged.empty and 'DESC_CURSO' in df_course_merged.columns and 'NOTA_TOTAL' in df_course_merged.columns:
+# Atributos de CURSO já vêm do join em estrela
+df_course_merged = df_filtered_year
 
-    # 1. Calcular estatísticas (incluindo contagem) para usar no filtro e na cor
-    course_stats = df_course_merged.groupby('DESC_CURSO')['NOTA_TOTAL'].agg(['mean', 'count', 'median']).reset_index()
-    course_stats.rename(columns={'mean': 'Nota Média', 'count': 'Num Estudantes', 'median': 'Nota Mediana'}, inplace=True)
-    course_stats_sorted = course_stats.sort_values('Nota Média', ascending=False)
 
+@profiled_fragment('fragmento: boxplot por curso')
+def course_boxplot_section(course_stats, course_box, course_index):
+    # O slider reexecuta só este fragmento, não o script inteiro; estatísticas e índice
+    # por curso chegam prontos (cache por seleção de anos)
 
     # 2. Slider para filtrar por número mínimo de participantes
     min_students_slider = st.slider(
@@ -376,86 +383,43 @@ if not df_course_merged.empty and 'DESC_CURSO' in df_course_merged.columns and '
         step=10
     )
 
-    # 3. Obter a lista de cursos que atendem ao critério do slider
-    courses_to_show = course_stats[course_stats['Num Estudantes'] >= min_students_slider]['DESC_CURSO'].tolist()
+    # 3. Cursos que atendem ao critério do slider: busca binária nas contagens ordenadas
+    with instrument.span('cursos do slider', rows_in=course_stats) as span:
+        courses_to_show = span.output(course_index.at_least(min_students_slider))
 
     st.subheader(f"Distribuição das Notas por Curso (≥ {min_students_slider} participantes)")
     st.caption("Boxplots mostram a distribuição das notas (mediana, quartis, min/máx). A cor da caixa indica o número de participantes.")
 
-    if courses_to_show:
-        # 4. Filtrar os dados *originais* (com notas individuais) para os cursos selecionados
-        filtered_df_for_boxplot = df_course_merged[df_course_merged['DESC_CURSO'].isin(courses_to_show)].copy()
-
-        # 5. Adicionar a coluna 'Num Estudantes' a este dataframe filtrado para usar na cor
-        num_students_map = course_stats.set_index('DESC_CURSO')['Num Estudantes']
-        filtered_df_for_boxplot['Num Estudantes'] = filtered_df_for_boxplot['DESC_CURSO'].map(num_students_map)
-
-        # --- GRÁFICO DE BOXPLOT VERTICAL ---
-        boxplot_chart = alt.Chart(filtered_df_for_boxplot).mark_boxplot(
-            extent='min-max',
-            outliers=True,
-            size=20,
-            ticks=True
-        ).encode(
-            # Eixo X: Curso, ordenado pela mediana da Nota Total
-            x=alt.X('DESC_CURSO:N',
-                    title='Curso',
-                    # CORREÇÃO: Usar EncodingSortField que aceita 'op'
-                    sort=alt.EncodingSortField(field="NOTA_TOTAL", op="median", order='descending'),
-                    axis=alt.Axis(labelAngle=-60)),
-
-            # Eixo Y: Notas Totais (usadas para calcular o boxplot)
-            y=alt.Y('NOTA_TOTAL:Q',
-                    title='Distribuição da Nota Total',
-                    scale=alt.Scale(zero=False)),
-
-            # Cor: Mapeada para o Número de Estudantes (Quantitativo)
-            color=alt.Color('Num Estudantes:Q',
-                            title='Nº Participantes',
-                            scale=alt.Scale(scheme='viridis'),
-                            legend=alt.Legend(orient="top", titleOrient="left")),
-
-            # Tooltip: Mostra estatísticas do boxplot calculadas pelo Altair
-            tooltip=[
-                alt.Tooltip('DESC_CURSO', title='Curso'),
-                alt.Tooltip('Num Estudantes:Q', title='Nº Participantes', format=','),
-                alt.Tooltip('median(NOTA_TOTAL):Q', title='Mediana', format='.2f'),
-                alt.Tooltip('q1(NOTA_TOTAL):Q', title='1º Quartil (Q1)', format='.2f'),
-                alt.Tooltip('q3(NOTA_TOTAL):Q', title='3º Quartil (Q3)', format='.2f'),
-                alt.Tooltip('min(NOTA_TOTAL):Q', title='Mínimo (whiskers)', format='.2f'),
-                alt.Tooltip('max(NOTA_TOTAL):Q', title='Máximo (whiskers)', format='.2f')
-            ]
-        ).properties(
-            height=500
-        ).interactive() # Permite zoom e pan
-
-        st.altair_chart(boxplot_chart, use_container_width=True)
+    if len(courses_to_show):
+        # 4. Resumo de cinco números dos cursos selecionados (já com 'Num Estudantes' para a cor)
+        summary_for_boxplot = course_box[course_box['DESC_CURSO'].isin(courses_to_show)]
+
+        # --- GRÁFICO DE BOXPLOT VERTICAL (mediana, quartis, min/máx pré-calculados) ---
+        # Zoom e pan habilitados (interactive)
+        altair_chart('boxplot por curso', course_boxplot_chart(summary_for_boxplot))
         # --- FIM DO GRÁFICO DE BOXPLOT ---
 
     else:
         st.info(f"Nenhum curso encontrado com {min_students_slider} ou mais participantes.")
 
-    st.markdown("---")
 
-    # --- Comparativo Detalhado (mantido igual, usa course_stats_sorted) ---
+@profiled_fragment('fragmento: detalhe do curso')
+def course_detail_section(course_stats, course_index, overall_metrics):
+    # O selectbox reexecuta só este fragmento (o boxplot acima não é refeito)
+
+    # --- Comparativo Detalhado (usa course_stats ordenado pela média) ---
     st.subheader("🔍 Comparativo Detalhado por Curso")
     # Usa a lista de cursos ordenada pela média para o selectbox
-    cursos_disponiveis_select = course_stats_sorted['DESC_CURSO'].tolist()
+    cursos_disponiveis_select = course_stats.sort_values('Nota Média', ascending=False)['DESC_CURSO'].tolist()
     selected_course = st.selectbox("Selecione um curso para análise detalhada:", options=cursos_disponiveis_select)
-    # ... (resto do código para métricas detalhadas permanece o mesmo) ...
     if selected_course:
-        course_data_selected = df_course_merged[df_course_merged['DESC_CURSO'] == selected_course]
-        if not course_data_selected.empty and 'NOTA_TOTAL' in course_data_selected.columns:
+        # Notas do curso: uma fatia já ordenada do índice, sem varrer a tabela
+        course_values = course_index.course_values(selected_course)
+        if len(course_values):
              with st.container(border=True):
                 st.markdown(f"**Estatísticas do Curso: {selected_course}**")
-                metrics_course = {
-                    "Participantes": int(course_data_selected['NOTA_TOTAL'].count()),
-                    "Média": course_data_selected['NOTA_TOTAL'].mean(),
-                    "Mediana": course_data_selected['NOTA_TOTAL'].median(),
-                    "Mínimo": course_data_selected['NOTA_TOTAL'].min(),
-                    "Máximo": course_data_selected['NOTA_TOTAL'].max(),
-                    "Desvio Padrão": course_data_selected['NOTA_TOTAL'].std()
-                }
+                with instrument.span('métricas do curso'):
+                    metrics_course = sorted_metrics(course_values)
                 col_c1, col_c2, col_c3, col_c4, col_c5 = st.columns(5)
                 cols_c = [col_c1, col_c2, col_c3, col_c4, col_c5]
                 col_c1.metric("Nº de Participantes", f"{metrics_course['Participantes']:,}".replace(",", "."))
@@ -474,10 +438,56 @@ if not df_course_merged.empty and 'DESC_CURSO' in df_course_merged.columns and '
             st.warning(f"Não há dados de notas válidos para o curso selecionado: {selected_course}")
 
 
+@profiled_fragment('fragmento: ranking')
+def course_ranking_section(curso, course_mask, counts, means, active_filters):
+    # Top/bottom-k por nota média entre os cursos dos filtros da barra lateral:
+    # máscara dos bitmaps + seleção parcial (argpartition), sem ordenar todos os cursos
+    st.subheader("🏆 Ranking de Cursos por Nota Média")
+    st.caption("Cursos dos filtros da barra lateral" + (" — " + " | ".join(active_filters) if active_filters else "."))
+    col_k, col_min = st.columns(2)
+    k = col_k.number_input("Cursos em cada ranking:", min_value=1, max_value=100, value=10)
+    min_students = col_min.number_input("Mínimo de participantes:", min_value=1,
+                                        value=max(1, min(RANKING_MIN_STUDENTS, int(counts.max()))))
+    mask = counts >= min_students
+    if course_mask is not None:
+        mask &= course_mask
+    if not mask.any():
+        st.info("Nenhum curso atende aos filtros selecionados.")
+        return
+    st.markdown(f"{int(mask.sum()):,} cursos atendem aos filtros.".replace(",", "."))
+    col_top, col_bottom = st.columns(2)
+    for col, title, largest in ((col_top, "Maiores médias", True), (col_bottom, "Menores médias", False)):
+        with instrument.span(f"ranking: {title.lower()}", rows_in=curso) as span:
+            positions = top_k(means, mask, k, largest=largest)
+            table = span.output(ranking_table(curso, positions, counts, means, RANKING_COLUMNS).rename(columns=RANKING_COLUMNS))
+        table['Nota Média'] = table['Nota Média'].round(2)
+        with col:
+            st.markdown(f"**{title}**")
+            st.dataframe(table, hide_index=True, use_container_width=True)
+
+
+if not df_course_merged.empty and 'DESC_CURSO' in df_course_merged.columns and 'NOTA_TOTAL' in df_course_merged.columns:
+    # 1. Estatísticas por curso (contagem, média, mediana) e índice por curso, uma vez por seleção de anos
+    course_stats, course_box = build_course_summary(cube, score_sketches, data_fingerprint, tuple(selected_years))
+    course_index = build_course_index(df_course_merged, data_fingerprint)
+    course_boxplot_section(course_stats, course_box, course_index)
+    st.markdown("---")
+    course_detail_section(course_stats, course_index, overall_metrics)
+    st.markdown("---")
+    counts, means = build_course_scores(df_course_merged, dims['curso'], data_fingerprint)
+    course_ranking_section(dims['curso'], course_mask, counts, means, active_filters)
 else:
     st.info("Seção de desempenho por curso não pode ser exibida devido à falta de dados ou colunas necessárias ('DESC_CURSO', 'NOTA_TOTAL') após o merge com a dimensão Curso.")
 
 
 # --- Rodapé ---
 st.markdown("---")
-st.caption(f"Dashboard ENADE {TARGET_YEAR} | Análise de Desempenho e Perfil dos Participantes.")
+st.caption(f"Dashboard ENADE {years_label} | Análise de Desempenho e Perfil dos Participantes.")
+
+# --- Painel de instrumentação (administração) ---
+instrument.finish(recorder)
+if recorder.enabled:
+    with st.sidebar.expander("⏱️ Desempenho deste rerun"):
+        st.caption(f"Total: {recorder.total_ms:.0f} ms | Sessão {recorder.session} | Log: {PROFILE_LOG} "
+                   "(reruns só de fragmentos vão apenas para o log)")
+        st.dataframe(recorder.table(), hide_index=True, use_container_width=True)
@@ -0,0 +1,19 @@
+import json
+
+from enade import instrument
+
+
+def test_log_rotates_past_max_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrument, 'LOG_MAX_BYTES', 200)
+    log_path = str(tmp_path / 'perf.jsonl')
+    for _ in range(10):
+        recorder = instrument.start('script', True, 'abc', log_path)
+        with instrument.span('etapa'):
+            pass
+        instrument.finish(recorder)
+    # Cada arquivo passa do limite por no máximo uma linha; as mais antigas são descartadas
+    for path in (log_path, log_path + '.1'):
+        lines = open(path, encoding=instrument.LOG_ENCODING).read().splitlines()
+        assert lines and all(json.loads(line)['sessao'] == 'abc' for line in lines)
+        assert sum(len(line) + 1 for line in lines[:-1]) < 200
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['perf.jsonl', 'perf.jsonl.1']
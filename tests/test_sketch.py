@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from enade.cube import build_cube, build_sketches, rollup_quantiles
+from enade.sketch import DEFAULT_DELTA, QuantileSketches
+
+QUANTILES = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+# Com delta=None os quantis são os do pandas; a interpolação entre vizinhos é escrita de outra
+# forma que a do NumPy, então a diferença fica no último dígito do float64
+EXACT_RTOL = 1e-12
+# Limites com DEFAULT_DELTA após fundir os sketches das células (rollup): erro de posto
+# (fração das linhas) e erro de valor em pontos de nota (escala 0 a 100)
+MAX_RANK_ERROR = 0.002
+MAX_VALUE_ERROR = 0.25
+
+
+def _scores(rows, groups, seed=0):
+    # Notas com uma casa decimal (como no DW), média diferente por grupo e alguns NaN
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, groups, rows)
+    values = np.clip(rng.normal(45 + (codes % 7) * 5, 15), 0, 100).round(1)
+    values[rng.random(rows) < 0.01] = np.nan
+    return codes, values
+
+
+def _star(rows, seed=0):
+    codes, values = _scores(rows, 60, seed)
+    courses = pd.Categorical([f'Curso {c % 20}' for c in codes])
+    regions = pd.Categorical([f'Região {c % 5}' for c in codes])
+    return pd.DataFrame({'ANO': np.where(codes < 30, 2022, 2023), 'DESC_REGIAO_CURSO': regions,
+                         'DESC_CURSO': courses, 'NOTA_TOTAL': values.astype('float32')})
+
+
+def _rank_error(sorted_values, estimate, q):
+    # Distância entre q e o intervalo de posições (R-7, 0 a 1) que o valor estimado ocupa
+    n = len(sorted_values) - 1
+    lo = np.searchsorted(sorted_values, estimate, side='left') / n
+    hi = (np.searchsorted(sorted_values, estimate, side='right') - 1) / n
+    return 0.0 if lo <= q <= hi else min(abs(q - lo), abs(q - hi))
+
+
+def test_exact_sketches_match_pandas_per_cell():
+    codes, values = _scores(20_000, 50)
+    sketches = QuantileSketches.from_values(codes, values, 51, delta=None) # grupo 50 fica vazio
+    for q in QUANTILES:
+        expected = pd.Series(values).groupby(codes).quantile(q).reindex(range(51))
+        np.testing.assert_allclose(sketches.quantile(q), expected.to_numpy(), rtol=EXACT_RTOL)
+    assert np.isnan(sketches.quantile(0.5)[50])
+
+
+@pytest.mark.parametrize('by', [(), ('ANO',), ('DESC_REGIAO_CURSO',), ('ANO', 'DESC_CURSO')])
+def test_exact_rollup_quantiles_match_pandas(by):
+    star = _star(30_000)
+    cube = build_cube(star)
+    sketches = build_sketches(star, cube, delta=None)
+    quantiles = {f'q{q}': q for q in QUANTILES}
+    approx = rollup_quantiles(cube, sketches, by=list(by), quantiles=quantiles)
+    scores = star['NOTA_TOTAL'].astype('float64')
+    for name, q in quantiles.items():
+        if by:
+            expected = scores.groupby([star[c] for c in by], observed=True).quantile(q)
+            got = approx.set_index(list(by))[name].reindex(expected.index).to_numpy()
+            np.testing.assert_allclose(got, expected.to_numpy(), rtol=EXACT_RTOL)
+        else:
+            assert approx[name].iloc[0] == pytest.approx(scores.quantile(q), rel=EXACT_RTOL)
+
+
+@pytest.mark.parametrize('groups', [1, 5])
+def test_default_delta_error_bound_after_merge(groups):
+    codes, values = _scores(200_000, 300)
+    sketches = QuantileSketches.from_values(codes, values, 300, DEFAULT_DELTA)
+    cell_group = np.arange(300) % groups
+    merged = sketches.merge(cell_group, groups)
+    for q in QUANTILES:
+        estimates = merged.quantile(q)
+        for g in range(groups):
+            group_values = values[(cell_group[codes] == g) & ~np.isnan(values)]
+            sorted_values = np.sort(group_values)
+            assert _rank_error(sorted_values, estimates[g], q) <= MAX_RANK_ERROR
+            assert abs(estimates[g] - np.quantile(sorted_values, q)) <= MAX_VALUE_ERROR
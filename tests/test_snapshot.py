@@ -0,0 +1,70 @@
+import os
+
+from benchmarks.synthetic import synthetic_tables, write_csvs
+from enade import snapshot
+from enade.loader import CACHE_DIR, FACT_KEY, FILE_MAPPING
+from enade.snapshot import SnapshotStore
+
+YEARS = (2022, 2023)
+
+
+def _store(tmp_path):
+    write_csvs(synthetic_tables(2_000, years=YEARS), tmp_path)
+    return SnapshotStore(base_dir=str(tmp_path))
+
+
+def _append_rows(base_dir, rows=50):
+    # Repete no fim do CSV da fato as `rows` primeiras linhas de dados (linhas acrescentadas)
+    path = os.path.join(base_dir, FILE_MAPPING[FACT_KEY]['fname'])
+    with open(path) as f:
+        lines = f.readlines()[1:rows + 1]
+    with open(path, 'a') as f:
+        f.writelines(lines)
+
+
+def _part_files(base_dir):
+    part_dir = os.path.join(base_dir, CACHE_DIR, FILE_MAPPING[FACT_KEY]['fname'] + '.parts')
+    return {f for f in os.listdir(part_dir) if f.endswith('.arrow') and f != '_empty.arrow'}
+
+
+def test_old_snapshot_selects_unbuilt_year_after_refresh(tmp_path):
+    store = _store(tmp_path)
+    old = store.refresh()
+    rows = len(old.select([2023])['star'])
+    _append_rows(tmp_path)
+    new = store.refresh()
+    assert new is not old
+    # 2022 nunca foi montado no snapshot antigo: lê as partições do manifest dele
+    assert len(old.select([2022])['tables'][FACT_KEY]) == old.manifests[FACT_KEY]['partitions']['2022']['rows']
+    assert len(old.select([2022, 2023])['star']) + 50 == len(new.select([2022, 2023])['star'])
+    assert len(old.select([2023])['star']) == rows
+
+
+def test_superseded_partitions_pruned_once_unreferenced(tmp_path):
+    store = _store(tmp_path)
+    old = store.refresh()
+    old_files = {p['file'] for p in old.manifests[FACT_KEY]['partitions'].values()}
+    _append_rows(tmp_path)
+    store.refresh()
+    assert old_files <= _part_files(tmp_path)
+    del old
+    _append_rows(tmp_path)
+    current = store.refresh()
+    assert _part_files(tmp_path) == {p['file'] for p in current.manifests[FACT_KEY]['partitions'].values()}
+
+
+def test_built_years_and_selections_are_lru(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, 'PARTITION_CACHE_SIZE', 1)
+    monkeypatch.setattr(snapshot, 'SELECTION_CACHE_SIZE', 2)
+    store = _store(tmp_path)
+    current = store.refresh()
+    current.select([2022])
+    current.select([2023])
+    assert list(current.built_slices()) == [2023]
+    current.select([2022]) # usada por último: a combinação (2023,) passa a ser a mais antiga
+    current.select([2022, 2023])
+    assert list(current._selections) == [(2022,), (2022, 2023)]
+    assert list(current.built_slices()) == [2023]
+    # O próximo snapshot herda só os anos que continuam no cache
+    _append_rows(tmp_path)
+    assert list(store.refresh().built_slices()) == [2023]